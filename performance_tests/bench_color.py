@@ -0,0 +1,37 @@
+from typing import Any
+
+import pytest
+
+from philips_hue_v2.lights.color import Converter, GamutA, GamutB, GamutC
+
+
+GAMUTS = {"A": GamutA, "B": GamutB, "C": GamutC}
+# A warm white within all gamuts, and a deep blue outside all of them.
+IN_GAMUT_RGB = (255, 180, 120)
+OUT_OF_GAMUT_RGB = (0, 0, 255)
+IN_GAMUT_XY = (0.45, 0.41)
+OUT_OF_GAMUT_XY = (0.1, 0.1)
+
+
+@pytest.mark.parametrize("gamut", GAMUTS, ids=lambda gamut: f"gamut-{gamut}")
+@pytest.mark.parametrize("rgb", [IN_GAMUT_RGB, OUT_OF_GAMUT_RGB], ids=["in-gamut", "out-of-gamut"])
+def bench_rgb_to_xy(benchmark: Any, gamut: str, rgb: tuple[int, int, int]) -> None:
+    """Convert a single color from rgb to xy."""
+    converter = Converter(GAMUTS[gamut])
+    benchmark(converter.rgb_to_xy, *rgb)
+
+
+@pytest.mark.parametrize("gamut", GAMUTS, ids=lambda gamut: f"gamut-{gamut}")
+@pytest.mark.parametrize("xy", [IN_GAMUT_XY, OUT_OF_GAMUT_XY], ids=["in-gamut", "out-of-gamut"])
+def bench_xy_to_rgb(benchmark: Any, gamut: str, xy: tuple[float, float]) -> None:
+    """Convert a single color from xy to rgb."""
+    converter = Converter(GAMUTS[gamut])
+    benchmark(converter.xy_to_rgb, *xy)
+
+
+@pytest.mark.parametrize("gamut", GAMUTS, ids=lambda gamut: f"gamut-{gamut}")
+def bench_rgb_to_xy_batch(benchmark: Any, gamut: str) -> None:
+    """Convert 10k colors from rgb to xy at once."""
+    numpy = pytest.importorskip("numpy")
+    rgb = numpy.random.default_rng(0).integers(1, 256, size=(10_000, 3))
+    benchmark(Converter(GAMUTS[gamut]).rgb_to_xy_batch, rgb)
@@ -0,0 +1,29 @@
+from typing import Any
+
+from philips_hue_v2.resource.network import Network
+
+
+def bench_light_update_latency(benchmark: Any, emulated_network: Network) -> None:
+    """Send an update to a light and wait for the response, through the scheduler and the HTTP client."""
+    light = (emulated_network.lights or [])[0]
+    benchmark(light.update, on=True, brightness=50)
+
+
+def bench_light_update_throughput(benchmark: Any, emulated_network: Network) -> None:
+    """Queue an update to each of the 100 lights at once and wait for all of them."""
+    lights = emulated_network.lights or []
+    scheduler = emulated_network.bridge.scheduler
+
+    def update_all() -> None:
+        futures = [scheduler.submit(body={"on": {"on": True}}, endpoint=light.endpoint) for light in lights]
+        for future in futures:
+            future.result()
+
+    benchmark.extra_info["commands"] = len(lights)
+    benchmark(update_all)
+
+
+def bench_grouped_update(benchmark: Any, emulated_network: Network) -> None:
+    """Send an update to all lights, which is planned as a single grouped light update."""
+    lights = emulated_network.lights or []
+    benchmark(emulated_network.update_lights, lights, {"on": {"on": False}})
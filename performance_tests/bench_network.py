@@ -0,0 +1,47 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from philips_hue_v2.bridge import HueBridge
+from philips_hue_v2.resource.network import Network
+
+
+@pytest.mark.parametrize("validate", [True, False], ids=["validated", "trusted"])
+def bench_parse_lights(benchmark: Any, resources: list[dict[str, Any]], bridge: HueBridge, validate: bool) -> None:
+    """Parse the lights of the install."""
+    network = Network(resources=[], bridge=bridge, validate=validate)
+    benchmark(network.parse_lights, resources)
+
+
+def bench_parse_network(benchmark: Any, resources: list[dict[str, Any]], bridge: HueBridge) -> None:
+    """Parse and index all resources of the install."""
+    benchmark(Network, resources=resources, bridge=bridge)
+
+
+def bench_get_light_by_id(benchmark: Any, network: Network) -> None:
+    """Look up the last light by its id."""
+    light_id = network.lights[-1].id if network.lights else ""
+    benchmark(network.get_light_by_id, light_id)
+
+
+def bench_get_light_by_name(benchmark: Any, network: Network) -> None:
+    """Look up the last light by its name, in another case."""
+    name = network.lights[-1].name.upper() if network.lights else ""
+    benchmark(network.get_light_by_name, name)
+
+
+def bench_find_lights_in_group(benchmark: Any, network: Network) -> None:
+    """Find the color lights in the last room."""
+    benchmark(network.find_lights, archetype="sultan_bulb", group=network.groups[-2].name)
+
+
+def bench_snapshot_round_trip(benchmark: Any, network: Network, bridge: HueBridge, tmp_path: Path) -> None:
+    """Save the network to a snapshot and load it again."""
+    path = tmp_path / "network.json"
+
+    def round_trip() -> Network:
+        network.save_snapshot(path)
+        return Network.from_snapshot(path, bridge)
+
+    benchmark(round_trip)
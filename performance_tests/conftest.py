@@ -0,0 +1,35 @@
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from philips_hue_v2.bridge import HueBridge
+from philips_hue_v2.emulator import UNLIMITED_RATES, BridgeEmulator, synthetic_resources
+from philips_hue_v2.resource.network import Network
+
+
+@pytest.fixture(scope="session", params=[100, 1_000, 10_000], ids=lambda count: f"{count}-lights")
+def resources(request: pytest.FixtureRequest) -> list[dict[str, Any]]:
+    """Resources of synthetic installs of 100, 1k and 10k lights."""
+    return synthetic_resources(request.param)
+
+
+@pytest.fixture(scope="session")
+def bridge() -> HueBridge:
+    """A bridge that is never connected to."""
+    return HueBridge(client_key="", user_name="", ip_address="127.0.0.1")
+
+
+@pytest.fixture(scope="session")
+def network(resources: list[dict[str, Any]], bridge: HueBridge) -> Network:
+    """A network parsed from the synthetic install."""
+    return Network(resources=resources, bridge=bridge)
+
+
+@pytest.fixture()
+def emulated_network() -> Iterator[Network]:
+    """A network of 100 lights connected to a bridge emulator without latency or rate limits."""
+    emulator = BridgeEmulator.with_lights(100)
+    with emulator.bridge(**UNLIMITED_RATES) as bridge:
+        yield Network.fetch(bridge)
+    emulator.shutdown()
@@ -0,0 +1,40 @@
+"""Benchmark of parsing the resources of a network, with and without validation.
+
+Run with `poetry run python performance_tests/parse_network.py`.
+"""
+import time
+from typing import Any
+
+from philips_hue_v2.bridge import HueBridge
+from philips_hue_v2.emulator import synthetic_resources
+from philips_hue_v2.resource.network import Network
+
+
+REPEATS = 5
+
+
+def best_time(resources: list[dict[str, Any]], bridge: HueBridge, validate: bool) -> float:
+    """Get the best time out of `REPEATS` runs of parsing the resources into a network."""
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        Network(resources=resources, bridge=bridge, validate=validate)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    """Print the parse time of about 1k and 10k resources, half of them lights."""
+    bridge = HueBridge(client_key="", user_name="", ip_address="127.0.0.1")
+    for light_count in (500, 5_000):
+        resources = synthetic_resources(light_count)
+        validated = best_time(resources, bridge, validate=True)
+        trusted = best_time(resources, bridge, validate=False)
+        print(
+            f"{len(resources):>6} resources: validated {validated * 1000:8.1f} ms, trusted {trusted * 1000:8.1f} ms, "
+            f"{validated / trusted:4.1f}x faster"
+        )
+
+
+if __name__ == "__main__":
+    main()
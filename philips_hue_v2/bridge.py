@@ -1,29 +1,276 @@
+import asyncio
 import json
+import threading
+from functools import partial
 from pathlib import Path
-from typing import Any
+from types import TracebackType
+from typing import Any, Self
 
+import httpx
 from loguru import logger
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from .authentication import get_access_token
-from .resource.requests import put_resources
+from .resource.instrumentation import Instrumentation
+from .resource.requests import async_put_resources, put_resources
+from .resource.retry import CircuitBreaker
+from .resource.scheduler import AsyncCommandScheduler, CommandScheduler, Priority, ResourceResult
 
 
-class HueBridge(BaseModel):
-    """Class representing a Philips Hue bridge."""
+class BaseHueBridge(BaseModel):
+    """Settings shared by the synchronous and the asynchronous bridge.
+
+    Every bridge owns one long-lived HTTP/2 client that every request to the bridge goes through, so connections are
+    pooled and kept alive instead of doing a new TCP and TLS handshake for every command. The client is created lazily
+    on first use.
+
+    Updates go through a command scheduler which paces them to the rate limits of the bridge, roughly 10 light
+    commands and 1 group command per second, keeping the updates of a resource in order. With `coalesce_updates`
+    enabled, pending updates of the same resource are merged and only the latest value of every attribute is sent,
+    which keeps chatty inputs such as sliders from flooding the bridge.
+
+    With `skip_unchanged_updates` enabled, lights leave out the changes they are already in from their updates and skip
+    the request entirely when nothing is left, within `xy_tolerance` and `brightness_tolerance`. This relies on the
+    known state of the lights being current, for example by keeping the network live from the event stream.
+
+    Requests that fail because the bridge is overloaded or unreachable are retried up to `max_retries` times, waiting a
+    random time up to an exponential backoff starting at `retry_backoff` seconds and capped at `retry_backoff_max`, or
+    as long as the bridge asks with `Retry-After` up to `retry_after_max` seconds. With `deadline` set, every call gives
+    up after that many seconds including its retries, and a longer wait than `retry_after_max` is cut short to it.
+    Without a deadline, a request the bridge asks to wait longer for is not retried. After
+    `circuit_failure_threshold` failed requests in a row the circuit breaker of the bridge opens, and requests fail
+    right away until the bridge answers a probe request again, sent every `circuit_reset_timeout` seconds.
+
+    Requests and queued updates can be measured by passing an `Instrumentation` to `instrument()`.
+    """
 
     client_key: str
     user_name: str
     ip_address: str
     path: Path = Path("bridge.json")
+    http2: bool = True
+    timeout: float = 10.0
+    connect_timeout: float = 5.0
+    max_connections: int = 10
+    max_keepalive_connections: int = 5
+    keepalive_expiry: float = 30.0
+    light_commands_per_second: float = 10.0
+    group_commands_per_second: float = 1.0
+    command_burst: float = 1.0
+    coalesce_updates: bool = False
+    skip_unchanged_updates: bool = False
+    xy_tolerance: float = 0.0001
+    brightness_tolerance: float = 0.5
+    max_retries: int = 2
+    retry_backoff: float = 0.1
+    retry_backoff_max: float = 2.0
+    retry_after_max: float = 30.0
+    deadline: float | None = None
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 10.0
+
+    _transport: httpx.BaseTransport | httpx.AsyncBaseTransport | None = PrivateAttr(default=None)
+    _instrumentation: Instrumentation | None = PrivateAttr(default=None)
+    _circuit_breaker: CircuitBreaker | None = PrivateAttr(default=None)
+
+    @property
+    def base_url(self) -> str:
+        """Get the base url of the bridge."""
+        return f"https://{self.ip_address}"
+
+    def use_transport(self, transport: httpx.BaseTransport | httpx.AsyncBaseTransport) -> None:
+        """Send the requests through a custom transport instead of the network, for example a `BridgeEmulator`.
+
+        This has to be done before the first request, when the client is created.
+        """
+        self._transport = transport
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Get the circuit breaker tracking the health of the bridge."""
+        if self._circuit_breaker is None:
+            self._circuit_breaker = CircuitBreaker(
+                failure_threshold=self.circuit_failure_threshold, reset_timeout=self.circuit_reset_timeout
+            )
+        return self._circuit_breaker
+
+    @property
+    def instrumentation(self) -> Instrumentation | None:
+        """Get the instrumentation the requests to the bridge are reported to, None when they are not measured."""
+        return self._instrumentation
+
+    def instrument(self, instrumentation: Instrumentation | None) -> None:
+        """Report every request to the bridge, and the time updates wait in the scheduler, to the instrumentation.
+
+        Passing None removes the instrumentation again.
+        """
+        self._instrumentation = instrumentation
+        # The scheduler is created lazily, so there is none to update before the first update.
+        scheduler = getattr(self, "_scheduler", None)
+        if scheduler is not None:
+            scheduler.instrumentation = instrumentation
+
+    def _client_options(self) -> dict[str, Any]:
+        """Get the keyword arguments used to create the HTTP client."""
+        options: dict[str, Any] = {} if self._transport is None else {"transport": self._transport}
+        return options | {
+            "base_url": self.base_url,
+            "headers": {"hue-application-key": self.user_name},
+            "http2": self.http2,
+            "timeout": httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            "verify": False,  # This is only supposed to be used in a local network!
+        }
+
+    def __getstate__(self) -> dict[Any, Any]:
+        """Get the state for pickling, runtime objects such as the client are reset to their defaults."""
+        state = super().__getstate__()
+        state["__pydantic_private__"] = {
+            name: private_attr.get_default() for name, private_attr in self.__private_attributes__.items()
+        }
+        return state
+
+
+class HueBridge(BaseHueBridge):
+    """Class representing a Philips Hue bridge.
+
+    The client should be released with `close()`, or by using the bridge as a context manager.
+    """
+
+    _client: httpx.Client | None = PrivateAttr(default=None)
+    _scheduler: CommandScheduler | None = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def client(self) -> httpx.Client:
+        """Get the pooled HTTP client used to communicate with the bridge."""
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.Client(**self._client_options())
+            return self._client
+
+    @property
+    def scheduler(self) -> CommandScheduler:
+        """Get the scheduler sending the updates to the bridge."""
+        with self._lock:
+            if self._scheduler is None:
+                self._scheduler = CommandScheduler(
+                    send=partial(put_resources, self),
+                    light_rate=self.light_commands_per_second,
+                    group_rate=self.group_commands_per_second,
+                    burst=self.command_burst,
+                    coalesce=self.coalesce_updates,
+                    max_workers=self.max_connections,
+                    instrumentation=self._instrumentation,
+                )
+            return self._scheduler
+
+    def close(self) -> None:
+        """Send the pending updates, then close the HTTP client and all pooled connections."""
+        if self._scheduler is not None:
+            self._scheduler.close()
+            self._scheduler = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def __enter__(self) -> Self:
+        """Enter the runtime context, the client is closed when leaving it."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the client when leaving the runtime context."""
+        self.close()
+
+    def update_resource(self, body: dict[str, Any], endpoint: str, priority: int = Priority.NORMAL) -> ResourceResult:
+        """Wrapper function used to update a resource connect to the bridge.
+
+        The update is queued in the scheduler, and this blocks until it has been sent.
+        """
+        return self.scheduler.submit(body=body, endpoint=endpoint, priority=priority).result()
+
+
+class AsyncHueBridge(BaseHueBridge):
+    """Class representing a Philips Hue bridge, communicating with it using asyncio.
+
+    At most `max_concurrency` requests are in flight at the same time, so many commands can be gathered without
+    overrunning the bridge. The client should be released with `aclose()`, or by using the bridge as an async context
+    manager.
+    """
+
+    max_concurrency: int = 10
+
+    _client: httpx.AsyncClient | None = PrivateAttr(default=None)
+    _semaphore: asyncio.Semaphore | None = PrivateAttr(default=None)
+    _scheduler: AsyncCommandScheduler | None = PrivateAttr(default=None)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client used to communicate with the bridge."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(**self._client_options())
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Get the semaphore bounding the number of concurrent requests to the bridge."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @property
+    def scheduler(self) -> AsyncCommandScheduler:
+        """Get the scheduler sending the updates to the bridge."""
+        if self._scheduler is None:
+            self._scheduler = AsyncCommandScheduler(
+                send=partial(async_put_resources, self),
+                light_rate=self.light_commands_per_second,
+                group_rate=self.group_commands_per_second,
+                burst=self.command_burst,
+                coalesce=self.coalesce_updates,
+                instrumentation=self._instrumentation,
+            )
+        return self._scheduler
+
+    async def aclose(self) -> None:
+        """Send the pending updates, then close the HTTP client and all pooled connections."""
+        if self._scheduler is not None:
+            await self._scheduler.aclose()
+            self._scheduler = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> Self:
+        """Enter the runtime context, the client is closed when leaving it."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the client when leaving the runtime context."""
+        await self.aclose()
+
+    async def update_resource(
+        self, body: dict[str, Any], endpoint: str, priority: int = Priority.NORMAL
+    ) -> ResourceResult:
+        """Wrapper function used to update a resource connect to the bridge.
 
-    def update_resource(self, body: dict[str, Any], endpoint: str) -> None:
-        """Wrapper function used to update a resource connect to the bridge."""
-        put_resources(
-            bridge=self,
-            body=body,
-            endpoint=endpoint,
-        )
+        The update is queued in the scheduler, and this waits until it has been sent.
+        """
+        return await self.scheduler.submit(body=body, endpoint=endpoint, priority=priority)
 
 
 def get_access_token_from_bridge(ip_address: str, app_name: str, instance_name: str) -> None:
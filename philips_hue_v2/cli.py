@@ -0,0 +1,376 @@
+"""Command-line tool to control the lights of a bridge.
+
+The credentials of the bridge are read from the options, or the IP_ADDRESS, CLIENT_KEY and USER_NAME environment
+variables, which can be kept in a .env file. With `--emulate` the commands run against an in-process bridge emulator
+with a synthetic install instead, which is useful to try scripts and to measure the overhead of the library.
+
+    hue lights --group "Living room"
+    hue set --group "Living room" --on --brightness 40 --rgb 255,120,0 --duration 2000
+    hue run sunrise.yaml
+    hue bench --all --count 500
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+
+from dotenv import load_dotenv
+from result import UnwrapError
+
+from .bridge import HueBridge
+from .emulator import BridgeEmulator
+from .lights.lights import COLOR_CHANGES, Lights, LightUpdate
+from .resource.instrumentation import Instrumentation, RequestRecord
+from .resource.network import Network
+from .resource.snapshot import SnapshotError
+
+
+if TYPE_CHECKING:
+    from .resource.scheduler import ResourceResult
+
+
+SELECTORS = frozenset({"name", "archetype", "group", "id", "all"})
+CHANGES = frozenset({"on", "brightness", "rgb", "xy", "mirek", "kelvin", "duration"})
+
+
+class CommandError(Exception):
+    """Raised when a command can't be run, the message is shown to the user."""
+
+
+def _write(line: str = "") -> None:
+    """Write a line to standard output."""
+    sys.stdout.write(f"{line}\n")
+
+
+def _pair(value: str) -> tuple[float, float]:
+    """Parse xy-values given as "x,y"."""
+    x, y = (float(part) for part in value.split(","))
+    return x, y
+
+
+def _rgb(value: str) -> list[int]:
+    """Parse rgb-values given as "red,green,blue"."""
+    rgb = [int(part) for part in value.split(",")]
+    if len(rgb) != 3:  # noqa: PLR2004 - Red, green and blue
+        raise argparse.ArgumentTypeError("rgb should be given as red,green,blue")
+    return rgb
+
+
+def build_changes(step: dict[str, Any]) -> LightUpdate:
+    """Get the changes of the options of `set`, or a step of a script, as the changes of `Lights.update`.
+
+    The rgb-values are either a list of red, green and blue or a dict with those keys. The body of every light is built
+    from the changes by the light itself, so colors are fitted in its gamut and temperatures in its range.
+    """
+    changes: dict[str, Any] = {key: step[key] for key in CHANGES if step.get(key) is not None}
+    if not changes:
+        raise CommandError(
+            "Nothing to change, give at least one of on, brightness, rgb, xy, mirek, kelvin or duration."
+        )
+    if len(COLOR_CHANGES.intersection(changes)) > 1:
+        raise CommandError("Only one of rgb, xy, mirek and kelvin can be set at a time.")
+    if "rgb" in changes and not isinstance(changes["rgb"], dict):
+        red, green, blue = changes["rgb"]
+        changes["rgb"] = {"red": red, "green": green, "blue": blue}
+    return cast(LightUpdate, changes)
+
+
+def select_lights(network: Network, selection: dict[str, Any], required: bool = True) -> list[Lights]:
+    """Select the lights matching all criteria of a selection, one of several groups or ids is enough.
+
+    Args:
+        network (Network): The network to select lights from.
+        selection (dict[str, Any]): The criteria, a name, an archetype, group names and light ids, or all lights.
+        required (bool, optional): Raise if no criteria are given, to avoid changing all lights by mistake.
+            Defaults to True.
+
+    Returns:
+        list[Lights]: The selected lights, sorted by name.
+    """
+    groups = _as_list(selection.get("group"))
+    ids = _as_list(selection.get("id"))
+    name, archetype = selection.get("name"), selection.get("archetype")
+    if required and not selection.get("all") and not (groups or ids or name or archetype):
+        raise CommandError("Select lights with a name, archetype, group or id, or select all lights.")
+
+    lights: set[Lights] = set()
+    if not groups:
+        lights = network.find_lights(name=name, archetype=archetype)
+    for group in groups:
+        lights |= network.find_lights(name=name, archetype=archetype, group=group)
+    if ids:
+        lights = {light for light in lights if light.id in ids}
+    return sorted(lights, key=lambda light: light.name)
+
+
+def _as_list(value: str | list[str] | None) -> list[str]:
+    """Get a selector that can be given once or several times as a list."""
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+@contextmanager
+def connect(args: argparse.Namespace) -> Iterator[Network]:
+    """Connect to the bridge, or an emulator, and get its network."""
+    settings: dict[str, Any] = {}
+    if args.light_rate is not None:
+        settings["light_commands_per_second"] = args.light_rate
+    if args.group_rate is not None:
+        settings["group_commands_per_second"] = args.group_rate
+
+    emulator = None
+    if args.emulate:
+        emulator = BridgeEmulator.with_lights(args.emulate, latency=args.emulate_latency)
+        bridge = emulator.bridge(**settings)
+    elif args.ip_address:
+        bridge = HueBridge(ip_address=args.ip_address, client_key=args.client_key, user_name=args.user_name, **settings)
+    else:
+        raise CommandError("Give the address of the bridge with --ip-address or IP_ADDRESS, or use --emulate.")
+
+    try:
+        with bridge:
+            try:
+                if args.snapshot is not None:
+                    network = Network.from_snapshot(args.snapshot, bridge)
+                else:
+                    network = Network.fetch(bridge, validate=False)
+            except SnapshotError as err:
+                raise CommandError(str(err)) from err
+            except UnwrapError as err:
+                raise CommandError(f"Could not get the resources of the bridge: {err.result.unwrap_err()}") from err
+            yield network
+    finally:
+        if emulator is not None:
+            emulator.shutdown()
+
+
+def command_lights(network: Network, args: argparse.Namespace) -> None:
+    """List the selected lights, or all lights."""
+    lights = select_lights(network, vars(args), required=False)
+    if args.json:
+        _write(json.dumps([light.model_dump(mode="json", exclude={"bridge"}) for light in lights], indent=2))
+        return
+    for light in lights:
+        state = "on" if light.on.get("on") else "off"
+        brightness = light.dimming.get("brightness", 0.0)
+        _write(f"{light.id}\t{light.name}\t{light.metadata['archetype']}\t{state}\t{brightness:.0f}%")
+
+
+def _wait(futures: Iterable["Future[ResourceResult]"]) -> tuple[int, int]:
+    """Wait for updates, returns the number of successful and failed updates."""
+    results = [future.result() for future in futures]
+    failed = sum(result.is_err() for result in results)
+    return len(results) - failed, failed
+
+
+def command_set(network: Network, args: argparse.Namespace) -> None:
+    """Apply the changes to all selected lights, through grouped lights where the lights get the same update."""
+    lights = select_lights(network, vars(args))
+    changes = build_changes(vars(args))
+    report = network.apply({light: changes for light in lights})
+    for light_id in report.failed:
+        _write(f"{light_id}: {report.results[light_id].result.unwrap_err()}")
+    _write(
+        f"Updated {len(lights)} lights with {report.requests} requests, {len(report.partial)} partially, "
+        f"{len(report.failed)} failed."
+    )
+
+
+def load_script(path: Path) -> list[dict[str, Any]]:
+    """Load a script of timed commands from a JSON or YAML file.
+
+    A script is a list of steps, or a mapping with the list of steps under "steps". Every step selects lights like the
+    options of `set` do, with "name", "archetype", "group", "id" or "all", and changes them with "on", "brightness",
+    "rgb", "xy", "mirek", "kelvin" and "duration". The step is sent "at" a number of seconds after the script started.
+    """
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in {".yaml", ".yml"}:
+        try:
+            import yaml
+        except ImportError as err:
+            raise CommandError("YAML scripts require pyyaml, install it with the yaml extra.") from err
+        script = yaml.safe_load(text)
+    else:
+        script = json.loads(text)
+
+    steps = script.get("steps") if isinstance(script, dict) else script
+    if not isinstance(steps, list) or not all(isinstance(step, dict) for step in steps):
+        raise CommandError(f"{path} should hold a list of steps.")
+    for index, step in enumerate(steps):
+        if True in step:
+            # YAML reads an unquoted `on` key as true.
+            step["on"] = step.pop(True)
+        unknown = set(step) - SELECTORS - CHANGES - {"at"}
+        if unknown:
+            raise CommandError(f"Step {index} has unknown keys: {', '.join(sorted(map(str, unknown)))}.")
+    return sorted(steps, key=lambda step: step.get("at", 0.0))
+
+
+def command_run(network: Network, args: argparse.Namespace) -> None:
+    """Replay a script of timed commands.
+
+    The requests of a step are queued without waiting for the answers, so a slow step does not delay the next one.
+    """
+    steps = [(step, select_lights(network, step), build_changes(step)) for step in load_script(args.script)]
+    futures: list[Future[ResourceResult]] = []
+    skipped = 0
+    started_at = time.monotonic()
+    for step, lights, changes in steps:
+        time.sleep(max(0.0, started_at + step.get("at", 0.0) - time.monotonic()))
+        requests, results = network.plan_apply({light: changes for light in lights})
+        skipped += sum(item.result.is_err() for item in results.values())
+        futures.extend(network.bridge.scheduler.submit(body=body, endpoint=endpoint) for endpoint, body, _ in requests)
+    succeeded, failed = _wait(futures)
+    elapsed = time.monotonic() - started_at
+    _write(
+        f"Ran {len(steps)} steps with {succeeded + failed} requests in {elapsed:.1f} s, {failed} failed, "
+        f"{skipped} lights skipped."
+    )
+
+
+class _LatencyRecorder(Instrumentation):
+    """Instrumentation keeping the latency and status code of every request."""
+
+    def __init__(self) -> None:
+        """Initialize empty recordings."""
+        self.latencies: list[float] = []
+        self.status_codes: Counter[int | None] = Counter()
+        self._lock = threading.Lock()
+
+    def on_response(self, request: RequestRecord) -> None:
+        """Record the latency and status code."""
+        with self._lock:
+            self.latencies.append(request.elapsed)
+            self.status_codes[request.status_code] += 1
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Get the value below which the fraction of the values falls, using the nearest rank."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def command_bench(network: Network, args: argparse.Namespace) -> None:
+    """Send updates to the selected lights one by one, and report their latency and the sustained rate.
+
+    The updates go through the command scheduler at the rate limits of the bridge, which can be raised with
+    `--light-rate` to find how many commands the bridge sustains before throttling. The latency of a request is the
+    time the bridge took to answer it, and the latency of a command also includes the time it waited in the scheduler.
+    """
+    lights = select_lights(network, vars(args), required=False)
+    if not lights:
+        raise CommandError("No lights selected.")
+
+    recorder = _LatencyRecorder()
+    network.bridge.instrument(recorder)
+    scheduler = network.bridge.scheduler
+    command_latencies: list[float] = []
+
+    def submit(index: int) -> "Future[ResourceResult]":
+        light = lights[index % len(lights)]
+        # Alternating brightness, so every command changes the light.
+        body = {"dimming": {"brightness": 40.0 if index // len(lights) % 2 else 60.0}}
+        submitted_at = time.monotonic()
+        # The latency is recorded before the command counts as answered, so all of them are in when the wait is over.
+        answered: Future[ResourceResult] = Future()
+
+        def record(future: "Future[ResourceResult]") -> None:
+            command_latencies.append(time.monotonic() - submitted_at)
+            answered.set_result(future.result())
+
+        scheduler.submit(body=body, endpoint=light.endpoint).add_done_callback(record)
+        return answered
+
+    started_at = time.monotonic()
+    succeeded, failed = _wait([submit(index) for index in range(args.count)])
+    elapsed = time.monotonic() - started_at
+    network.bridge.instrument(None)
+
+    statuses = ", ".join(
+        f"{status or 'error'}: {count}" for status, count in sorted(recorder.status_codes.items(), key=str)
+    )
+    _write(f"Commands:         {args.count} to {len(lights)} lights, {failed} failed")
+    _write(f"Requests:         {len(recorder.latencies)} ({statuses})")
+    _write(f"Duration:         {elapsed:.2f} s")
+    _write(f"Sustained rate:   {succeeded / elapsed:.1f} commands/s")
+    for label, latencies in (("Request latency", recorder.latencies), ("Command latency", command_latencies)):
+        _write(
+            f"{label + ':':<17} p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+            f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, max {max(latencies, default=0.0) * 1000:.1f} ms"
+        )
+
+
+def _add_selection(parser: argparse.ArgumentParser) -> None:
+    """Add the options selecting lights."""
+    parser.add_argument("--name", help="the name of the light, not case sensitive")
+    parser.add_argument("--archetype", help='the archetype of the lights, for example "sultan_bulb"')
+    parser.add_argument("--group", action="append", help="the name or id of a room or zone, can be repeated")
+    parser.add_argument("--id", action="append", help="the id of a light, can be repeated")
+    parser.add_argument("--all", action="store_true", help="select all lights")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the parser of the command line."""
+    parser = argparse.ArgumentParser(prog="hue", description="Control the lights of a Philips Hue bridge.")
+    parser.add_argument("--ip-address", default=os.getenv("IP_ADDRESS"), help="the address of the bridge")
+    parser.add_argument("--client-key", default=os.getenv("CLIENT_KEY", ""), help="the client key of the application")
+    parser.add_argument("--user-name", default=os.getenv("USER_NAME", ""), help="the user name of the application")
+    parser.add_argument("--snapshot", type=Path, help="load the network from a snapshot instead of the bridge")
+    parser.add_argument("--emulate", type=int, metavar="LIGHTS", help="use an emulated bridge with this many lights")
+    parser.add_argument("--emulate-latency", type=float, default=0.0, help="seconds the emulator delays requests")
+    parser.add_argument("--light-rate", type=float, help="light commands per second sent to the bridge")
+    parser.add_argument("--group-rate", type=float, help="group commands per second sent to the bridge")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    lights = commands.add_parser("lights", help="list lights")
+    _add_selection(lights)
+    lights.add_argument("--json", action="store_true", help="write the lights as JSON")
+    lights.set_defaults(handler=command_lights)
+
+    update = commands.add_parser("set", help="send one update to many lights")
+    _add_selection(update)
+    power = update.add_mutually_exclusive_group()
+    power.add_argument("--on", dest="on", action="store_const", const=True, help="turn the lights on")
+    power.add_argument("--off", dest="on", action="store_const", const=False, help="turn the lights off")
+    update.add_argument("--brightness", type=float, help="brightness in percent")
+    update.add_argument("--rgb", type=_rgb, metavar="R,G,B", help="color as red, green and blue from 0 to 255")
+    update.add_argument("--xy", type=_pair, metavar="X,Y", help="color as xy-values")
+    update.add_argument("--mirek", type=int, help="color temperature in mirek")
+    update.add_argument("--kelvin", type=int, help="color temperature in kelvin")
+    update.add_argument("--duration", type=int, help="transition time in milliseconds")
+    update.set_defaults(handler=command_set)
+
+    run = commands.add_parser("run", help="replay a JSON or YAML script of timed commands")
+    run.add_argument("script", type=Path, help="the script to run")
+    run.set_defaults(handler=command_run)
+
+    bench = commands.add_parser("bench", help="measure command latency and throughput")
+    _add_selection(bench)
+    bench.add_argument("--count", type=int, default=200, help="the number of commands to send")
+    bench.set_defaults(handler=command_bench)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the command line, returns the exit status."""
+    load_dotenv()  # take environment variables from .env.
+    args = build_parser().parse_args(argv)
+    try:
+        with connect(args) as network:
+            args.handler(network, args)
+    except CommandError as err:
+        sys.stderr.write(f"hue: {err}\n")
+        return 1
+    return 0
@@ -0,0 +1,405 @@
+"""An in-process stand-in for the CLIP v2 API of a bridge, used for load testing and benchmarks.
+
+The emulator is an httpx transport, so a bridge using it goes through the whole request path of the library without
+any network traffic:
+
+    emulator = BridgeEmulator.with_lights(100, latency=0.01, jitter=0.005)
+    with emulator.bridge() as bridge:
+        network = Network.fetch(bridge)
+"""
+import asyncio
+import itertools
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from datetime import UTC, datetime
+from typing import Any
+
+import httpx
+
+from .bridge import AsyncHueBridge, HueBridge
+from .resource.eventstream import EVENTSTREAM_PATH
+from .resource.requests import MULTI_VALUE_STATUS, RESOURCE_PATH
+from .resource.scheduler import TokenBucket
+
+
+HTTP_OK = 200
+HTTP_FORBIDDEN = 403
+HTTP_NOT_FOUND = 404
+HTTP_TOO_MANY_REQUESTS = 429
+HTTP_SERVICE_UNAVAILABLE = 503
+
+# Attributes that are accepted in an update even though they are not part of the state of the resource.
+TRANSIENT_ATTRIBUTES = frozenset({"dynamics", "alert", "action"})
+# Attributes a grouped light passes on to its lights, without having them itself.
+GROUPED_LIGHT_ATTRIBUTES = frozenset({"color", "color_temperature"})
+KEEPALIVE_INTERVAL = 0.5
+# Bridge settings with rates high enough that the command scheduler never holds back a command, so load tests and
+# benchmarks against the emulator measure the library instead of waiting for the rate limits.
+UNLIMITED_RATES = {"light_commands_per_second": 1_000_000.0, "group_commands_per_second": 1_000_000.0}
+
+GAMUT_C = {
+    "red": {"x": 0.6915, "y": 0.3083},
+    "green": {"x": 0.17, "y": 0.7},
+    "blue": {"x": 0.1532, "y": 0.0475},
+}
+
+MIREK_SCHEMA = {"mirek_minimum": 153, "mirek_maximum": 500}
+
+
+def synthetic_resources(light_count: int, lights_per_room: int = 10) -> list[dict[str, Any]]:
+    """Build the resources of a synthetic install with `light_count` lights, looking like the response of a bridge.
+
+    Every light has a device, the lights are spread over rooms of `lights_per_room` lights, every room and the bridge
+    home has a grouped light and every fifth light is white ambiance, with a color temperature but no color.
+    """
+    resources: list[dict[str, Any]] = []
+    rooms: list[str] = []
+    for room_index in range(0, light_count, lights_per_room):
+        room_id, grouped_light_id = str(uuid.uuid4()), str(uuid.uuid4())
+        devices: list[str] = []
+        for index in range(room_index, min(room_index + lights_per_room, light_count)):
+            device_id, light_id = str(uuid.uuid4()), str(uuid.uuid4())
+            devices.append(device_id)
+            resources.append(
+                {
+                    "id": device_id,
+                    "type": "device",
+                    "metadata": {"name": f"Light {index}", "archetype": "sultan_bulb"},
+                    "services": [{"rid": light_id, "rtype": "light"}],
+                }
+            )
+            light: dict[str, Any] = {
+                "id": light_id,
+                "id_v1": f"/lights/{index + 1}",
+                "type": "light",
+                "owner": {"rid": device_id, "rtype": "device"},
+                "metadata": {"name": f"Light {index}", "archetype": "sultan_bulb"},
+                "on": {"on": False},
+                "dimming": {"brightness": 100.0, "min_dim_level": 0.2},
+                "dimming_delta": {},
+                "dynamics": {"status": "none", "speed": 0.0},
+                "mode": "normal",
+            }
+            light["color_temperature"] = {"mirek": 366, "mirek_valid": True, "mirek_schema": MIREK_SCHEMA}
+            if index % 5:
+                light["color"] = {"xy": {"x": 0.4573, "y": 0.41}, "gamut": GAMUT_C, "gamut_type": "C"}
+            resources.append(light)
+        rooms.append(room_id)
+        resources.append(
+            {
+                "id": room_id,
+                "id_v1": f"/groups/{len(rooms)}",
+                "type": "room",
+                "children": [{"rid": device_id, "rtype": "device"} for device_id in devices],
+                "services": [{"rid": grouped_light_id, "rtype": "grouped_light"}],
+                "metadata": {"name": f"Room {len(rooms)}", "archetype": "living_room"},
+            }
+        )
+        resources.append(
+            {
+                "id": grouped_light_id,
+                "type": "grouped_light",
+                "owner": {"rid": room_id, "rtype": "room"},
+                "on": {"on": False},
+                "dimming": {"brightness": 100.0},
+            }
+        )
+
+    home_id, home_grouped_light_id = str(uuid.uuid4()), str(uuid.uuid4())
+    resources.append(
+        {
+            "id": home_id,
+            "type": "bridge_home",
+            "children": [{"rid": room_id, "rtype": "room"} for room_id in rooms],
+            "services": [{"rid": home_grouped_light_id, "rtype": "grouped_light"}],
+        }
+    )
+    resources.append(
+        {
+            "id": home_grouped_light_id,
+            "type": "grouped_light",
+            "owner": {"rid": home_id, "rtype": "bridge_home"},
+            "on": {"on": False},
+            "dimming": {"brightness": 100.0},
+        }
+    )
+    return resources
+
+
+def _merge_state(state: dict[str, Any], update: dict[str, Any]) -> None:
+    """Merge an update into the state of a resource, recursively and in place."""
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(state.get(key), dict):
+            _merge_state(state[key], value)
+        else:
+            state[key] = value
+
+
+def _response(status_code: int, data: list[Any] | None = None, errors: list[str] | None = None) -> httpx.Response:
+    """Build a response in the format of the CLIP v2 API."""
+    return httpx.Response(
+        status_code,
+        json={"errors": [{"description": error} for error in errors or []], "data": data or []},
+    )
+
+
+class _EventStreamBody(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Body of an event stream response, sending the events published by the emulator as server-sent events."""
+
+    def __init__(self, emulator: "BridgeEmulator") -> None:
+        """Subscribe to the events of the emulator."""
+        self.emulator = emulator
+        self.events: queue.Queue[bytes] = emulator.subscribe()
+        self.closed = False
+
+    def _next_chunk(self) -> bytes | None:
+        """Get the next event, None if there is none yet."""
+        try:
+            return self.events.get_nowait()
+        except queue.Empty:
+            return None
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Yield the events until the stream or the emulator is closed."""
+        yield b": hi\n\n"
+        while not self.closed and not self.emulator.closed:
+            try:
+                yield self.events.get(timeout=KEEPALIVE_INTERVAL)
+            except queue.Empty:
+                yield b": keepalive\n\n"
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """Yield the events until the stream or the emulator is closed."""
+        yield b": hi\n\n"
+        while not self.closed and not self.emulator.closed:
+            chunk = self._next_chunk()
+            if chunk is None:
+                await asyncio.sleep(0.01)
+                continue
+            yield chunk
+
+    def close(self) -> None:
+        """Unsubscribe from the events of the emulator."""
+        self.closed = True
+        self.emulator.unsubscribe(self.events)
+
+    async def aclose(self) -> None:
+        """Unsubscribe from the events of the emulator."""
+        self.close()
+
+
+class BridgeEmulator(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """An in-process stand-in for the CLIP v2 API of a bridge.
+
+    Serves the resources, applies updates of single resources and grouped lights and publishes the changes on the
+    event stream. An update with an attribute the resource does not have is partially applied and answered with a 207
+    multi-status, like the bridge does for example when setting the color of a white light.
+
+    Every request is delayed by `latency` plus up to `jitter` seconds. With `light_rate` and `group_rate` set, updates
+    beyond those rates per second are answered with 429, and `failure_rate` is the share of requests that are answered
+    with 503. The status codes of all responses are counted in `responses`.
+    """
+
+    def __init__(  # noqa: PLR0913 - The behavior of the emulator is configurable for load tests
+        self,
+        resources: list[dict[str, Any]] | None = None,
+        user_name: str = "emulator",
+        client_key: str = "00000000000000000000000000000000",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        light_rate: float | None = None,
+        group_rate: float | None = None,
+        failure_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the emulator.
+
+        Args:
+            resources (list[dict[str, Any]] | None, optional): The resources of the bridge. Defaults to no resources.
+            user_name (str, optional): The application key that requests must have. Defaults to "emulator".
+            client_key (str, optional): The client key of the application. Defaults to zeros.
+            latency (float, optional): Seconds every request is delayed. Defaults to 0.0.
+            jitter (float, optional): Largest number of seconds added randomly to the latency. Defaults to 0.0.
+            light_rate (float | None, optional): Updates per second accepted, excluding grouped lights. Defaults to
+                None, which means no limit.
+            group_rate (float | None, optional): Grouped light updates per second accepted. Defaults to None, which
+                means no limit.
+            failure_rate (float, optional): Share of requests failing with 503, between 0 and 1. Defaults to 0.0.
+            seed (int | None, optional): Seed of the random jitter and failures. Defaults to None.
+        """
+        self.resources = {resource["id"]: resource for resource in resources or []}
+        self.user_name = user_name
+        self.client_key = client_key
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.responses: Counter[int] = Counter()
+        self.closed = False
+        self._light_bucket = TokenBucket(rate=light_rate) if light_rate else None
+        self._group_bucket = TokenBucket(rate=group_rate) if group_rate else None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._subscribers: list[queue.Queue[bytes]] = []
+        self._event_ids = itertools.count()
+
+    @classmethod
+    def with_lights(cls, light_count: int, lights_per_room: int = 10, **kwargs: Any) -> "BridgeEmulator":
+        """Create an emulator with a synthetic install of `light_count` lights, see `synthetic_resources`."""
+        return cls(resources=synthetic_resources(light_count, lights_per_room), **kwargs)
+
+    def bridge(self, **settings: Any) -> HueBridge:
+        """Create a bridge sending its requests to the emulator."""
+        bridge = HueBridge(client_key=self.client_key, user_name=self.user_name, ip_address="emulator", **settings)
+        bridge.use_transport(self)
+        return bridge
+
+    def async_bridge(self, **settings: Any) -> AsyncHueBridge:
+        """Create an asyncio bridge sending its requests to the emulator."""
+        bridge = AsyncHueBridge(client_key=self.client_key, user_name=self.user_name, ip_address="emulator", **settings)
+        bridge.use_transport(self)
+        return bridge
+
+    def subscribe(self) -> "queue.Queue[bytes]":
+        """Get a queue receiving the events published from now on, encoded as server-sent events."""
+        events: queue.Queue[bytes] = queue.Queue()
+        with self._lock:
+            self._subscribers.append(events)
+        return events
+
+    def unsubscribe(self, events: "queue.Queue[bytes]") -> None:
+        """Stop publishing events to a queue."""
+        with self._lock:
+            if events in self._subscribers:
+                self._subscribers.remove(events)
+
+    def publish(self, event_type: str, data: list[dict[str, Any]]) -> None:
+        """Publish an event to all subscribers of the event stream."""
+        container = {
+            "creationtime": datetime.now(tz=UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "data": data,
+            "id": str(uuid.uuid4()),
+            "type": event_type,
+        }
+        message = f"id: {int(time.time())}:{next(self._event_ids)}\ndata: {json.dumps([container])}\n\n".encode()
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for events in subscribers:
+            events.put(message)
+
+    def shutdown(self) -> None:
+        """End all event streams, the clients using the emulator close it as a transport without ending them."""
+        self.closed = True
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Handle a request from a synchronous client."""
+        time.sleep(self._delay())
+        request.read()
+        return self._respond(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Handle a request from an asyncio client."""
+        await asyncio.sleep(self._delay())
+        await request.aread()
+        return self._respond(request)
+
+    def _delay(self) -> float:
+        """Get the number of seconds the response to a request is delayed."""
+        return self.latency + self._random.uniform(0, self.jitter)
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        """Route a request and count the status of the response."""
+        response = self._route(request)
+        self.responses[response.status_code] += 1
+        return response
+
+    def _route(self, request: httpx.Request) -> httpx.Response:  # noqa: PLR0911 - One response per kind of request
+        """Get the response to a request."""
+        if request.headers.get("hue-application-key") != self.user_name:
+            return _response(HTTP_FORBIDDEN, errors=["unauthorized user"])
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            return _response(HTTP_SERVICE_UNAVAILABLE, errors=["service unavailable"])
+
+        path = request.url.path
+        if path == EVENTSTREAM_PATH and request.method == "GET":
+            return httpx.Response(HTTP_OK, headers={"Content-Type": "text/event-stream"}, stream=_EventStreamBody(self))
+        if not path.startswith(RESOURCE_PATH):
+            return _response(HTTP_NOT_FOUND, errors=["resource not found"])
+
+        parts = [part for part in path.removeprefix(RESOURCE_PATH).split("/") if part]
+        if request.method == "GET" and len(parts) <= 2:  # noqa: PLR2004
+            return self._get(*parts)
+        if request.method == "PUT" and len(parts) == 2:  # noqa: PLR2004
+            return self._put(parts[0], parts[1], json.loads(request.content))
+        return _response(HTTP_NOT_FOUND, errors=["method or resource not found"])
+
+    def _get(self, resource_type: str | None = None, resource_id: str | None = None) -> httpx.Response:
+        """Get all resources, the resources of a type or a single resource."""
+        with self._lock:
+            if resource_id is not None:
+                resource = self.resources.get(resource_id)
+                if resource is None or resource["type"] != resource_type:
+                    return _response(HTTP_NOT_FOUND, errors=["resource not found"])
+                return _response(HTTP_OK, data=[json.loads(json.dumps(resource))])
+            data = [
+                resource
+                for resource in self.resources.values()
+                if resource_type is None or resource["type"] == resource_type
+            ]
+            return _response(HTTP_OK, data=json.loads(json.dumps(data)))
+
+    def _put(self, resource_type: str, resource_id: str, body: dict[str, Any]) -> httpx.Response:
+        """Update a resource, or all lights of a grouped light."""
+        bucket = self._group_bucket if resource_type == "grouped_light" else self._light_bucket
+        with self._lock:
+            if bucket is not None:
+                now = time.monotonic()
+                if bucket.delay(now) > 0:
+                    return _response(HTTP_TOO_MANY_REQUESTS, errors=["too many requests"])
+                bucket.consume(now)
+
+            resource = self.resources.get(resource_id)
+            if resource is None or resource["type"] != resource_type:
+                return _response(HTTP_NOT_FOUND, errors=["resource not found"])
+
+            targets = [resource, *self._grouped_lights_members(resource)]
+            errors = [
+                f"device ({resource_type}) does not support {key}, command (.{key}) may not have effect"
+                for key in body
+                if key not in resource
+                and key not in TRANSIENT_ATTRIBUTES
+                and not (resource_type == "grouped_light" and key in GROUPED_LIGHT_ATTRIBUTES)
+            ]
+            changes = []
+            for target in targets:
+                update = {key: value for key, value in body.items() if key in target}
+                if target is resource and "action" in body and resource_type == "entertainment_configuration":
+                    update["status"] = "active" if body["action"] == "start" else "inactive"
+                _merge_state(target, update)
+                if update:
+                    changes.append({"id": target["id"], "type": target["type"], **update})
+
+        if changes:
+            self.publish("update", changes)
+        data = [{"rid": resource_id, "rtype": resource_type}]
+        if errors:
+            return _response(MULTI_VALUE_STATUS, data=data, errors=errors)
+        return _response(HTTP_OK, data=data)
+
+    def _grouped_lights_members(self, resource: dict[str, Any]) -> list[dict[str, Any]]:
+        """Get the lights controlled by a grouped light, an empty list for other resources."""
+        if resource["type"] != "grouped_light":
+            return []
+        owner = self.resources.get(resource["owner"]["rid"])
+        if owner is None:
+            return []
+        lights = [item for item in self.resources.values() if item["type"] == "light"]
+        if owner["type"] == "bridge_home":
+            return lights
+        children = {child["rid"] for child in owner["children"]}
+        return [light for light in lights if light["id"] in children or light["owner"]["rid"] in children]
@@ -0,0 +1,99 @@
+import struct
+from collections.abc import Mapping
+from enum import IntEnum
+
+from pydantic import BaseModel
+from typing_extensions import TypedDict
+
+from ..groups.groups import ResourceIdentifier
+
+
+PROTOCOL_NAME = b"HueStream"
+PROTOCOL_VERSION = (2, 0)
+MAX_CHANNELS = 20
+MAX_COMPONENT = 0xFFFF
+
+# Protocol name, version, sequence id, 2 reserved bytes, color space and 1 reserved byte.
+HEADER = struct.Struct(">9sBBB2xB1x")
+# Channel id and three 16-bit color components.
+CHANNEL = struct.Struct(">BHHH")
+
+
+class ColorSpace(IntEnum):
+    """Color space of the colors in a frame."""
+
+    RGB = 0
+    XY = 1
+
+
+class EntertainmentMetadata(TypedDict):
+    """Meta data for an entertainment configuration."""
+
+    name: str
+
+
+class EntertainmentChannel(TypedDict):
+    """A channel of an entertainment configuration, the lights behind it all get the color of the channel."""
+
+    channel_id: int
+    position: dict[str, float]
+    members: list[dict[str, ResourceIdentifier | int]]
+
+
+class EntertainmentConfiguration(BaseModel):
+    """Basemodel for an entertainment configuration, the set of lights that colors are streamed to.
+
+    The status is "active" while a client is streaming to the configuration.
+    """
+
+    id: str  # noqa: A003 - This is the id from the bridge
+    id_v1: str | None = None
+    type: str  # noqa: A003 - This is the type from the bridge
+    metadata: EntertainmentMetadata
+    status: str
+    channels: list[EntertainmentChannel]
+
+    @property
+    def name(self) -> str:
+        """Get the name of the entertainment configuration."""
+        return self.metadata["name"]
+
+    @property
+    def endpoint(self) -> str:
+        """Get the endpoint used to start and stop streaming."""
+        return f"/entertainment_configuration/{self.id}"
+
+    @property
+    def channel_ids(self) -> list[int]:
+        """Get the ids of the channels."""
+        return [channel["channel_id"] for channel in self.channels]
+
+
+def encode_frame(
+    configuration_id: str,
+    colors: Mapping[int, tuple[float, float, float]],
+    sequence: int = 0,
+    color_space: ColorSpace = ColorSpace.RGB,
+) -> bytes:
+    """Encode the colors of the channels as a message of the entertainment streaming protocol.
+
+    Args:
+        configuration_id (str): The id of the entertainment configuration that is streamed to.
+        colors (Mapping[int, tuple[float, float, float]]): The color of each channel, by channel id. Red, green and
+            blue, or x, y and brightness, between 0 and 1.
+        sequence (int, optional): The sequence number of the message, it is not used by the bridge. Defaults to 0.
+        color_space (ColorSpace, optional): The color space of the colors. Defaults to ColorSpace.RGB.
+
+    Returns:
+        bytes: The message.
+    """
+    if len(colors) > MAX_CHANNELS:
+        raise ValueError(f"A frame can have at most {MAX_CHANNELS} channels.")
+
+    message = bytearray(HEADER.pack(PROTOCOL_NAME, *PROTOCOL_VERSION, sequence % 256, color_space))
+    message += configuration_id.encode("ascii")
+    for channel_id, color in colors.items():
+        message += CHANNEL.pack(
+            channel_id, *(round(min(1.0, max(0.0, component)) * MAX_COMPONENT) for component in color)
+        )
+    return bytes(message)
@@ -0,0 +1,341 @@
+import asyncio
+import socket
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from functools import partial
+from types import ModuleType, TracebackType
+from typing import TYPE_CHECKING, Any, Protocol, Self
+
+from loguru import logger
+
+from ..resource.scheduler import Priority
+from .entertainment import ColorSpace, EntertainmentConfiguration, encode_frame
+
+
+if TYPE_CHECKING:
+    from ..bridge import AsyncHueBridge, BaseHueBridge, HueBridge
+
+
+STREAMING_PORT = 2100
+PSK_CIPHER = "TLS-PSK-WITH-AES-128-GCM-SHA256"
+
+
+class DatagramTransport(Protocol):
+    """A connection frames are sent through, one datagram per frame."""
+
+    def send(self, data: bytes) -> Any:
+        """Send a datagram."""
+
+    def close(self) -> None:
+        """Close the connection."""
+
+
+def _mbedtls() -> ModuleType:
+    """Import the TLS module of python-mbedtls, which is only needed for streaming."""
+    try:
+        from mbedtls import tls
+    except ImportError as err:
+        raise ImportError("Streaming requires python-mbedtls, install it with the entertainment extra.") from err
+    return tls
+
+
+class DTLSTransport:
+    """DTLS connection to the streaming port of the bridge.
+
+    The bridge only accepts DTLS 1.2 with a pre-shared key, the identity is the user name of the application and the
+    key is the client key, both of which are returned by `get_access_token`.
+    """
+
+    def __init__(  # noqa: PLR0913 - The connection is configurable for bridges on other ports
+        self, host: str, identity: str, psk: bytes, port: int = STREAMING_PORT, handshake_timeout: float = 5.0
+    ) -> None:
+        """Connect to the bridge, blocking until the handshake is done.
+
+        Args:
+            host (str): The ip-address of the bridge.
+            identity (str): The identity of the pre-shared key, the user name of the application.
+            psk (bytes): The pre-shared key, the client key of the application.
+            port (int, optional): The streaming port. Defaults to STREAMING_PORT.
+            handshake_timeout (float, optional): Seconds to wait for the handshake. Defaults to 5.0.
+        """
+        tls = _mbedtls()
+        configuration = tls.DTLSConfiguration(
+            pre_shared_key=(identity, psk),
+            ciphers=[PSK_CIPHER],
+            lowest_supported_version=tls.DTLSVersion.DTLSv1_2,
+            validate_certificates=False,
+        )
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.settimeout(handshake_timeout)
+        self._socket = tls.ClientContext(configuration).wrap_socket(sock, server_hostname=None)
+        self._socket.connect((host, port))
+
+        deadline = time.monotonic() + handshake_timeout
+        while True:
+            try:
+                self._socket.do_handshake()
+            except (tls.WantReadError, tls.WantWriteError):
+                if time.monotonic() > deadline:
+                    self._socket.close()
+                    raise TimeoutError("The DTLS handshake with the bridge timed out.") from None
+            else:
+                return
+
+    @classmethod
+    def for_bridge(cls, bridge: "BaseHueBridge") -> "DTLSTransport":
+        """Connect to the streaming port of a bridge, using its credentials."""
+        return cls(host=bridge.ip_address, identity=bridge.user_name, psk=bytes.fromhex(bridge.client_key))
+
+    def send(self, data: bytes) -> Any:
+        """Send a datagram."""
+        return self._socket.send(data)
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._socket.close()
+
+
+@dataclass
+class StreamMetrics:
+    """Metrics of an entertainment stream.
+
+    A frame is dropped when the color of a channel is replaced by a newer one before it was sent, and a tick is skipped
+    when the stream falls behind its rate.
+    """
+
+    frames_sent: int = 0
+    frames_dropped: int = 0
+    ticks_skipped: int = 0
+    send_errors: int = 0
+
+
+class BaseEntertainmentStream:
+    """Streaming of colors to the channels of an entertainment configuration, shared by the threaded and asyncio stream.
+
+    Colors are sent as frames at a fixed rate over UDP, bypassing the rate limits of the REST API. Only the latest
+    frame is kept: setting colors replaces a frame that has not been sent yet instead of queueing behind it, so the
+    lights never lag behind. The latest frame is sent again on every tick, since datagrams can be lost and the bridge
+    ends the stream when it does not receive anything for a while. When the stream falls behind, the missed ticks are
+    skipped instead of being sent in a burst.
+    """
+
+    def __init__(
+        self,
+        configuration: EntertainmentConfiguration,
+        transport_factory: Callable[[], DatagramTransport],
+        rate: float = 50.0,
+        color_space: ColorSpace = ColorSpace.RGB,
+    ) -> None:
+        """Initialize the stream.
+
+        Args:
+            configuration (EntertainmentConfiguration): The entertainment configuration to stream to.
+            transport_factory (Callable[[], DatagramTransport]): Function connecting to the streaming port.
+            rate (float, optional): Frames per second, the bridge forwards about 25 per second to the lights.
+                Defaults to 50.0.
+            color_space (ColorSpace, optional): The color space of the colors. Defaults to ColorSpace.RGB.
+        """
+        self.configuration = configuration
+        self.transport_factory = transport_factory
+        self.interval = 1.0 / rate
+        self.color_space = color_space
+        self.metrics = StreamMetrics()
+        self._colors: dict[int, tuple[float, float, float]] = {}
+        self._pending: set[int] = set()
+        self._sequence = 0
+        self._next_at = 0.0
+        self._transport: DatagramTransport | None = None
+
+    def set_colors(self, colors: Mapping[int, tuple[float, float, float]]) -> None:
+        """Set the colors of channels, by channel id, in the next frame. Channels that are not set keep their color.
+
+        The colors are red, green and blue, or x, y and brightness, between 0 and 1 depending on the color space.
+        """
+        if not self._pending.isdisjoint(colors):
+            self.metrics.frames_dropped += 1
+        # The colors are replaced rather than updated in place, so a frame being encoded is never modified.
+        self._colors = {**self._colors, **colors}
+        self._pending = self._pending.union(colors)
+
+    def set_rgb_color(self, channel_id: int, rgb: dict[str, int]) -> None:
+        """Set the color of a channel in the next frame.
+
+        Args:
+            channel_id (int): The id of the channel.
+            rgb (dict[str, int]): A dict with the rgb-values. For example {"red": 255, "green": 0, "blue": 0}.
+        """
+        if self.color_space != ColorSpace.RGB:
+            raise ValueError("The stream does not use the RGB color space.")
+        self.set_colors({channel_id: (rgb["red"] / 255, rgb["green"] / 255, rgb["blue"] / 255)})
+
+    def _send_frame(self) -> None:
+        """Send the latest frame."""
+        if self._transport is None:
+            return
+        frame = encode_frame(self.configuration.id, self._colors, self._sequence, self.color_space)
+        self._pending = set()
+        try:
+            self._transport.send(frame)
+        except OSError as err:
+            self.metrics.send_errors += 1
+            logger.warning(f"Failed to send a frame to the bridge: {err!r}")
+            return
+        self._sequence += 1
+        self.metrics.frames_sent += 1
+
+    def _tick(self, now: float) -> float:
+        """Send the latest frame if it is time to, returns the number of seconds until the next tick."""
+        if now < self._next_at:
+            return self._next_at - now
+
+        self._send_frame()
+        self._next_at += self.interval
+        if self._next_at <= now:
+            missed = int((now - self._next_at) / self.interval) + 1
+            self.metrics.ticks_skipped += missed
+            self._next_at += missed * self.interval
+        return self._next_at - now
+
+
+class EntertainmentStream(BaseEntertainmentStream):
+    """Entertainment stream sending the frames from a background thread.
+
+    Use it as a context manager, or call `start()` and `stop()`.
+    """
+
+    def __init__(  # noqa: PLR0913 - The settings are passed on to the base stream
+        self,
+        bridge: "HueBridge",
+        configuration: EntertainmentConfiguration,
+        rate: float = 50.0,
+        color_space: ColorSpace = ColorSpace.RGB,
+        transport_factory: Callable[[], DatagramTransport] | None = None,
+    ) -> None:
+        """Initialize the stream, the transport defaults to a DTLS connection to the bridge."""
+        super().__init__(
+            configuration=configuration,
+            transport_factory=transport_factory or partial(DTLSTransport.for_bridge, bridge),
+            rate=rate,
+            color_space=color_space,
+        )
+        self.bridge = bridge
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start streaming on the bridge, connect to it and start sending frames."""
+        result = self.bridge.update_resource(
+            body={"action": "start"}, endpoint=self.configuration.endpoint, priority=Priority.HIGH
+        )
+        if result.is_err():
+            raise result.unwrap_err()
+
+        self._transport = self.transport_factory()
+        self._stopped.clear()
+        self._next_at = time.monotonic()
+        self._thread = threading.Thread(target=self.run, name="hue-entertainment", daemon=True)
+        self._thread.start()
+
+    def run(self) -> None:
+        """Send frames at the rate of the stream until stopped."""
+        while not self._stopped.is_set():
+            self._stopped.wait(self._tick(time.monotonic()))
+
+    def stop(self) -> None:
+        """Stop sending frames, close the connection and stop streaming on the bridge."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        self.bridge.update_resource(
+            body={"action": "stop"}, endpoint=self.configuration.endpoint, priority=Priority.HIGH
+        )
+
+    def __enter__(self) -> Self:
+        """Start streaming when entering the runtime context."""
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop streaming when leaving the runtime context."""
+        self.stop()
+
+
+class AsyncEntertainmentStream(BaseEntertainmentStream):
+    """Entertainment stream sending the frames from an asyncio task.
+
+    Use it as an async context manager, or call `start()` and `stop()`.
+    """
+
+    def __init__(  # noqa: PLR0913 - The settings are passed on to the base stream
+        self,
+        bridge: "AsyncHueBridge",
+        configuration: EntertainmentConfiguration,
+        rate: float = 50.0,
+        color_space: ColorSpace = ColorSpace.RGB,
+        transport_factory: Callable[[], DatagramTransport] | None = None,
+    ) -> None:
+        """Initialize the stream, the transport defaults to a DTLS connection to the bridge."""
+        super().__init__(
+            configuration=configuration,
+            transport_factory=transport_factory or partial(DTLSTransport.for_bridge, bridge),
+            rate=rate,
+            color_space=color_space,
+        )
+        self.bridge = bridge
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        """Start streaming on the bridge, connect to it and start sending frames."""
+        result = await self.bridge.update_resource(
+            body={"action": "start"}, endpoint=self.configuration.endpoint, priority=Priority.HIGH
+        )
+        if result.is_err():
+            raise result.unwrap_err()
+
+        # The handshake blocks, so it is done in a thread.
+        self._transport = await asyncio.to_thread(self.transport_factory)
+        self._next_at = time.monotonic()
+        self._task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        """Send frames at the rate of the stream until cancelled."""
+        while True:
+            await asyncio.sleep(self._tick(time.monotonic()))
+
+    async def stop(self) -> None:
+        """Stop sending frames, close the connection and stop streaming on the bridge."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        await self.bridge.update_resource(
+            body={"action": "stop"}, endpoint=self.configuration.endpoint, priority=Priority.HIGH
+        )
+
+    async def __aenter__(self) -> Self:
+        """Start streaming when entering the runtime context."""
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop streaming when leaving the runtime context."""
+        await self.stop()
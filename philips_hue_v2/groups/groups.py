@@ -0,0 +1,64 @@
+from typing import Any, NotRequired
+
+from pydantic import BaseModel
+from typing_extensions import TypedDict
+
+
+class ResourceIdentifier(TypedDict):
+    """Reference to another resource."""
+
+    rid: str
+    rtype: str
+
+
+class GroupMetadata(TypedDict):
+    """Meta data for a group."""
+
+    name: str
+    archetype: NotRequired[str]
+
+
+class Group(BaseModel):
+    """Basemodel for a group of resources, i.e. a room, a zone or the bridge home.
+
+    Rooms have the devices owning the lights as children, zones have the lights themselves and the bridge home has all
+    rooms and the devices that are not part of a room.
+    """
+
+    id: str  # noqa: A003 - This is the id from the bridge
+    id_v1: str | None = None
+    type: str  # noqa: A003 - This is the type from the bridge
+    children: list[ResourceIdentifier]
+    services: list[ResourceIdentifier]
+    metadata: GroupMetadata | None = None
+
+    @property
+    def name(self) -> str:
+        """Get the name of the group, the bridge home has no name and uses its type instead."""
+        if self.metadata is None:
+            return self.type
+        return self.metadata["name"]
+
+    @property
+    def grouped_light_id(self) -> str | None:
+        """Get the id of the grouped light controlling all the lights in the group."""
+        for service in self.services:
+            if service["rtype"] == "grouped_light":
+                return service["rid"]
+        return None
+
+
+class GroupedLight(BaseModel):
+    """Basemodel for a grouped light resource, controlling all lights of a room, a zone or the bridge home at once."""
+
+    id: str  # noqa: A003 - This is the id from the bridge
+    id_v1: str | None = None
+    owner: ResourceIdentifier
+    on: dict[str, bool] | None = None
+    dimming: dict[str, float] | None = None
+    alert: dict[str, Any] | None = None
+
+    @property
+    def endpoint(self) -> str:
+        """Get the endpoint used to update the grouped light."""
+        return f"/grouped_light/{self.id}"
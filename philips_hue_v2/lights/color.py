@@ -8,10 +8,28 @@ https://github.com/benknight/hue-python-rgb-converter/
 
 A lot of noqa is used here, primarily to adhere to the standard naming used in the CIE1931 standard.
 This might be migrated to the colour-package sometime: https://github.com/colour-science/colour
+
+The batch conversions convert many colors at once with NumPy, which is an optional dependency installed with the
+`numpy` extra. They follow the exact same steps as the conversions of a single color, so the results are the same up
+to floating point rounding. NumPy is also used to build an `RGBLookupTable`, which trades some precision for turning a
+conversion into a single table lookup. The lookup tables are opt-in, the conversions are exact unless a converter is
+given a table.
+
+Color temperatures are converted to x and y coordinates on the Planckian locus, the colors of a black body, with a
+table computed once when the module is imported. Hue lights set color temperatures in mirek, a million divided by the
+temperature in kelvin, in whole steps, so the table holds every whole mirek value and a conversion is a lookup.
 """
 import math
 import random
 from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
 
 
 __version__ = "0.5.1"
@@ -63,6 +81,34 @@ def get_gamut_from_str(gamut_str: str) -> Gamut:
     raise ValueError
 
 
+@cache
+def get_converter(gamut_str: str) -> "Converter":
+    """Gets the shared converter for the provided gamut string, so the gamut constants are only computed once.
+
+    The shared converters convert exactly, unless a lookup table was set with `use_lookup_table`.
+    """
+    return Converter(gamut=get_gamut_from_str(gamut_str))
+
+
+def use_lookup_table(gamut_str: str, lookup_table: "RGBLookupTable | None") -> None:
+    """Make every light with the gamut convert rgb-values with a lookup table, or convert exactly again with None.
+
+    The table must be built for the same gamut, see `RGBLookupTable` for the precision it trades.
+    """
+    get_converter(gamut_str).lookup_table = lookup_table
+
+
+def srgb_to_linear(value: float) -> float:
+    """Applies the sRGB gamma correction to a color component between 0 and 1."""
+    if value > 0.04045:  # noqa: PLR2004
+        return ((value + 0.055) / (1.0 + 0.055)) ** 2.4
+    return value / 12.92
+
+
+# Gamma corrected value of every 8-bit color component.
+SRGB_TO_LINEAR = tuple(srgb_to_linear(value / 255.0) for value in range(256))
+
+
 def get_light_gamut_for_model(model_id: str) -> Gamut:
     """Gets the correct color gamut for the provided model id.
 
@@ -96,6 +142,15 @@ def get_light_gamut_for_model(model_id: str) -> Gamut:
     raise ValueError
 
 
+def _numpy() -> ModuleType:
+    """Import NumPy, which is only needed for the batch conversions."""
+    try:
+        import numpy
+    except ImportError as err:
+        raise ImportError("The batch conversions require NumPy, install it with the numpy extra.") from err
+    return numpy
+
+
 class ColorHelper:
     """Class with a lot of helper function to convert colors between RGB and CIE1931."""
 
@@ -110,6 +165,10 @@ class ColorHelper:
         self.red = gamut[0]
         self.lime = gamut[1]
         self.blue = gamut[2]
+        # The edges of the gamut triangle from the red corner, used for every point in reach check.
+        self.v1 = XYPoint(self.lime.x - self.red.x, self.lime.y - self.red.y)
+        self.v2 = XYPoint(self.blue.x - self.red.x, self.blue.y - self.red.y)
+        self.v1_cross_v2 = self.cross_product(self.v1, self.v2)
 
     def hex_to_red(self, hex_value: str) -> int:
         """Parses a valid hex color string and returns the Red RGB integer value."""
@@ -135,18 +194,21 @@ class ColorHelper:
         """Return a random Integer in the range of 0 to 255, representing an RGB color value."""
         return random.randrange(0, 256)  # noqa: S311
 
+    def linearize(self, value: int) -> float:
+        """Gamma corrects an RGB integer value, using the precomputed table for 8-bit values."""
+        if isinstance(value, int) and 0 <= value <= 255:  # noqa: PLR2004
+            return SRGB_TO_LINEAR[value]
+        return srgb_to_linear(value / 255.0)
+
     def cross_product(self, p1: XYPoint, p2: XYPoint) -> float:
         """Returns the cross product of two XYPoints."""
         return p1.x * p2.y - p1.y * p2.x
 
     def check_point_in_lamps_reach(self, p: XYPoint) -> bool:
         """Check if the provided XYPoint can be recreated by a Hue lamp."""
-        v1 = XYPoint(self.lime.x - self.red.x, self.lime.y - self.red.y)
-        v2 = XYPoint(self.blue.x - self.red.x, self.blue.y - self.red.y)
-
         q = XYPoint(p.x - self.red.x, p.y - self.red.y)
-        s = self.cross_product(q, v2) / self.cross_product(v1, v2)
-        t = self.cross_product(v1, q) / self.cross_product(v1, v2)
+        s = self.cross_product(q, self.v2) / self.v1_cross_v2
+        t = self.cross_product(self.v1, q) / self.v1_cross_v2
 
         return (s >= 0.0) and (t >= 0.0) and (s + t <= 1.0)  # noqa: PLR2004
 
@@ -223,25 +285,9 @@ class ColorHelper:
 
     def get_xy_point_from_rgb(self, red_i: int, green_i: int, blue_i: int) -> XYPoint:
         """Get XYPoint representing the closest available CIE 1931 coordinates based on the RGB input values."""
-        red = red_i / 255.0
-        green = green_i / 255.0
-        blue = blue_i / 255.0
-
-        r = (
-            ((red + 0.055) / (1.0 + 0.055)) ** 2.4
-            if (red > 0.04045)  # noqa: PLR2004
-            else (red / 12.92)
-        )
-        g = (
-            ((green + 0.055) / (1.0 + 0.055)) ** 2.4
-            if (green > 0.04045)  # noqa: PLR2004
-            else (green / 12.92)
-        )
-        b = (
-            ((blue + 0.055) / (1.0 + 0.055)) ** 2.4
-            if (blue > 0.04045)  # noqa: PLR2004
-            else (blue / 12.92)
-        )
+        r = self.linearize(red_i)
+        g = self.linearize(green_i)
+        b = self.linearize(blue_i)
 
         X = r * 0.664511 + g * 0.154324 + b * 0.162028  # noqa: N806
         Y = r * 0.283881 + g * 0.668433 + b * 0.047685  # noqa: N806
@@ -308,13 +354,132 @@ class ColorHelper:
         # Convert the RGB values to your color object The rgb values from the above formulas are between 0.0 and 1.0.
         return (r, g, b)
 
+    def check_points_in_lamps_reach(self, x: "npt.NDArray[Any]", y: "npt.NDArray[Any]") -> "npt.NDArray[Any]":
+        """Batch version of `check_point_in_lamps_reach`, for arrays of x and y coordinates."""
+        qx = x - self.red.x
+        qy = y - self.red.y
+        s = (qx * self.v2.y - qy * self.v2.x) / self.v1_cross_v2
+        t = (self.v1.x * qy - self.v1.y * qx) / self.v1_cross_v2
+
+        return (s >= 0.0) & (t >= 0.0) & (s + t <= 1.0)  # noqa: PLR2004
+
+    def get_closest_points_to_line(
+        self,
+        A: XYPoint,  # noqa: N803
+        B: XYPoint,  # noqa: N803
+        x: "npt.NDArray[Any]",
+        y: "npt.NDArray[Any]",
+    ) -> tuple["npt.NDArray[Any]", "npt.NDArray[Any]"]:
+        """Batch version of `get_closest_point_to_line`, for arrays of x and y coordinates."""
+        np = _numpy()
+        AB = XYPoint(B.x - A.x, B.y - A.y)  # noqa: N806
+        ab2 = AB.x * AB.x + AB.y * AB.y
+        ap_ab = (x - A.x) * AB.x + (y - A.y) * AB.y
+        t = np.clip(ap_ab / ab2, 0.0, 1.0)
+
+        return A.x + AB.x * t, A.y + AB.y * t
+
+    def get_closest_points_to_points(
+        self, x: "npt.NDArray[Any]", y: "npt.NDArray[Any]"
+    ) -> tuple["npt.NDArray[Any]", "npt.NDArray[Any]"]:
+        """Batch version of `get_closest_point_to_point`, for arrays of x and y coordinates."""
+        np = _numpy()
+        closest_x, closest_y = self.get_closest_points_to_line(self.red, self.lime, x, y)
+        lowest = np.sqrt((x - closest_x) * (x - closest_x) + (y - closest_y) * (y - closest_y))
+        for A, B in ((self.blue, self.red), (self.lime, self.blue)):  # noqa: N806
+            px, py = self.get_closest_points_to_line(A, B, x, y)
+            distance = np.sqrt((x - px) * (x - px) + (y - py) * (y - py))
+            closer = distance < lowest
+            lowest = np.where(closer, distance, lowest)
+            closest_x = np.where(closer, px, closest_x)
+            closest_y = np.where(closer, py, closest_y)
+
+        return closest_x, closest_y
+
+    def get_xy_points_from_rgb(self, rgb: "npt.ArrayLike") -> "npt.NDArray[Any]":
+        """Batch version of `get_xy_point_from_rgb`.
+
+        Args:
+            rgb (npt.ArrayLike): RGB values between 0 and 255, with shape (..., 3).
+
+        Returns:
+            npt.NDArray: The x and y coordinates, with shape (..., 2). Black has no color and gives NaN.
+        """
+        np = _numpy()
+        linear = np.asarray(rgb, dtype=np.float64) / 255.0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            linear = np.where(
+                linear > 0.04045,  # noqa: PLR2004
+                ((linear + 0.055) / (1.0 + 0.055)) ** 2.4,
+                linear / 12.92,
+            )
+            r, g, b = linear[..., 0], linear[..., 1], linear[..., 2]
+
+            X = r * 0.664511 + g * 0.154324 + b * 0.162028  # noqa: N806
+            Y = r * 0.283881 + g * 0.668433 + b * 0.047685  # noqa: N806
+            Z = r * 0.000088 + g * 0.072310 + b * 0.986039  # noqa: N806
+
+            cx = X / (X + Y + Z)
+            cy = Y / (X + Y + Z)
+
+            # Move the colors that are out of reach of the lamps to the closest color within reach.
+            in_reach = self.check_points_in_lamps_reach(cx, cy)
+            closest_x, closest_y = self.get_closest_points_to_points(cx, cy)
+
+        return np.stack((np.where(in_reach, cx, closest_x), np.where(in_reach, cy, closest_y)), axis=-1)
+
+    def get_rgb_from_xy_and_brightness_batch(self, xy: "npt.ArrayLike", bri: "npt.ArrayLike" = 1) -> "npt.NDArray[Any]":
+        """Batch version of `get_rgb_from_xy_and_brightness`.
+
+        Args:
+            xy (npt.ArrayLike): The x and y coordinates, with shape (..., 2).
+            bri (npt.ArrayLike, optional): The brightness, a single value or one for every color. Defaults to 1.
+
+        Returns:
+            npt.NDArray: The integer RGB values between 0 and 255, with shape (..., 3).
+        """
+        np = _numpy()
+        points = np.asarray(xy, dtype=np.float64)
+        x, y = points[..., 0], points[..., 1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            in_reach = self.check_points_in_lamps_reach(x, y)
+            closest_x, closest_y = self.get_closest_points_to_points(x, y)
+            x = np.where(in_reach, x, closest_x)
+            y = np.where(in_reach, y, closest_y)
+
+            Y = np.asarray(bri, dtype=np.float64)  # noqa: N806
+            X = (Y / y) * x  # noqa: N806
+            Z = (Y / y) * (1 - x - y)  # noqa: N806
+
+            rgb = np.stack(
+                (
+                    X * 1.656492 - Y * 0.354851 - Z * 0.255038,
+                    -X * 0.707196 + Y * 1.655397 + Z * 0.036152,
+                    X * 0.051713 - Y * 0.121364 + Z * 1.011530,
+                ),
+                axis=-1,
+            )
+            rgb = np.where(rgb <= 0.0031308, 12.92 * rgb, (1.0 + 0.055) * rgb ** (1.0 / 2.4) - 0.055)  # noqa: PLR2004
+
+        rgb = np.maximum(rgb, 0)
+        max_component = rgb.max(axis=-1, keepdims=True)
+        rgb = np.where(max_component > 1, rgb / max_component, rgb)
+        return (rgb * 255).astype(np.int64)
+
 
 class Converter:
     """A Converter class used to convert colors between RGB and CIE1931."""
 
-    def __init__(self, gamut: Gamut = GamutB):
-        """Initialize a Converter object."""
+    def __init__(self, gamut: Gamut = GamutB, lookup_table: "RGBLookupTable | None" = None):
+        """Initialize a Converter object.
+
+        Args:
+            gamut (Gamut, optional): The selected Gamut. Defaults to GamutB.
+            lookup_table (RGBLookupTable | None, optional): A lookup table built for the same gamut, used by
+                `rgb_to_xy` instead of converting the colors, except for dark colors. Defaults to None.
+        """
         self.color = ColorHelper(gamut)
+        self.lookup_table = lookup_table
 
     def hex_to_xy(self, h: str) -> tuple[float, float]:
         """Converts hexadecimal colors represented as a String to approximate CIE 1931 x and y coordinates."""
@@ -323,6 +488,8 @@ class Converter:
 
     def rgb_to_xy(self, red: int, green: int, blue: int) -> tuple[float, float]:
         """Converts red, green and blue integer values to approximate CIE 1931 x and y coordinates."""
+        if self.lookup_table is not None and max(red, green, blue) >= LOOKUP_MIN_COMPONENT:
+            return self.lookup_table.rgb_to_xy(red, green, blue)
         point = self.color.get_xy_point_from_rgb(red, green, blue)
         return (point.x, point.y)
 
@@ -336,9 +503,123 @@ class Converter:
         r, g, b = self.color.get_rgb_from_xy_and_brightness(x, y, bri)
         return (r, g, b)
 
+    def rgb_to_xy_batch(self, rgb: "npt.ArrayLike") -> "npt.NDArray[Any]":
+        """Converts an array of red, green and blue values with shape (..., 3) to x and y coordinates at once."""
+        return self.color.get_xy_points_from_rgb(rgb)
+
+    def xy_to_rgb_batch(self, xy: "npt.ArrayLike", bri: "npt.ArrayLike" = 1) -> "npt.NDArray[Any]":
+        """Converts an array of x and y coordinates with shape (..., 2) and brightness values to RGB values at once."""
+        return self.color.get_rgb_from_xy_and_brightness_batch(xy, bri)
+
     def get_random_xy_color(self) -> tuple[float, float]:
         """Returns the approximate CIE 1931 x,y coordinates by the supplied hexColor parameter or a random color."""
         r = self.color.random_rgb_value()
         g = self.color.random_rgb_value()
         b = self.color.random_rgb_value()
         return self.rgb_to_xy(r, g, b)
+
+
+# Colors whose brightest component is below this are converted exactly by a converter with a lookup table. The hue of
+# a dark color changes a lot between neighbouring values, so a cell of the table would cover very different colors.
+LOOKUP_MIN_COMPONENT = 64
+
+
+class RGBLookupTable:
+    """Lookup table with the x and y coordinates of every RGB color, quantized to `bits` bits per component.
+
+    Every cell holds the coordinates of the color in the middle of the cell, so with 8 bits every color is exact and
+    takes 128 MB, while the default of 7 bits takes 16 MB and 6 bits take 2 MB. The table is a NumPy array which can be
+    saved with `save` and memory-mapped by `load`, so building it is done only once and only the pages in use are read
+    from disk.
+
+    For colors whose brightest component is at least `LOOKUP_MIN_COMPONENT`, the coordinates are within 0.009 of the
+    exact conversion with 7 bits, and within 0.021 with 6 bits, in all three gamuts. Darker colors are converted
+    exactly by `Converter`, since their error in the table goes up to 0.4.
+    """
+
+    def __init__(self, table: "npt.NDArray[Any]") -> None:
+        """Initialize the lookup table from an array with shape (n, n, n, 2), where n is a power of two up to 256."""
+        size = table.shape[0]
+        if table.shape != (size, size, size, 2) or size > 256 or size & (size - 1):  # noqa: PLR2004
+            raise ValueError(f"Invalid lookup table shape: {table.shape}")
+        self.table = table
+        self.shift = 8 - size.bit_length() + 1
+
+    @classmethod
+    def build(cls, gamut: Gamut = GamutB, bits: int = 7) -> "RGBLookupTable":
+        """Build the lookup table for a gamut, using the batch conversion."""
+        np = _numpy()
+        shift = 8 - bits
+        values = np.minimum((np.arange(1 << bits) << shift) + ((1 << shift) >> 1), 255)
+        red, green, blue = np.meshgrid(values, values, values, indexing="ij")
+        table = Converter(gamut).rgb_to_xy_batch(np.stack((red, green, blue), axis=-1))
+        return cls(table.astype(np.float32))
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "RGBLookupTable":
+        """Load a lookup table saved with `save`, memory-mapping it by default."""
+        np = _numpy()
+        return cls(np.load(path, mmap_mode="r" if mmap else None))
+
+    def save(self, path: Path) -> None:
+        """Save the lookup table as a .npy-file."""
+        np = _numpy()
+        np.save(path, self.table)
+
+    def rgb_to_xy(self, red: int, green: int, blue: int) -> tuple[float, float]:
+        """Look up the x and y coordinates of red, green and blue integer values.
+
+        Dark colors are less precise, see the class. With 8 bits, black has no color and gives NaN.
+        """
+        x, y = self.table[red >> self.shift, green >> self.shift, blue >> self.shift]
+        return (float(x), float(y))
+
+
+# The range of the approximation of the Planckian locus by Kim et al., 25000 K to 1667 K.
+LOCUS_MIREK_MIN = 40
+LOCUS_MIREK_MAX = 600
+# The range of color temperatures supported by most Hue lights, used when a light does not give its own range.
+HUE_MIREK_MIN = 153
+HUE_MIREK_MAX = 500
+
+
+def planckian_locus_xy(kelvin: float) -> tuple[float, float]:
+    """Get the x and y coordinates of a color temperature between 1667 K and 25000 K on the Planckian locus.
+
+    Uses the cubic spline approximation by Kim et al., which is within the precision of the lights over that range.
+    """
+    t = kelvin
+    if t <= 4000:  # noqa: PLR2004
+        x = -0.2661239e9 / t**3 - 0.2343589e6 / t**2 + 0.8776956e3 / t + 0.179910
+    else:
+        x = -3.0258469e9 / t**3 + 2.1070379e6 / t**2 + 0.2226347e3 / t + 0.240390
+
+    if t <= 2222:  # noqa: PLR2004
+        y = -1.1063814 * x**3 - 1.34811020 * x**2 + 2.18555832 * x - 0.20219683
+    elif t <= 4000:  # noqa: PLR2004
+        y = -0.9549476 * x**3 - 1.37418593 * x**2 + 2.09137015 * x - 0.16748867
+    else:
+        y = 3.0817580 * x**3 - 5.87338670 * x**2 + 3.75112997 * x - 0.37001483
+    return (x, y)
+
+
+# The x and y coordinates of every whole mirek value from `LOCUS_MIREK_MIN` to `LOCUS_MIREK_MAX`.
+PLANCKIAN_LOCUS = tuple(planckian_locus_xy(1_000_000 / mirek) for mirek in range(LOCUS_MIREK_MIN, LOCUS_MIREK_MAX + 1))
+
+
+def kelvin_to_mirek(kelvin: float) -> int:
+    """Convert a color temperature in kelvin to whole mirek."""
+    return round(1_000_000 / kelvin)
+
+
+def clamp_mirek(mirek: float, minimum: int = HUE_MIREK_MIN, maximum: int = HUE_MIREK_MAX) -> int:
+    """Round a color temperature in mirek to the closest whole value a light supports."""
+    return min(maximum, max(minimum, round(mirek)))
+
+
+def mirek_to_xy(mirek: float) -> tuple[float, float]:
+    """Look up the x and y coordinates of a color temperature in mirek, rounded to whole mirek.
+
+    Temperatures outside the range of the table are clamped to it.
+    """
+    return PLANCKIAN_LOCUS[clamp_mirek(mirek, LOCUS_MIREK_MIN, LOCUS_MIREK_MAX) - LOCUS_MIREK_MIN]
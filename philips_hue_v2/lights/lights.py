@@ -1,10 +1,11 @@
-from typing import Any, NotRequired
+from typing import TYPE_CHECKING, Any, NotRequired
 
 from pydantic import BaseModel
-from typing_extensions import TypedDict
+from typing_extensions import TypedDict, Unpack
 
-from ..bridge import HueBridge
-from .color import Converter, get_gamut_from_str
+from ..bridge import AsyncHueBridge, BaseHueBridge, HueBridge
+from ..resource.scheduler import merge_bodies
+from .color import HUE_MIREK_MAX, HUE_MIREK_MIN, clamp_mirek, get_converter, kelvin_to_mirek, mirek_to_xy
 
 
 class LightsMetadata(TypedDict):
@@ -23,12 +24,170 @@ class Color(TypedDict):
     gamut_type: str
 
 
-class Lights(BaseModel):
-    """Basemodel for a light resource."""
+class ColorTemperature(TypedDict):
+    """Color temperature attribute for a light, the mirek is None while the light is set to an xy-color."""
 
+    mirek: int | None
+    mirek_valid: bool
+    mirek_schema: NotRequired[dict[str, int]]
+
+
+class LightUpdate(TypedDict, total=False):
+    """Changes that can be applied to a light in a single update.
+
+    Only one of `rgb`, `xy`, `mirek` and `kelvin` can be set, and `duration` is the transition time in milliseconds.
+    """
+
+    on: bool
+    brightness: float
+    rgb: dict[str, int]
+    xy: tuple[float, float]
+    mirek: int
+    kelvin: int
+    duration: int
+
+
+COLOR_CHANGES = frozenset({"rgb", "xy", "mirek", "kelvin"})
+
+
+class LightActions:
+    """Building the bodies of updates, shared by the light models and the views of a `LightStore`.
+
+    The state of the light is read through the `bridge`, `id`, `metadata`, `on`, `dimming`, `color` and
+    `color_temperature` attributes.
+    """
+
+    __slots__ = ()
+
+    if TYPE_CHECKING:
+        bridge: BaseHueBridge
+        id: str  # noqa: A003 - This is the id from the bridge
+        metadata: LightsMetadata
+        on: dict[str, bool]
+        dimming: dict[str, float]
+        color: Color | None
+        color_temperature: ColorTemperature | None
+
+    @property
+    def name(self) -> str:
+        """Get the name of the light."""
+        return self.metadata["name"]
+
+    @property
+    def endpoint(self) -> str:
+        """Get the endpoint used to update the light."""
+        return f"/light/{self.id}"
+
+    def rgb_to_xy(self, rgb: dict[str, int]) -> tuple[float, float]:
+        """Convert rgb-values to xy-values within the color gamut of the light."""
+        if not hasattr(self, "color") or self.color is None:
+            raise ValueError("The light does not support color.")
+
+        return get_converter(self.color["gamut_type"]).rgb_to_xy(**rgb)
+
+    def clamp_mirek(self, mirek: float) -> int:
+        """Round a color temperature in mirek to the closest whole value within the range of the light."""
+        schema = {} if self.color_temperature is None else self.color_temperature.get("mirek_schema", {})
+        return clamp_mirek(
+            mirek, schema.get("mirek_minimum", HUE_MIREK_MIN), schema.get("mirek_maximum", HUE_MIREK_MAX)
+        )
+
+    def color_temperature_body(self, mirek: float) -> dict[str, Any]:
+        """Build the part of an update setting a color temperature in mirek.
+
+        Lights with color but without color temperature are set to the xy-color of the temperature instead.
+        """
+        mirek = self.clamp_mirek(mirek)
+        if self.color_temperature is not None:
+            return {"color_temperature": {"mirek": mirek}}
+        if self.color is not None:
+            x, y = mirek_to_xy(mirek)
+            return {"color": {"xy": {"x": x, "y": y}}}
+        raise ValueError("The light does not support color temperature.")
+
+    def build_body(self, **changes: Unpack[LightUpdate]) -> dict[str, Any]:
+        """Build the body of an update combining all the changes, so they are applied at once by the light."""
+        if len(COLOR_CHANGES.intersection(changes)) > 1:
+            raise ValueError("Only one of rgb, xy, mirek and kelvin can be set at a time.")
+
+        body: dict[str, Any] = {}
+        if "on" in changes:
+            body["on"] = {"on": changes["on"]}
+        if "brightness" in changes:
+            body["dimming"] = {"brightness": changes["brightness"]}
+        if "rgb" in changes:
+            x, y = self.rgb_to_xy(changes["rgb"])
+            body["color"] = {"xy": {"x": x, "y": y}}
+        if "xy" in changes:
+            if self.color is None:
+                raise ValueError("The light does not support color.")
+            x, y = changes["xy"]
+            body["color"] = {"xy": {"x": x, "y": y}}
+        if "mirek" in changes:
+            body.update(self.color_temperature_body(changes["mirek"]))
+        if "kelvin" in changes:
+            body.update(self.color_temperature_body(kelvin_to_mirek(changes["kelvin"])))
+        if "duration" in changes:
+            body["dynamics"] = {"duration": changes["duration"]}
+        return body
+
+    def is_current(self, key: str, value: dict[str, Any]) -> bool:
+        """Check if an attribute of an update body matches the known state of the light, within the tolerances."""
+        if key == "on":
+            return value.get("on") == self.on.get("on")
+        if key == "dimming" and "brightness" in self.dimming:
+            return abs(value["brightness"] - self.dimming["brightness"]) <= self.bridge.brightness_tolerance
+        if key == "color_temperature" and self.color_temperature is not None and "mirek" in value:
+            return value["mirek"] == self.color_temperature["mirek"]
+        if key == "color" and self.color is not None and "xy" in value:
+            tolerance = self.bridge.xy_tolerance
+            known = self.color["xy"]
+            return abs(value["xy"]["x"] - known["x"]) <= tolerance and abs(value["xy"]["y"] - known["y"]) <= tolerance
+        return False
+
+    def diff_body(self, body: dict[str, Any]) -> dict[str, Any]:
+        """Leave out the changes the light is already in from the body of an update.
+
+        The transition time is only kept if something else is left to change, so an empty body means the update can be
+        skipped.
+        """
+        changes = {key: value for key, value in body.items() if not self.is_current(key, value)}
+        if set(changes) <= {"dynamics"}:
+            return {}
+        return changes
+
+    def build_update(self, **changes: Unpack[LightUpdate]) -> dict[str, Any]:
+        """Build the body of an update, without the changes the light is already in if the bridge skips those."""
+        body = self.build_body(**changes)
+        if self.bridge.skip_unchanged_updates:
+            return self.diff_body(body)
+        return body
+
+    def implied_state(self, body: dict[str, Any]) -> dict[str, Any]:
+        """Add the changes the bridge makes along with an update to the body, to merge it into the known state.
+
+        Setting a color temperature also sets the xy-color to the temperature, while setting an xy-color leaves the
+        light without a color temperature.
+        """
+        if "mirek" in body.get("color_temperature", {}) and self.color is not None and "color" not in body:
+            x, y = mirek_to_xy(body["color_temperature"]["mirek"])
+            return {**body, "color": {"xy": {"x": x, "y": y}}}
+        if "xy" in body.get("color", {}) and self.color_temperature is not None and "color_temperature" not in body:
+            return {**body, "color_temperature": {"mirek": None, "mirek_valid": False}}
+        return body
+
+
+class BaseLights(LightActions, BaseModel):
+    """Basemodel for a light resource.
+
+    Holds the state of the light and everything needed to build the request bodies, the requests themselves are sent
+    by `Lights` or `AsyncLights`.
+    """
+
+    bridge: BaseHueBridge
     id: str  # noqa: A003 - This is the id from the bridge
     id_v1: str
-    # owner: dict[str, str]  # noqa: ERA001 - Not implemented yet
+    owner: dict[str, str]
     metadata: LightsMetadata
     # identify: dict[str, Any]  # noqa: ERA001 - Not implemented yet
     on: dict[str, bool]
@@ -41,26 +200,52 @@ class Lights(BaseModel):
     # effects: dict[str, Any] | None = None  # noqa: ERA001 - Not implemented yet
     # powerup: dict[str, Any] | None = None  # noqa: ERA001 - Not implemented yet
     color: Color | None = None
-    # color_temperature: dict[str, Any] | None = None  # noqa: ERA001 - Not implemented yet
-    # color_temperature_delta: dict[str, Any] | None = None  # noqa: ERA001 - Not implemented yet
-    bridge: HueBridge
+    color_temperature: ColorTemperature | None = None
+    color_temperature_delta: dict[str, Any] | None = None
 
-    @property
-    def name(self) -> str:
-        """Get the name of the light."""
-        return self.metadata["name"]
+    def __hash__(self) -> int:
+        """Hash the light by its id, so lights can be kept in sets."""
+        return hash(self.id)
+
+    def apply_state(self, body: dict[str, Any]) -> None:
+        """Merge the body of a successful update into the known state of the light."""
+        for key, value in self.implied_state(body).items():
+            current = getattr(self, key, None) if key in type(self).model_fields else None
+            if isinstance(current, dict) and isinstance(value, dict):
+                setattr(self, key, merge_bodies(current, value))
+
+
+class LightCommands(LightActions):
+    """Commands of a light controlled through a `HueBridge`, shared by `Lights` and the views of a `LightStore`."""
+
+    __slots__ = ()
+
+    if TYPE_CHECKING:
+        bridge: HueBridge
+
+        def apply_state(self, body: dict[str, Any]) -> None:
+            """Merge the body of a successful update into the known state of the light."""
+
+    def update(self, **changes: Unpack[LightUpdate]) -> None:
+        """Update several attributes of the light with a single request.
+
+        For example `update(on=True, rgb={"red": 255, "green": 0, "blue": 0}, duration=400)` turns on the light
+        directly in the new color, instead of first turning it on in its old color.
+        """
+        body = self.build_update(**changes)
+        if not body:
+            return
+        result = self.bridge.update_resource(body=body, endpoint=self.endpoint)
+        if result.is_ok() and self.bridge.skip_unchanged_updates:
+            self.apply_state(body)
 
     def turn_on(self) -> None:
         """Turn on the light."""
-        url = f"/light/{self.id}"
-        body = {"on": {"on": True}}
-        self.bridge.update_resource(body=body, endpoint=url)
+        self.update(on=True)
 
     def turn_off(self) -> None:
-        """Turn on the light."""
-        url = f"/light/{self.id}"
-        body = {"on": {"on": False}}
-        self.bridge.update_resource(body=body, endpoint=url)
+        """Turn off the light."""
+        self.update(on=False)
 
     def set_brightness(self, brightness: int) -> None:
         """Set brightness.
@@ -68,9 +253,7 @@ class Lights(BaseModel):
         A value between 0 and 100. It is typically not possible to dim to 0 and trying to dim to zero will set the
         brightness to the lowest possible value instead.
         """
-        url = f"/light/{self.id}"
-        body = {"dimming": {"brightness": brightness}}
-        self.bridge.update_resource(body=body, endpoint=url)
+        self.update(brightness=brightness)
 
     def set_rgb_color(self, rgb: dict[str, int]) -> None:
         """Set color.
@@ -80,12 +263,94 @@ class Lights(BaseModel):
         Args:
             rgb (dict[str, int]): A dict with the rgb-values. For example {"red": 255, "green": 0, "blue": 0}.
         """
-        if not hasattr(self, "color") or self.color is None:
-            raise ValueError("The light does not support color.")
+        self.update(rgb=rgb)
+
+    def set_color_temperature(self, mirek: int) -> None:
+        """Set color temperature.
+
+        The mirek value is clamped to the range of the light, typically 153 (6500 K) to 500 (2000 K). Lights with color
+        but without color temperature are set to the color of the temperature instead.
+        """
+        self.update(mirek=mirek)
+
+    def set_kelvin(self, kelvin: int) -> None:
+        """Set color temperature in kelvin, see `set_color_temperature`."""
+        self.update(kelvin=kelvin)
+
+
+class Lights(LightCommands, BaseLights):
+    """Basemodel for a light resource controlled through a `HueBridge`."""
+
+    bridge: HueBridge
+
+
+class AsyncLightCommands(LightActions):
+    """Commands of a light controlled through an `AsyncHueBridge`.
+
+    Shared by `AsyncLights` and the views of an `AsyncLightStore`.
+    """
+
+    __slots__ = ()
+
+    if TYPE_CHECKING:
+        bridge: AsyncHueBridge
+
+        def apply_state(self, body: dict[str, Any]) -> None:
+            """Merge the body of a successful update into the known state of the light."""
+
+    async def update(self, **changes: Unpack[LightUpdate]) -> None:
+        """Update several attributes of the light with a single request.
+
+        For example `update(on=True, rgb={"red": 255, "green": 0, "blue": 0}, duration=400)` turns on the light
+        directly in the new color, instead of first turning it on in its old color.
+        """
+        body = self.build_update(**changes)
+        if not body:
+            return
+        result = await self.bridge.update_resource(body=body, endpoint=self.endpoint)
+        if result.is_ok() and self.bridge.skip_unchanged_updates:
+            self.apply_state(body)
+
+    async def turn_on(self) -> None:
+        """Turn on the light."""
+        await self.update(on=True)
+
+    async def turn_off(self) -> None:
+        """Turn off the light."""
+        await self.update(on=False)
+
+    async def set_brightness(self, brightness: int) -> None:
+        """Set brightness.
+
+        A value between 0 and 100. It is typically not possible to dim to 0 and trying to dim to zero will set the
+        brightness to the lowest possible value instead.
+        """
+        await self.update(brightness=brightness)
+
+    async def set_rgb_color(self, rgb: dict[str, int]) -> None:
+        """Set color.
+
+        The rgb values should be between 0 and 255 and will be converted to xy values.
+
+        Args:
+            rgb (dict[str, int]): A dict with the rgb-values. For example {"red": 255, "green": 0, "blue": 0}.
+        """
+        await self.update(rgb=rgb)
+
+    async def set_color_temperature(self, mirek: int) -> None:
+        """Set color temperature.
+
+        The mirek value is clamped to the range of the light, typically 153 (6500 K) to 500 (2000 K). Lights with color
+        but without color temperature are set to the color of the temperature instead.
+        """
+        await self.update(mirek=mirek)
+
+    async def set_kelvin(self, kelvin: int) -> None:
+        """Set color temperature in kelvin, see `set_color_temperature`."""
+        await self.update(kelvin=kelvin)
+
+
+class AsyncLights(AsyncLightCommands, BaseLights):
+    """Basemodel for a light resource controlled through an `AsyncHueBridge`."""
 
-        gamut = get_gamut_from_str(self.color["gamut_type"])
-        converter = Converter(gamut=gamut)
-        x, y = converter.rgb_to_xy(**rgb)
-        url = f"/light/{self.id}"
-        body = {"color": {"xy": {"x": x, "y": y}}}
-        self.bridge.update_resource(body=body, endpoint=url)
+    bridge: AsyncHueBridge
@@ -0,0 +1,441 @@
+import math
+import sys
+from array import array
+from collections.abc import Iterator
+from typing import Any, Generic, TypeVar
+
+from ..bridge import AsyncHueBridge, BaseHueBridge, HueBridge
+from .color import HUE_MIREK_MAX, HUE_MIREK_MIN
+from .lights import AsyncLightCommands, Color, ColorTemperature, LightActions, LightCommands, LightsMetadata
+
+
+NO_GAMUT = -1
+NO_MIREK_SCHEMA = -1
+# Stored while a light is set to an xy-color and has no color temperature.
+NO_MIREK = 0
+
+
+class BaseLightView(LightActions):
+    """A light of a `LightStore`, reading and writing its state in the columns of the store.
+
+    A view only holds the store and the row of the light, the attributes of `Lights` are built from the columns when
+    they are read. Changing the returned dicts does not change the store, the state is changed with `apply_state` or
+    through the store.
+    """
+
+    __slots__ = ("_row", "_store")
+
+    def __init__(self, store: "BaseLightStore[Any]", row: int) -> None:
+        """Initialize a view of a row of the store."""
+        self._store = store
+        self._row = row
+
+    def __repr__(self) -> str:
+        """Return the id and name of the light."""
+        return f"{type(self).__name__}(id={self.id!r}, name={self.name!r})"
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the lights by id, views of the same light are equal."""
+        if not isinstance(other, BaseLightView):
+            return NotImplemented
+        return self.id == other.id
+
+    def __hash__(self) -> int:
+        """Hash the light by its id, so lights can be kept in sets."""
+        return hash(self.id)
+
+    @property
+    def bridge(self) -> BaseHueBridge:  # type: ignore[override]
+        """Get the bridge of the store."""
+        return self._store.bridge
+
+    @property
+    def id(self) -> str:  # type: ignore[override] # noqa: A003 - This is the id from the bridge
+        """Get the id of the light."""
+        return self._store.ids[self._row]
+
+    @property
+    def id_v1(self) -> str:
+        """Get the id of the light in the V1 API."""
+        return self._store.ids_v1[self._row]
+
+    @property
+    def owner(self) -> dict[str, str]:
+        """Get the device owning the light."""
+        return {"rid": self._store.owners[self._row], "rtype": "device"}
+
+    @property
+    def metadata(self) -> LightsMetadata:  # type: ignore[override]
+        """Get the name and archetype of the light."""
+        metadata = LightsMetadata(name=self._store.names[self._row], archetype=self._store.archetypes[self._row])
+        fixed_mired = self._store.fixed_mireds.get(self._row)
+        if fixed_mired is not None:
+            metadata["fixed_mired"] = fixed_mired
+        return metadata
+
+    @property
+    def on(self) -> dict[str, bool]:  # type: ignore[override]
+        """Get the on state of the light."""
+        return {"on": bool(self._store.on[self._row])}
+
+    @property
+    def dimming(self) -> dict[str, float]:  # type: ignore[override]
+        """Get the brightness of the light, empty if the light can not be dimmed."""
+        dimming = {}
+        for key, column in (("brightness", self._store.brightness), ("min_dim_level", self._store.min_dim_level)):
+            if not math.isnan(column[self._row]):
+                dimming[key] = column[self._row]
+        return dimming
+
+    @property
+    def dimming_delta(self) -> dict[str, Any]:
+        """Get the relative dimming of the light, which is not kept by the store."""
+        return {}
+
+    @property
+    def color(self) -> Color | None:  # type: ignore[override]
+        """Get the color of the light, None if the light does not support color.
+
+        The gamut is shared by all lights of the same gamut type, it should not be changed.
+        """
+        gamut_id = self._store.gamut_ids[self._row]
+        if gamut_id == NO_GAMUT:
+            return None
+        gamut_type, gamut = self._store.gamuts[gamut_id]
+        xy = {"x": self._store.x[self._row], "y": self._store.y[self._row]}
+        return Color(xy=xy, gamut=gamut, gamut_type=gamut_type)
+
+    @property
+    def color_temperature(self) -> ColorTemperature | None:  # type: ignore[override]
+        """Get the color temperature of the light, None if the light does not support color temperature.
+
+        The mirek schema is shared by all lights with the same range, it should not be changed.
+        """
+        schema_id = self._store.mirek_schema_ids[self._row]
+        if schema_id == NO_MIREK_SCHEMA:
+            return None
+        mirek = self._store.mireks[self._row]
+        return ColorTemperature(
+            mirek=None if mirek == NO_MIREK else mirek,
+            mirek_valid=mirek != NO_MIREK,
+            mirek_schema=self._store.mirek_schemas[schema_id],
+        )
+
+    def apply_state(self, body: dict[str, Any]) -> None:
+        """Merge the body of a successful update into the known state of the light."""
+        self._store.set_state(self._row, self.implied_state(body))
+
+
+class LightView(BaseLightView, LightCommands):
+    """A light of a `LightStore`, controlled through a `HueBridge`."""
+
+    __slots__ = ()
+    _store: "LightStore"
+
+    @property
+    def bridge(self) -> HueBridge:  # type: ignore[override]
+        """Get the bridge of the store."""
+        return self._store.bridge
+
+
+class AsyncLightView(BaseLightView, AsyncLightCommands):
+    """A light of an `AsyncLightStore`, controlled through an `AsyncHueBridge`."""
+
+    __slots__ = ()
+    _store: "AsyncLightStore"
+
+    @property
+    def bridge(self) -> AsyncHueBridge:  # type: ignore[override]
+        """Get the bridge of the store."""
+        return self._store.bridge
+
+
+ViewT = TypeVar("ViewT", bound=BaseLightView)
+
+
+class BaseLightStore(Generic[ViewT]):
+    """Compact store of the state of many lights, an alternative to the `Lights` models of a `Network`.
+
+    The hot state of the lights is kept in columns, one row per light: the on state, the dimming, the xy color and the
+    color temperature in typed arrays, and the gamut and the mirek range as indexes into the gamuts and mirek schemas of
+    the store, so lights with the same gamut or range share it.
+    Ids, names, archetypes and owners are interned strings. Everything else of a light resource is not kept.
+
+    Lights are read through views, which have the same methods as `Lights` and build its attributes from the columns.
+    A view is created when a light is looked up, and stays valid until the light is removed. The rows of removed lights
+    are reused by the next lights that are added.
+
+    The store does not validate the resources, they are expected to come from the bridge.
+    """
+
+    view_class: type[ViewT]
+
+    def __init__(self, resources: list[dict[str, Any]], bridge: BaseHueBridge) -> None:
+        """Initialize the store with the lights among the resources, the other resources are ignored.
+
+        Args:
+            resources (list[dict[str, Any]]): A list of resources from the bridge.
+            bridge (BaseHueBridge): A bridge object that will be used to communicate with the lights.
+        """
+        self.bridge = bridge
+        self.ids: list[str] = []
+        self.ids_v1: list[str] = []
+        self.owners: list[str] = []
+        self.names: list[str] = []
+        self.archetypes: list[str] = []
+        self.fixed_mireds: dict[int, int] = {}
+        self.on = array("b")
+        self.brightness = array("d")
+        self.min_dim_level = array("d")
+        self.x = array("d")
+        self.y = array("d")
+        self.gamut_ids = array("b")
+        self.gamuts: list[tuple[str, dict[str, dict[str, float]]]] = []
+        self.mireks = array("h")
+        self.mirek_schema_ids = array("b")
+        self.mirek_schemas: list[dict[str, int]] = []
+        self._gamut_ids_by_key: dict[tuple[Any, ...], int] = {}
+        self._rows_by_id: dict[str, int] = {}
+        self._rows_by_name: dict[str, set[int]] = {}
+        self._free_rows: list[int] = []
+        for resource in resources:
+            if resource["type"] == "light":
+                self.add(resource)
+
+    def __len__(self) -> int:
+        """Get the number of lights in the store."""
+        return len(self._rows_by_id)
+
+    def __iter__(self) -> Iterator[ViewT]:
+        """Iterate over views of all lights."""
+        return (self.view_class(self, row) for row in self._rows_by_id.values())
+
+    def __contains__(self, light_id: object) -> bool:
+        """Check if a light with the id is in the store."""
+        return light_id in self._rows_by_id
+
+    @property
+    def lights(self) -> list[ViewT]:
+        """Get views of all lights."""
+        return list(self)
+
+    def get_light_by_id(self, light_id: str) -> ViewT | None:
+        """Get a light by its id."""
+        row = self._rows_by_id.get(light_id)
+        return None if row is None else self.view_class(self, row)
+
+    def get_light_by_name(self, light_name: str) -> ViewT | None:
+        """Get a light by its name.
+
+        This is not case sensitive. If several lights have the same name, any one of them is returned.
+        """
+        rows = self._rows_by_name.get(light_name.casefold())
+        if not rows:
+            return None
+        return self.view_class(self, next(iter(rows)))
+
+    def gamut_id(self, color: dict[str, Any] | None) -> int:
+        """Get the index of the gamut of a color in the gamuts of the store, adding the gamut if it is new."""
+        if not color or "gamut" not in color:
+            return NO_GAMUT
+        gamut, gamut_type = color["gamut"], color.get("gamut_type", "other")
+        key = (gamut_type, *((name, point["x"], point["y"]) for name, point in sorted(gamut.items())))
+        gamut_id = self._gamut_ids_by_key.get(key)
+        if gamut_id is None:
+            gamut_id = len(self.gamuts)
+            self.gamuts.append((sys.intern(gamut_type), {name: dict(point) for name, point in gamut.items()}))
+            self._gamut_ids_by_key[key] = gamut_id
+        return gamut_id
+
+    def mirek_schema_id(self, color_temperature: dict[str, Any] | None) -> int:
+        """Get the index of the mirek schema of a color temperature in the schemas of the store, adding it if it is new.
+
+        Lights that do not give their range get the range of most Hue lights.
+        """
+        if color_temperature is None:
+            return NO_MIREK_SCHEMA
+        schema = color_temperature.get("mirek_schema", {})
+        schema = {
+            "mirek_minimum": schema.get("mirek_minimum", HUE_MIREK_MIN),
+            "mirek_maximum": schema.get("mirek_maximum", HUE_MIREK_MAX),
+        }
+        if schema not in self.mirek_schemas:
+            self.mirek_schemas.append(schema)
+        return self.mirek_schemas.index(schema)
+
+    def add(self, resource: dict[str, Any]) -> ViewT:
+        """Add a light resource to the store, replacing the light with the same id if there is one."""
+        self.remove(resource["id"])
+        metadata = resource["metadata"]
+        row = self._free_rows.pop() if self._free_rows else len(self.ids)
+        self._write_row(
+            row,
+            strings=(
+                sys.intern(resource["id"]),
+                sys.intern(resource.get("id_v1", "")),
+                sys.intern(resource["owner"]["rid"]),
+                sys.intern(metadata["name"]),
+                sys.intern(metadata["archetype"]),
+            ),
+            integers=(
+                0,
+                self.gamut_id(resource.get("color")),
+                NO_MIREK,
+                self.mirek_schema_id(resource.get("color_temperature")),
+            ),
+            floats=(math.nan, math.nan, 0.0, 0.0),
+        )
+        if "fixed_mired" in metadata:
+            self.fixed_mireds[row] = metadata["fixed_mired"]
+        self.set_state(row, resource)
+
+        self._rows_by_id[self.ids[row]] = row
+        self._rows_by_name.setdefault(self.names[row].casefold(), set()).add(row)
+        return self.view_class(self, row)
+
+    def remove(self, light_id: str) -> None:
+        """Remove a light from the store.
+
+        The row of the light is cleared and reused by the next light that is added, or dropped from the columns when it
+        is the last row, so the columns shrink when the last lights are removed.
+        """
+        row = self._rows_by_id.pop(light_id, None)
+        if row is None:
+            return
+        rows = self._rows_by_name.get(self.names[row].casefold(), set())
+        rows.discard(row)
+        if not rows:
+            self._rows_by_name.pop(self.names[row].casefold(), None)
+        self.fixed_mireds.pop(row, None)
+        self._write_row(
+            row,
+            strings=("",) * len(self._string_columns()),
+            integers=(0, NO_GAMUT, NO_MIREK, NO_MIREK_SCHEMA),
+            floats=(math.nan, math.nan, 0.0, 0.0),
+        )
+
+        free_rows = {*self._free_rows, row}
+        while self.ids and len(self.ids) - 1 in free_rows:
+            free_rows.remove(len(self.ids) - 1)
+            for string_column in self._string_columns():
+                string_column.pop()
+            for integer_column in self._integer_columns():
+                integer_column.pop()
+            for float_column in self._float_columns():
+                float_column.pop()
+        # Sorted from the last row to the first, so the first free row is reused first.
+        self._free_rows = sorted(free_rows, reverse=True)
+
+    def _string_columns(self) -> tuple[list[str], ...]:
+        """Get the columns of interned strings, in the order of the strings of `_write_row`."""
+        return (self.ids, self.ids_v1, self.owners, self.names, self.archetypes)
+
+    def _integer_columns(self) -> tuple["array[int]", ...]:
+        """Get the integer columns, in the order of the integers of `_write_row`."""
+        return (self.on, self.gamut_ids, self.mireks, self.mirek_schema_ids)
+
+    def _float_columns(self) -> tuple["array[float]", ...]:
+        """Get the float columns, in the order of the floats of `_write_row`."""
+        return (self.brightness, self.min_dim_level, self.x, self.y)
+
+    def _write_row(
+        self, row: int, strings: tuple[str, ...], integers: tuple[int, ...], floats: tuple[float, ...]
+    ) -> None:
+        """Write all columns of a row, appending the row when it is the next one."""
+        append = row == len(self.ids)
+        for string_column, string in zip(self._string_columns(), strings, strict=True):
+            if append:
+                string_column.append(string)
+            else:
+                string_column[row] = string
+        for integer_column, integer in zip(self._integer_columns(), integers, strict=True):
+            if append:
+                integer_column.append(integer)
+            else:
+                integer_column[row] = integer
+        for float_column, value in zip(self._float_columns(), floats, strict=True):
+            if append:
+                float_column.append(value)
+            else:
+                float_column[row] = value
+
+    def set_state(self, row: int, state: dict[str, Any]) -> None:
+        """Write the state kept in the columns from a (partial) light resource or update body to a row."""
+        if "on" in state:
+            self.on[row] = state["on"]["on"]
+        for key, column in (("brightness", self.brightness), ("min_dim_level", self.min_dim_level)):
+            if key in state.get("dimming", {}):
+                column[row] = state["dimming"][key]
+        if "xy" in (state.get("color") or {}):
+            self.x[row] = state["color"]["xy"]["x"]
+            self.y[row] = state["color"]["xy"]["y"]
+        if "mirek" in (state.get("color_temperature") or {}):
+            self.mireks[row] = state["color_temperature"]["mirek"] or NO_MIREK
+
+    def apply_update(self, resource: dict[str, Any]) -> None:
+        """Merge the attributes of a (partial) light resource into the known state of the light."""
+        row = self._rows_by_id.get(resource["id"])
+        if row is None:
+            return
+        if "metadata" in resource:
+            # The name is indexed, so the light is added again with the new metadata
+            light = self.dump_light(row)
+            self.add({**light, "metadata": {**light["metadata"], **resource["metadata"]}})
+            row = self._rows_by_id[resource["id"]]
+        if "color" in resource and "gamut" in resource["color"]:
+            self.gamut_ids[row] = self.gamut_id(resource["color"])
+        if "mirek_schema" in (resource.get("color_temperature") or {}):
+            self.mirek_schema_ids[row] = self.mirek_schema_id(resource["color_temperature"])
+        self.set_state(row, resource)
+
+    def apply_event(self, event: dict[str, Any]) -> None:
+        """Apply an event from the event stream of the bridge to the lights of the store, ignoring other resources."""
+        for resource in event.get("data", []):
+            if resource.get("type") != "light":
+                continue
+            if event["type"] == "update":
+                self.apply_update(resource)
+            elif event["type"] == "add":
+                self.add(resource)
+            elif event["type"] == "delete":
+                self.remove(resource["id"])
+
+    def dump_light(self, row: int) -> dict[str, Any]:
+        """Get the known state of the light in a row, in the same form as it is returned by the bridge."""
+        view = self.view_class(self, row)
+        resource: dict[str, Any] = {
+            "id": view.id,
+            "id_v1": view.id_v1,
+            "type": "light",
+            "owner": view.owner,
+            "metadata": view.metadata,
+            "on": view.on,
+            "dimming": view.dimming,
+            "dimming_delta": {},
+        }
+        color = view.color
+        if color is not None:
+            resource["color"] = {**color, "gamut": {name: dict(point) for name, point in color["gamut"].items()}}
+        color_temperature = view.color_temperature
+        if color_temperature is not None:
+            schema = dict(color_temperature.get("mirek_schema", {}))
+            resource["color_temperature"] = {**color_temperature, "mirek_schema": schema}
+        return resource
+
+    def dump_resources(self) -> list[dict[str, Any]]:
+        """Get the known state of all lights, in the same form as they are returned by the bridge."""
+        return [self.dump_light(row) for row in self._rows_by_id.values()]
+
+
+class LightStore(BaseLightStore[LightView]):
+    """Compact store of the lights connected to a `HueBridge`."""
+
+    view_class = LightView
+    bridge: HueBridge
+
+
+class AsyncLightStore(BaseLightStore[AsyncLightView]):
+    """Compact store of the lights connected to an `AsyncHueBridge`."""
+
+    view_class = AsyncLightView
+    bridge: AsyncHueBridge
@@ -0,0 +1,430 @@
+"""Smooth transitions of lights, driven by effects.
+
+An effect describes the state of the lights over the course of a transition. The bridge fades lights linearly between
+two states by itself when an update has a transition time, so an effect is planned as the fewest keyframes whose
+linear fades stay within a perceptual error bound of the effect. Every keyframe is then a single update with a
+transition time, sent to all lights at once through grouped lights where possible. The keyframes are spaced so the
+updates stay within the rate limits of the bridge, which lets a transition run on hundreds of lights without flooding
+the bridge.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from ..resource.scheduler import GROUP_ENDPOINT_PREFIX, ResourceResult
+
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from ..resource.network import AsyncNetwork, BaseNetwork, Network
+    from .lights import AsyncLights, BaseLights, Lights
+
+
+# The longest transition time the bridge accepts, in milliseconds.
+MAX_TRANSITION_MS = 6_000_000
+# Upper bound of the number of times an effect is sampled while planning, regardless of its duration.
+MAX_SAMPLES = 2_000
+
+
+@dataclass(frozen=True)
+class LightState:
+    """A point in the space lights are faded through, the brightness in percent and the color as xy-values.
+
+    A state without xy-values only sets the brightness, and leaves the color of the lights as it is.
+    """
+
+    brightness: float
+    xy: tuple[float, float] | None = None
+
+    def body(self, duration_ms: int, color: bool = True) -> dict[str, Any]:
+        """Build the body of an update fading to this state, leaving out the color when `color` is False."""
+        body: dict[str, Any] = {"dimming": {"brightness": self.brightness}, "dynamics": {"duration": duration_ms}}
+        if color and self.xy is not None:
+            body["color"] = {"xy": {"x": self.xy[0], "y": self.xy[1]}}
+        return body
+
+
+Effect = Callable[[float], LightState]
+Easing = Callable[[float], float]
+
+
+def linear(progress: float) -> float:
+    """Progress at a constant rate."""
+    return progress
+
+
+def ease_in(progress: float) -> float:
+    """Start slowly and speed up."""
+    return progress * progress
+
+
+def ease_in_out(progress: float) -> float:
+    """Start and end slowly."""
+    return progress * progress * (3 - 2 * progress)
+
+
+def interpolate(start: LightState, end: LightState, fraction: float) -> LightState:
+    """Get the state a fraction of the way from one state to another."""
+    brightness = start.brightness + (end.brightness - start.brightness) * fraction
+    if start.xy is None or end.xy is None:
+        return LightState(brightness=brightness, xy=end.xy if fraction >= 1 else start.xy)
+    x = start.xy[0] + (end.xy[0] - start.xy[0]) * fraction
+    y = start.xy[1] + (end.xy[1] - start.xy[1]) * fraction
+    return LightState(brightness=brightness, xy=(x, y))
+
+
+def hold(state: LightState) -> Effect:
+    """Effect keeping the lights in one state, used to fade from the current state to it, see `Transition`."""
+    return lambda _: state
+
+
+def fade(start: LightState, end: LightState, easing: Easing = linear) -> Effect:
+    """Effect fading from one state to another."""
+    return lambda progress: interpolate(start, end, easing(progress))
+
+
+def keyframes(states: Sequence[tuple[float, LightState]], easing: Easing = linear) -> Effect:
+    """Effect fading through several states, each given with its progress between 0 and 1.
+
+    The easing applies to every fade between two states.
+    """
+    if not states:
+        raise ValueError("An effect needs at least one state.")
+    positions = [position for position, _ in states]
+
+    def effect(progress: float) -> LightState:
+        index = next((index for index, position in enumerate(positions) if position >= progress), len(states))
+        if index == 0:
+            return states[0][1]
+        if index == len(states):
+            return states[-1][1]
+        (start_at, start), (end_at, end) = states[index - 1], states[index]
+        fraction = (progress - start_at) / (end_at - start_at) if end_at > start_at else 1.0
+        return interpolate(start, end, easing(fraction))
+
+    return effect
+
+
+def sunrise() -> Effect:
+    """Effect of a sunrise, from a faint deep red through orange to a bright warm white."""
+    return keyframes(
+        [
+            (0.0, LightState(brightness=1.0, xy=(0.675, 0.322))),
+            (0.3, LightState(brightness=15.0, xy=(0.6, 0.38))),
+            (0.7, LightState(brightness=60.0, xy=(0.5, 0.41))),
+            (1.0, LightState(brightness=100.0, xy=(0.45, 0.41))),
+        ],
+        easing=ease_in_out,
+    )
+
+
+@dataclass(frozen=True)
+class Keyframe:
+    """A state the lights are in at a number of seconds into a transition."""
+
+    at: float
+    state: LightState
+
+
+def _deviation(state: LightState, target: LightState, xy_tolerance: float, brightness_tolerance: float) -> float:
+    """Get how far a state is from a target, relative to the tolerances, so a deviation above 1 is noticeable."""
+    deviation = abs(state.brightness - target.brightness) / brightness_tolerance
+    if state.xy is not None and target.xy is not None:
+        distance = math.dist(state.xy, target.xy)
+        deviation = max(deviation, distance / xy_tolerance)
+    return deviation
+
+
+def plan_keyframes(  # noqa: PLR0913 - The tolerances of the planning are configurable
+    effect: Effect,
+    duration: float,
+    min_interval: float = 0.0,
+    xy_tolerance: float = 0.005,
+    brightness_tolerance: float = 2.0,
+    resolution: float = 0.1,
+) -> list[Keyframe]:
+    """Plan the keyframes of an effect, so fading linearly between them stays close to the effect.
+
+    The effect is sampled every `resolution` seconds, or every `min_interval` seconds if that is longer, so keyframes
+    are never closer together than the rate limits allow. The samples are simplified with the Ramer-Douglas-Peucker
+    algorithm: a fade is split at the sample furthest from it for as long as that sample is further than the
+    tolerances. The tolerances default to roughly the smallest differences that are noticeable, in xy-distance and
+    brightness percent. Fades longer than the bridge accepts are split.
+
+    Args:
+        effect (Effect): The effect, the state of the lights at a progress between 0 and 1.
+        duration (float): The duration of the transition in seconds.
+        min_interval (float, optional): The shortest number of seconds between keyframes. Defaults to 0.0.
+        xy_tolerance (float, optional): The largest xy-distance from the effect. Defaults to 0.005.
+        brightness_tolerance (float, optional): The largest brightness difference from the effect. Defaults to 2.0.
+        resolution (float, optional): Seconds between samples of the effect. Defaults to 0.1.
+
+    Returns:
+        list[Keyframe]: The keyframes, starting at 0 and ending at the duration.
+    """
+    if duration <= 0:
+        raise ValueError("The duration of a transition has to be positive.")
+
+    # Samples are taken no closer than the shortest interval, so any keyframes picked from them are far enough apart.
+    step = max(resolution, min_interval)
+    count = max(2, min(MAX_SAMPLES, math.floor(duration / step) + 1))
+    times = [duration * index / (count - 1) for index in range(count)]
+    samples = [effect(index / (count - 1)) for index in range(count)]
+
+    kept = {0, count - 1}
+    segments = [(0, count - 1)]
+    while segments:
+        first, last = segments.pop()
+        worst, worst_deviation = 0, 1.0
+        for index in range(first + 1, last):
+            fraction = (times[index] - times[first]) / (times[last] - times[first])
+            expected = interpolate(samples[first], samples[last], fraction)
+            deviation = _deviation(expected, samples[index], xy_tolerance, brightness_tolerance)
+            if deviation > worst_deviation:
+                worst, worst_deviation = index, deviation
+        if worst:
+            kept.add(worst)
+            segments.extend([(first, worst), (worst, last)])
+
+    indexes = sorted(kept)
+    frames = [Keyframe(at=times[indexes[0]], state=samples[indexes[0]])]
+    longest = MAX_TRANSITION_MS / 1000
+    for index in indexes[1:]:
+        splits = math.ceil((times[index] - frames[-1].at) / longest)
+        start_at = frames[-1].at
+        for split in range(1, splits):
+            at = start_at + split * longest
+            frames.append(Keyframe(at=at, state=effect(at / duration)))
+        frames.append(Keyframe(at=times[index], state=samples[index]))
+    return frames
+
+
+class BaseTransition:
+    """A transition of lights through an effect, shared by the threaded and the asyncio transition.
+
+    The requests are planned once, through grouped lights where possible, and the keyframes are spaced so all of them
+    together fit in `rate_share` of the rate limits of the bridge. Lower `rate_share` when running several transitions
+    on the same bridge at the same time. Lights without color are only dimmed.
+
+    The transition starts by jumping to the first state of the effect, or with `from_current` it fades from the state
+    the lights are in to the second keyframe instead, so `hold(state)` fades to `state` with a single update.
+    """
+
+    def __init__(  # noqa: PLR0913 - The tolerances are passed on to the planning
+        self,
+        network: "BaseNetwork[Any]",
+        lights: "Iterable[BaseLights]",
+        effect: Effect,
+        duration: float,
+        rate_share: float = 1.0,
+        from_current: bool = False,
+        xy_tolerance: float = 0.005,
+        brightness_tolerance: float = 2.0,
+    ) -> None:
+        """Plan the transition.
+
+        Args:
+            network (BaseNetwork[Any]): The network of the lights.
+            lights (Iterable[BaseLights]): The lights to transition.
+            effect (Effect): The effect, the state of the lights at a progress between 0 and 1.
+            duration (float): The duration of the transition in seconds.
+            rate_share (float, optional): The share of the rate limits of the bridge to use. Defaults to 1.0.
+            from_current (bool, optional): Fade from the current state instead of the start of the effect.
+                Defaults to False.
+            xy_tolerance (float, optional): The largest xy-distance from the effect. Defaults to 0.005.
+            brightness_tolerance (float, optional): The largest brightness difference from the effect.
+                Defaults to 2.0.
+
+        Raises:
+            ValueError: If the rate share is not above 0 and at most 1.
+        """
+        if not 0 < rate_share <= 1:
+            raise ValueError("The rate share has to be above 0 and at most 1.")
+
+        self.network = network
+        self.from_current = from_current
+        targets = list(lights)
+        by_id = {light.id: light for light in targets}
+        # Grouped lights fade the color of the lights with color and only dim the others.
+        self.requests = [
+            (endpoint, endpoint.startswith(GROUP_ENDPOINT_PREFIX) or by_id[next(iter(members))].color is not None)
+            for endpoint, members in network.plan_update(targets)
+        ]
+        self.min_interval = self.command_interval() / rate_share
+        self.keyframes = plan_keyframes(
+            effect,
+            duration,
+            min_interval=self.min_interval,
+            xy_tolerance=xy_tolerance,
+            brightness_tolerance=brightness_tolerance,
+        )
+        self.commands_sent = 0
+        self.errors = 0
+
+    def command_interval(self) -> float:
+        """Get the number of seconds it takes the bridge to send the requests of one keyframe at its rate limits."""
+        groups = sum(endpoint.startswith(GROUP_ENDPOINT_PREFIX) for endpoint, _ in self.requests)
+        bridge = self.network.bridge
+        return max(
+            (len(self.requests) - groups) / bridge.light_commands_per_second,
+            groups / bridge.group_commands_per_second,
+        )
+
+    def steps(self) -> list[tuple[float, list[tuple[str, dict[str, Any]]]]]:
+        """Get the updates of the transition, with the number of seconds into the transition they are sent at.
+
+        The update fading to a keyframe is sent at the previous keyframe, with the time between them as transition time.
+        """
+        if self.from_current:
+            return [
+                (previous.at, self._updates(keyframe.state, keyframe.at - previous.at))
+                for previous, keyframe in zip(self.keyframes, self.keyframes[1:], strict=False)
+            ]
+
+        # The fades start once the bridge had the time to send the jump to the first state.
+        lead = self.min_interval
+        jump = [(endpoint, {"on": {"on": True}} | body) for endpoint, body in self._updates(self.keyframes[0].state, 0)]
+        return [(0.0, jump)] + [
+            (lead + previous.at, self._updates(keyframe.state, keyframe.at - previous.at))
+            for previous, keyframe in zip(self.keyframes, self.keyframes[1:], strict=False)
+        ]
+
+    def _updates(self, state: LightState, duration: float) -> list[tuple[str, dict[str, Any]]]:
+        """Get the updates fading all lights to a state in a number of seconds."""
+        duration_ms = round(duration * 1000)
+        return [(endpoint, state.body(duration_ms, color)) for endpoint, color in self.requests]
+
+    def _record(self, done: "Future[ResourceResult] | asyncio.Future[ResourceResult]") -> None:
+        """Count the result of an update, updates whose future was cancelled are not counted."""
+        if done.cancelled():
+            return
+        result = done.result()
+        self.commands_sent += 1
+        if result.is_err():
+            self.errors += 1
+            logger.warning(f"An update of a transition failed: {result.unwrap_err()!r}")
+
+
+class Transition(BaseTransition):
+    """Transition of lights connected to a `HueBridge`, sent from a background thread.
+
+    Call `start()`, then `wait()` until it has finished or `stop()` to abort it.
+    """
+
+    network: "Network"
+
+    def __init__(  # noqa: PLR0913 - The tolerances are passed on to the planning
+        self,
+        network: "Network",
+        lights: "Iterable[Lights]",
+        effect: Effect,
+        duration: float,
+        rate_share: float = 1.0,
+        from_current: bool = False,
+        xy_tolerance: float = 0.005,
+        brightness_tolerance: float = 2.0,
+    ) -> None:
+        """Plan the transition, see `BaseTransition`."""
+        super().__init__(
+            network=network,
+            lights=lights,
+            effect=effect,
+            duration=duration,
+            rate_share=rate_share,
+            from_current=from_current,
+            xy_tolerance=xy_tolerance,
+            brightness_tolerance=brightness_tolerance,
+        )
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start sending the updates."""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, name="hue-transition", daemon=True)
+        self._thread.start()
+
+    def run(self) -> None:
+        """Send the updates at their time, until done or stopped."""
+        started_at = time.monotonic()
+        scheduler = self.network.bridge.scheduler
+        for at, updates in self.steps():
+            if self._stopped.wait(max(0.0, started_at + at - time.monotonic())):
+                return
+            for endpoint, body in updates:
+                scheduler.submit(body=body, endpoint=endpoint).add_done_callback(self._record)
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Wait until all updates have been queued."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stop(self) -> None:
+        """Stop sending updates, the lights stay in the state they are fading to."""
+        self._stopped.set()
+        self.wait()
+
+
+class AsyncTransition(BaseTransition):
+    """Transition of lights connected to an `AsyncHueBridge`, sent from an asyncio task.
+
+    Call `start()`, then `wait()` until it has finished or `stop()` to abort it.
+    """
+
+    network: "AsyncNetwork"
+
+    def __init__(  # noqa: PLR0913 - The tolerances are passed on to the planning
+        self,
+        network: "AsyncNetwork",
+        lights: "Iterable[AsyncLights]",
+        effect: Effect,
+        duration: float,
+        rate_share: float = 1.0,
+        from_current: bool = False,
+        xy_tolerance: float = 0.005,
+        brightness_tolerance: float = 2.0,
+    ) -> None:
+        """Plan the transition, see `BaseTransition`."""
+        super().__init__(
+            network=network,
+            lights=lights,
+            effect=effect,
+            duration=duration,
+            rate_share=rate_share,
+            from_current=from_current,
+            xy_tolerance=xy_tolerance,
+            brightness_tolerance=brightness_tolerance,
+        )
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start sending the updates."""
+        self._task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        """Send the updates at their time, until done or cancelled."""
+        started_at = time.monotonic()
+        scheduler = self.network.bridge.scheduler
+        for at, updates in self.steps():
+            await asyncio.sleep(max(0.0, started_at + at - time.monotonic()))
+            for endpoint, body in updates:
+                scheduler.submit(body=body, endpoint=endpoint).add_done_callback(self._record)
+
+    async def wait(self) -> None:
+        """Wait until all updates have been queued."""
+        if self._task is not None:
+            await self._task
+
+    async def stop(self) -> None:
+        """Stop sending updates, the lights stay in the state they are fading to."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
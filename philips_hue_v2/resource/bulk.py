@@ -0,0 +1,99 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from result import Err, Ok, Result
+
+from .. import OtherApiError
+from .scheduler import ResourceResult
+
+
+# Attributes of an update that are not changes of the light state, they are never reported as failed.
+TRANSIENT_ATTRIBUTES = frozenset({"dynamics"})
+# How the bridge refers to an attribute in an error description, by its path in parentheses as in
+# 'device (light) is "soft off", command (.color.xy) may not have effect'. Only the top-level attribute is kept.
+ATTRIBUTE_REFERENCE = re.compile(r"\(\.(?P<path>\w+)[\w.]*\)")
+
+
+def failed_attributes(error: OtherApiError, body: dict[str, Any]) -> dict[str, str] | None:
+    """Get the attributes of an update a 207 multi-status response failed, with the description of the error.
+
+    The bridge only describes the errors, so an attribute failed when one of the descriptions refers to it, see
+    `ATTRIBUTE_REFERENCE`. Returns None when a description does not refer to any attribute of the update, then it is
+    unknown what was applied and the whole error is reported.
+    """
+    failed: dict[str, str] = {}
+    for error_details in error.errors:
+        description = error_details.get("description", "")
+        references = {match["path"] for match in ATTRIBUTE_REFERENCE.finditer(description)}
+        mentioned = [key for key in body if key in references]
+        if not mentioned:
+            return None
+        for key in mentioned:
+            failed.setdefault(key, description)
+    return failed
+
+
+@dataclass
+class LightApplyResult:
+    """The outcome of applying a state to a light with `apply` of a network.
+
+    The result holds the attributes that were applied, or the error when the state could not be applied at all. When
+    the bridge applied only part of the state, the attributes it failed are in `failed` with the description of the
+    error. The endpoint is the light or the grouped light the state was sent to, None when nothing was sent because the
+    light was already in the state or the state could not be built. The elapsed time is from the start of `apply` until
+    the bridge answered, including the time waited in the scheduler.
+    """
+
+    light_id: str
+    result: Result[dict[str, Any], Exception]
+    endpoint: str | None = None
+    failed: dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def is_partial(self) -> bool:
+        """Check if the bridge applied only part of the state."""
+        return bool(self.failed)
+
+    @classmethod
+    def from_response(  # noqa: PLR0913 - The result covers both the request and its response
+        cls, light_id: str, endpoint: str, body: dict[str, Any], response: ResourceResult, elapsed: float
+    ) -> "LightApplyResult":
+        """Build the result of a light from the response to the request covering it."""
+        if response.is_ok():
+            return cls(light_id=light_id, result=Ok(body), endpoint=endpoint, elapsed=elapsed)
+        error = response.unwrap_err()
+        failed = failed_attributes(error, body) if isinstance(error, OtherApiError) else None
+        if failed is None:
+            return cls(light_id=light_id, result=Err(error), endpoint=endpoint, elapsed=elapsed)
+        applied = {key: value for key, value in body.items() if key not in failed and key not in TRANSIENT_ATTRIBUTES}
+        return cls(light_id=light_id, result=Ok(applied), endpoint=endpoint, failed=failed, elapsed=elapsed)
+
+
+@dataclass
+class ApplyReport:
+    """The outcome of `apply` of a network, with the result of every light by its id."""
+
+    results: dict[str, LightApplyResult]
+    requests: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> list[str]:
+        """Get the ids of the lights the whole state was applied to, including those already in the state."""
+        return [light_id for light_id, item in self.results.items() if item.result.is_ok() and not item.failed]
+
+    @property
+    def partial(self) -> list[str]:
+        """Get the ids of the lights only part of the state was applied to."""
+        return [light_id for light_id, item in self.results.items() if item.result.is_ok() and item.failed]
+
+    @property
+    def failed(self) -> list[str]:
+        """Get the ids of the lights the state could not be applied to."""
+        return [light_id for light_id, item in self.results.items() if item.result.is_err()]
+
+    def is_ok(self) -> bool:
+        """Check if the whole state was applied to every light."""
+        return all(item.result.is_ok() and not item.failed for item in self.results.values())
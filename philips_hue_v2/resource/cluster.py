@@ -0,0 +1,180 @@
+import asyncio
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, Generic, Self, TypeVar
+
+from ..bridge import AsyncHueBridge, HueBridge
+from ..groups.groups import Group
+from ..lights.lights import AsyncLights, BaseLights, Lights
+from .network import AsyncNetwork, BaseNetwork, Network
+
+
+NetworkT = TypeVar("NetworkT", bound=BaseNetwork[Any])
+LightsT = TypeVar("LightsT", bound=BaseLights)
+
+
+class BaseBridgeCluster(Generic[NetworkT, LightsT]):
+    """Several bridges acting as one, shared by `BridgeCluster` and `AsyncBridgeCluster`.
+
+    Each bridge keeps its own network, connections and rate limits, and the lookups search all networks as one. Lights
+    are always updated through the bridge they are connected to.
+
+    The lookups use the indexes of the networks, which their event streams keep up to date, instead of a merged index
+    that would have to follow the events of every bridge. A lookup is then one index lookup per bridge.
+    """
+
+    def __init__(self, networks: list[NetworkT]) -> None:
+        """Initialize the cluster with the networks of its bridges."""
+        self.networks = networks
+
+    @property
+    def lights(self) -> list[LightsT]:
+        """Get the lights of all bridges."""
+        return [light for network in self.networks for light in network.lights or []]
+
+    def get_light_by_id(self, light_id: str) -> LightsT | None:
+        """Get a light by its id, ids are unique across bridges."""
+        for network in self.networks:
+            light = network.get_light_by_id(light_id)
+            if light is not None:
+                return light
+        return None
+
+    def get_light_by_name(self, light_name: str) -> LightsT | None:
+        """Get a light by its name.
+
+        This is not case sensitive. If several lights have the same name, any one of them is returned.
+        """
+        for network in self.networks:
+            light = network.get_light_by_name(light_name)
+            if light is not None:
+                return light
+        return None
+
+    def get_group_by_name(self, group_name: str) -> Group | None:
+        """Get a room or a zone by its name.
+
+        This is not case sensitive.
+        """
+        for network in self.networks:
+            group = network.get_group_by_name(group_name)
+            if group is not None:
+                return group
+        return None
+
+    def find_lights(
+        self, name: str | None = None, archetype: str | None = None, group: str | None = None
+    ) -> set[LightsT]:
+        """Get the lights of all bridges matching all the given criteria, see `BaseNetwork.find_lights`."""
+        return {
+            light
+            for network in self.networks
+            for light in network.find_lights(name=name, archetype=archetype, group=group)
+        }
+
+    def partition(self, lights: Iterable[LightsT]) -> list[tuple[NetworkT, list[LightsT]]]:
+        """Split the lights by the network of the bridge they are connected to.
+
+        Raises:
+            ValueError: If a light is connected to a bridge that is not part of the cluster.
+        """
+        networks_by_bridge = {id(network.bridge): network for network in self.networks}
+        by_bridge: dict[int, list[LightsT]] = {}
+        for light in lights:
+            if id(light.bridge) not in networks_by_bridge:
+                raise ValueError(f"The light {light.name} ({light.id}) is not connected to a bridge of the cluster.")
+            by_bridge.setdefault(id(light.bridge), []).append(light)
+        return [(networks_by_bridge[bridge_id], members) for bridge_id, members in by_bridge.items()]
+
+
+class BridgeCluster(BaseBridgeCluster[Network, Lights]):
+    """Several `HueBridge` acting as one.
+
+    The bridges should be released with `close()`, or by using the cluster as a context manager.
+    """
+
+    @classmethod
+    def fetch(cls, bridges: list[HueBridge], min_group_size: int = 2, validate: bool = True) -> Self:
+        """Create a cluster by fetching the networks of all bridges concurrently."""
+        with ThreadPoolExecutor(max_workers=max(1, len(bridges))) as executor:
+            networks = list(
+                executor.map(
+                    lambda bridge: Network.fetch(bridge, min_group_size=min_group_size, validate=validate), bridges
+                )
+            )
+        return cls(networks)
+
+    def update_lights(self, lights: Iterable[Lights], body: dict[str, Any]) -> None:
+        """Send the same update to all the lights, through grouped lights where possible.
+
+        The updates are queued on all bridges before waiting for any of them, so the bridges send them in parallel.
+        """
+        futures = [
+            future for network, members in self.partition(lights) for future in network.submit_update(members, body)
+        ]
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        """Close all bridges, the first error closing a bridge is raised once all of them have been closed."""
+        errors: list[Exception] = []
+        for network in self.networks:
+            try:
+                network.bridge.close()
+            except Exception as err:
+                errors.append(err)
+        if errors:
+            raise errors[0]
+
+    def __enter__(self) -> Self:
+        """Enter the runtime context, the bridges are closed when leaving it."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the bridges when leaving the runtime context."""
+        self.close()
+
+
+class AsyncBridgeCluster(BaseBridgeCluster[AsyncNetwork, AsyncLights]):
+    """Several `AsyncHueBridge` acting as one.
+
+    The bridges should be released with `aclose()`, or by using the cluster as an async context manager.
+    """
+
+    @classmethod
+    async def fetch(cls, bridges: list[AsyncHueBridge], min_group_size: int = 2, validate: bool = True) -> Self:
+        """Create a cluster by fetching the networks of all bridges concurrently."""
+        networks = await asyncio.gather(
+            *(AsyncNetwork.fetch(bridge, min_group_size=min_group_size, validate=validate) for bridge in bridges)
+        )
+        return cls(list(networks))
+
+    async def update_lights(self, lights: Iterable[AsyncLights], body: dict[str, Any]) -> None:
+        """Send the same update to all the lights on all bridges in parallel, through grouped lights where possible."""
+        await asyncio.gather(*(network.update_lights(members, body) for network, members in self.partition(lights)))
+
+    async def aclose(self) -> None:
+        """Close all bridges, the first error closing a bridge is raised once all of them have been closed."""
+        results = await asyncio.gather(*(network.bridge.aclose() for network in self.networks), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def __aenter__(self) -> Self:
+        """Enter the runtime context, the bridges are closed when leaving it."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the bridges when leaving the runtime context."""
+        await self.aclose()
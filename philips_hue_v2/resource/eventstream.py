@@ -0,0 +1,229 @@
+import asyncio
+import json
+import random
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from loguru import logger
+
+
+if TYPE_CHECKING:
+    from .network import AsyncNetwork, BaseNetwork, Network
+
+
+EVENTSTREAM_PATH = "/eventstream/clip/v2"
+
+
+@dataclass
+class ServerSentEvent:
+    """A single event received from a server-sent events stream."""
+
+    data: str
+    event: str = "message"
+    id: str | None = None  # noqa: A003 - This is the id from the bridge
+
+
+class ServerSentEventParser:
+    """Parser turning the lines of a server-sent events stream into events.
+
+    Lines are fed one at a time, and an event is returned when the empty line ending it is fed.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self.last_event_id: str | None = None
+        self._event = "message"
+        self._data: list[str] = []
+
+    def feed(self, line: str) -> ServerSentEvent | None:
+        """Feed a line to the parser, returns an event when the line completes one."""
+        if not line:
+            if not self._data:
+                return None
+            event = ServerSentEvent(data="\n".join(self._data), event=self._event, id=self.last_event_id)
+            self._event = "message"
+            self._data = []
+            return event
+
+        if line.startswith(":"):
+            return None
+        name, _, value = line.partition(":")
+        value = value.removeprefix(" ")
+        if name == "data":
+            self._data.append(value)
+        elif name == "event":
+            self._event = value
+        elif name == "id":
+            self.last_event_id = value
+        return None
+
+    def reset(self) -> None:
+        """Drop the event being received when the connection is lost, keeping the id of the last event."""
+        self._event = "message"
+        self._data = []
+
+
+@dataclass
+class Backoff:
+    """Exponential backoff with full jitter, used between reconnection attempts."""
+
+    initial: float = 1.0
+    maximum: float = 60.0
+    factor: float = 2.0
+    attempts: int = field(default=0, init=False)
+
+    def next_delay(self) -> float:
+        """Get the delay before the next attempt, and count the attempt."""
+        delay = min(self.maximum, self.initial * self.factor**self.attempts)
+        self.attempts += 1
+        return random.uniform(0, delay)  # noqa: S311 - Not used for cryptographic purposes
+
+    def reset(self) -> None:
+        """Reset the backoff after a successful attempt."""
+        self.attempts = 0
+
+
+class BaseEventStream:
+    """Subscriber for the event stream of the bridge, keeping the resources of a network up to date.
+
+    The bridge pushes every change of its resources as server-sent events, which are applied to the network as they
+    arrive so reading the state of a light never needs a request. The connection is re-established with backoff when
+    it is lost, and the network is resynchronized after reconnecting since events might have been missed meanwhile.
+    """
+
+    def __init__(self, network: "BaseNetwork[Any]", backoff: Backoff | None = None) -> None:
+        """Initialize the event stream.
+
+        Args:
+            network (BaseNetwork): The network the events are applied to.
+            backoff (Backoff | None, optional): Backoff between reconnection attempts. Defaults to Backoff().
+        """
+        self.network = network
+        self.backoff = backoff or Backoff()
+        self.parser = ServerSentEventParser()
+        self.connected_once = False
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Get the headers used when connecting to the event stream."""
+        headers = {"Accept": "text/event-stream"}
+        if self.parser.last_event_id is not None:
+            headers["Last-Event-ID"] = self.parser.last_event_id
+        return headers
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        """Get the timeout of the connection, the stream is idle for long periods so there is no read timeout."""
+        return httpx.Timeout(self.network.bridge.timeout, connect=self.network.bridge.connect_timeout, read=None)
+
+    def handle_line(self, line: str) -> None:
+        """Parse a line of the stream and apply the event it completes, if any."""
+        event = self.parser.feed(line)
+        if event is None:
+            return
+        try:
+            containers: list[dict[str, Any]] = json.loads(event.data)
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring malformed event from the bridge: {event.data}")
+            return
+        for container in containers:
+            self.network.apply_event(container)
+
+
+class EventStream(BaseEventStream):
+    """Event stream subscriber running in a background thread."""
+
+    network: "Network"
+
+    def __init__(self, network: "Network", backoff: Backoff | None = None) -> None:
+        """Initialize the event stream."""
+        super().__init__(network=network, backoff=backoff)
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._response: httpx.Response | None = None
+
+    def start(self) -> None:
+        """Start listening to the event stream in a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, name="hue-eventstream", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop listening to the event stream."""
+        self._stopped.set()
+        if self._response is not None:
+            self._response.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+
+    def run(self) -> None:
+        """Listen to the event stream until stopped, reconnecting with backoff when the connection is lost."""
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except Exception as err:
+                if self._stopped.is_set():
+                    return
+                logger.warning(f"Lost connection to the event stream of the bridge: {err!r}")
+            self._stopped.wait(self.backoff.next_delay())
+
+    def _listen(self) -> None:
+        """Connect to the event stream and apply the events until the connection is closed."""
+        bridge = self.network.bridge
+        try:
+            with bridge.client.stream("GET", EVENTSTREAM_PATH, headers=self.headers, timeout=self.timeout) as response:
+                response.raise_for_status()
+                self._response = response
+                self.backoff.reset()
+                if self.connected_once:
+                    self.network.resync()
+                self.connected_once = True
+                for line in response.iter_lines():
+                    self.handle_line(line)
+        finally:
+            self._response = None
+            self.parser.reset()
+
+
+class AsyncEventStream(BaseEventStream):
+    """Event stream subscriber running as an asyncio task.
+
+    Run it with `asyncio.create_task(stream.run())` and cancel the task to stop listening.
+    """
+
+    network: "AsyncNetwork"
+
+    def __init__(self, network: "AsyncNetwork", backoff: Backoff | None = None) -> None:
+        """Initialize the event stream."""
+        super().__init__(network=network, backoff=backoff)
+
+    async def run(self) -> None:
+        """Listen to the event stream until cancelled, reconnecting with backoff when the connection is lost."""
+        while True:
+            try:
+                await self._listen()
+            except Exception as err:
+                logger.warning(f"Lost connection to the event stream of the bridge: {err!r}")
+            await asyncio.sleep(self.backoff.next_delay())
+
+    async def _listen(self) -> None:
+        """Connect to the event stream and apply the events until the connection is closed."""
+        bridge = self.network.bridge
+        try:
+            async with bridge.client.stream(
+                "GET", EVENTSTREAM_PATH, headers=self.headers, timeout=self.timeout
+            ) as response:
+                response.raise_for_status()
+                self.backoff.reset()
+                if self.connected_once:
+                    await self.network.resync()
+                self.connected_once = True
+                async for line in response.aiter_lines():
+                    self.handle_line(line)
+        finally:
+            self.parser.reset()
@@ -0,0 +1,295 @@
+import bisect
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any
+
+
+MULTI_VALUE_STATUS = 207
+# Upper bounds in seconds, a bridge on the local network answers in tens of milliseconds when it is not throttling.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def endpoint_label(endpoint: str) -> str:
+    """Get the resource type of an endpoint, so the metrics of all resources of a type are grouped together.
+
+    For example both `/light/<id>` and `/light` are labelled `/light`, and all resources are labelled `/`.
+    """
+    return "/" + endpoint.strip("/").split("/", 1)[0]
+
+
+@dataclass
+class RequestRecord:
+    """A request to the bridge, filled in as it is sent and answered.
+
+    The status code is None when no response was received, and the connect time is 0 when the request was sent over
+    a pooled connection instead of opening a new one.
+    """
+
+    method: str
+    endpoint: str
+    started_at: float = field(default_factory=time.perf_counter)
+    status_code: int | None = None
+    elapsed: float = 0.0
+    connect_time: float = 0.0
+    error: Exception | None = None
+    _connect_started_at: float = field(default=0.0, repr=False)
+
+    @property
+    def label(self) -> str:
+        """Get the resource type of the endpoint, see `endpoint_label`."""
+        return endpoint_label(self.endpoint)
+
+    @property
+    def is_multi_status(self) -> bool:
+        """Check if the bridge only applied part of the request."""
+        return self.status_code == MULTI_VALUE_STATUS
+
+    def finish(self, status_code: int | None, error: Exception | None) -> None:
+        """Record the outcome of the request."""
+        self.elapsed = time.perf_counter() - self.started_at
+        self.status_code = status_code
+        self.error = error
+
+    def trace(self, event_name: str, info: dict[str, Any]) -> None:
+        """Trace callback of httpx, measuring the time spent opening a connection, including the TLS handshake."""
+        if event_name == "connection.connect_tcp.started":
+            self._connect_started_at = time.perf_counter()
+        elif self._connect_started_at and event_name.startswith("connection.") and event_name.endswith(".complete"):
+            self.connect_time = time.perf_counter() - self._connect_started_at
+
+    async def async_trace(self, event_name: str, info: dict[str, Any]) -> None:
+        """Trace callback of the asynchronous httpx client, see `trace`."""
+        self.trace(event_name, info)
+
+
+class Instrumentation:
+    """Hooks called around the requests to the bridge, the base class does nothing.
+
+    Subclass it and override the hooks of interest, then pass it to `instrument()` of a bridge. The hooks are called
+    from the threads sending the requests, or the event loop for an asynchronous bridge, so they should be quick and
+    thread safe. A bridge has no instrumentation by default, in which case no hooks are called and nothing is measured.
+    """
+
+    def on_request(self, request: RequestRecord) -> None:
+        """Called right before a request is sent."""
+
+    def on_response(self, request: RequestRecord) -> None:
+        """Called when a request is answered or failed, with its status code, error and timings filled in."""
+
+    def on_retry(self, request: RequestRecord, attempt: int) -> None:
+        """Called when a failed request is sent again, `attempt` is the number of the attempt about to be sent."""
+
+    def on_queue_wait(self, endpoint: str, wait: float) -> None:
+        """Called when the scheduler sends an update, with the seconds it waited in the queue."""
+
+
+@dataclass
+class Histogram:
+    """Counts of observed values per bucket, the last bucket counts the values above all bounds."""
+
+    bounds: tuple[float, ...] = LATENCY_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+
+    def __post_init__(self) -> None:
+        """Initialize the counts to zero."""
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    @property
+    def mean(self) -> float:
+        """Get the mean of the observed values."""
+        return self.total / self.count if self.count else 0.0
+
+    def observe(self, value: float) -> None:
+        """Count a value in its bucket."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def quantile(self, q: float) -> float:
+        """Get an upper bound of the q-quantile, the bound of the bucket it falls in."""
+        rank = q * self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.bounds, self.counts, strict=False):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return bound
+        return self.maximum
+
+
+class MetricsInstrumentation(Instrumentation):
+    """Instrumentation keeping metrics in memory, labelled by method and resource type.
+
+    The metrics are the latency and status codes of the requests, the time spent opening connections, the number of
+    partly applied (207 multi-status) updates and retries, and the time updates waited in the scheduler.
+    """
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize empty metrics, with histogram buckets of the given upper bounds in seconds."""
+        self.bounds = bounds
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.connect_time = Histogram(bounds)
+        self.status_codes: Counter[tuple[str, str, int | None]] = Counter()
+        self.multi_status: Counter[tuple[str, str]] = Counter()
+        self.retries: Counter[tuple[str, str]] = Counter()
+        self.queue_wait: dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def on_response(self, request: RequestRecord) -> None:
+        """Record the latency and status of the request."""
+        key = (request.method, request.label)
+        with self._lock:
+            self.latency.setdefault(key, Histogram(self.bounds)).observe(request.elapsed)
+            self.status_codes[(*key, request.status_code)] += 1
+            if request.is_multi_status:
+                self.multi_status[key] += 1
+            if request.connect_time:
+                self.connect_time.observe(request.connect_time)
+
+    def on_retry(self, request: RequestRecord, attempt: int) -> None:
+        """Count the retry."""
+        with self._lock:
+            self.retries[(request.method, request.label)] += 1
+
+    def on_queue_wait(self, endpoint: str, wait: float) -> None:
+        """Record the queue wait."""
+        with self._lock:
+            self.queue_wait.setdefault(endpoint_label(endpoint), Histogram(self.bounds)).observe(wait)
+
+
+def _status_label(request: RequestRecord) -> str:
+    """Get the status code as a label, "error" when no response was received."""
+    return "error" if request.status_code is None else str(request.status_code)
+
+
+def _prometheus_client() -> ModuleType:
+    """Import prometheus_client, which is only needed for the Prometheus instrumentation."""
+    try:
+        import prometheus_client
+    except ImportError as err:
+        raise ImportError(
+            "Prometheus metrics require prometheus-client, install it with the prometheus extra."
+        ) from err
+    return prometheus_client
+
+
+class PrometheusInstrumentation(Instrumentation):
+    """Instrumentation exporting the metrics of `MetricsInstrumentation` to Prometheus."""
+
+    def __init__(
+        self, registry: Any = None, namespace: str = "hue_bridge", bounds: tuple[float, ...] = LATENCY_BUCKETS
+    ) -> None:
+        """Register the metrics, in the default registry of prometheus_client unless another one is given."""
+        prometheus_client = _prometheus_client()
+        options: dict[str, Any] = {"namespace": namespace}
+        if registry is not None:
+            options["registry"] = registry
+
+        self.latency = prometheus_client.Histogram(
+            "request_duration_seconds",
+            "Time until the bridge answered a request.",
+            ["method", "endpoint"],
+            buckets=bounds,
+            **options,
+        )
+        self.connect_time = prometheus_client.Histogram(
+            "connect_duration_seconds",
+            "Time spent opening a connection to the bridge, including the TLS handshake.",
+            buckets=bounds,
+            **options,
+        )
+        self.responses = prometheus_client.Counter(
+            "responses_total", "Responses of the bridge by status code.", ["method", "endpoint", "status"], **options
+        )
+        self.multi_status = prometheus_client.Counter(
+            "multi_status_total", "Updates the bridge only applied part of.", ["method", "endpoint"], **options
+        )
+        self.retries = prometheus_client.Counter(
+            "retries_total", "Requests sent again after failing.", ["method", "endpoint"], **options
+        )
+        self.queue_wait = prometheus_client.Histogram(
+            "queue_wait_seconds",
+            "Time updates waited in the scheduler before being sent.",
+            ["endpoint"],
+            buckets=bounds,
+            **options,
+        )
+
+    def on_response(self, request: RequestRecord) -> None:
+        """Record the latency and status of the request."""
+        self.latency.labels(request.method, request.label).observe(request.elapsed)
+        self.responses.labels(request.method, request.label, _status_label(request)).inc()
+        if request.is_multi_status:
+            self.multi_status.labels(request.method, request.label).inc()
+        if request.connect_time:
+            self.connect_time.observe(request.connect_time)
+
+    def on_retry(self, request: RequestRecord, attempt: int) -> None:
+        """Count the retry."""
+        self.retries.labels(request.method, request.label).inc()
+
+    def on_queue_wait(self, endpoint: str, wait: float) -> None:
+        """Record the queue wait."""
+        self.queue_wait.labels(endpoint_label(endpoint)).observe(wait)
+
+
+def _opentelemetry_metrics() -> ModuleType:
+    """Import the metrics API of OpenTelemetry, which is only needed for the OpenTelemetry instrumentation."""
+    try:
+        from opentelemetry import metrics
+    except ImportError as err:
+        raise ImportError(
+            "OpenTelemetry metrics require opentelemetry-api, install it with the opentelemetry extra."
+        ) from err
+    return metrics
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """Instrumentation exporting the metrics of `MetricsInstrumentation` through the OpenTelemetry metrics API.
+
+    The metrics are exported by the meter provider configured by the application, the global one unless another one
+    is given.
+    """
+
+    def __init__(self, meter_provider: Any = None) -> None:
+        """Create the instruments."""
+        meter = _opentelemetry_metrics().get_meter("philips_hue_v2", meter_provider=meter_provider)
+        self.latency = meter.create_histogram(
+            "hue_bridge.request.duration", unit="s", description="Time until the bridge answered a request."
+        )
+        self.connect_time = meter.create_histogram(
+            "hue_bridge.connect.duration",
+            unit="s",
+            description="Time spent opening a connection to the bridge, including the TLS handshake.",
+        )
+        self.multi_status = meter.create_counter(
+            "hue_bridge.multi_status", description="Updates the bridge only applied part of."
+        )
+        self.retries = meter.create_counter("hue_bridge.retries", description="Requests sent again after failing.")
+        self.queue_wait = meter.create_histogram(
+            "hue_bridge.queue_wait", unit="s", description="Time updates waited in the scheduler before being sent."
+        )
+
+    def on_response(self, request: RequestRecord) -> None:
+        """Record the latency and status of the request, the status is an attribute of the latency."""
+        attributes = {"method": request.method, "endpoint": request.label}
+        self.latency.record(request.elapsed, {**attributes, "status": _status_label(request)})
+        if request.is_multi_status:
+            self.multi_status.add(1, attributes)
+        if request.connect_time:
+            self.connect_time.record(request.connect_time)
+
+    def on_retry(self, request: RequestRecord, attempt: int) -> None:
+        """Count the retry."""
+        self.retries.add(1, {"method": request.method, "endpoint": request.label})
+
+    def on_queue_wait(self, endpoint: str, wait: float) -> None:
+        """Record the queue wait."""
+        self.queue_wait.record(wait, {"endpoint": endpoint_label(endpoint)})
@@ -1,20 +1,83 @@
-import pickle
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import Future
+from functools import partial, wraps
 from pathlib import Path
-from typing import Any
+from typing import Any, Concatenate, Generic, ParamSpec, Self, TypeVar
 
-from ..bridge import HueBridge
-from ..lights.lights import Lights
+import httpx
+from pydantic import BaseModel
+from result import Err, Ok
 
+from ..bridge import AsyncHueBridge, BaseHueBridge, HueBridge
+from ..entertainment.entertainment import EntertainmentConfiguration
+from ..groups.groups import Group, GroupedLight
+from ..lights.lights import AsyncLights, BaseLights, Lights, LightUpdate
+from .bulk import ApplyReport, LightApplyResult
+from .requests import async_get_resources, async_get_resources_of_types, get_resources, get_resources_of_types
+from .scheduler import Priority, ResourceResult, merge_bodies
+from .snapshot import check_resources, read_snapshot, required_keys, write_snapshot
 
-class Network:
+
+LightsT = TypeVar("LightsT", bound=BaseLights)
+ModelT = TypeVar("ModelT", bound=BaseModel)
+NetworkT = TypeVar("NetworkT", bound="BaseNetwork[Any]")
+ParamsT = ParamSpec("ParamsT")
+ReturnT = TypeVar("ReturnT")
+# A request of a bulk update: the endpoint, the body and the ids of the lights it covers.
+PlannedRequest = tuple[str, dict[str, Any], frozenset[str]]
+
+GROUP_TYPES = frozenset({"room", "zone", "bridge_home"})
+# The types of the resources used by the network, only these are fetched from the bridge.
+NETWORK_RESOURCE_TYPES = ("light", "room", "zone", "bridge_home", "grouped_light", "entertainment_configuration")
+HTTP_NOT_FOUND = 404
+
+
+def locked(
+    method: Callable[Concatenate[NetworkT, ParamsT], ReturnT],
+) -> Callable[Concatenate[NetworkT, ParamsT], ReturnT]:
+    """Run a method of a network while holding the lock of the network."""
+
+    @wraps(method)
+    def wrapper(self: NetworkT, *args: ParamsT.args, **kwargs: ParamsT.kwargs) -> ReturnT:
+        with self.lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class BaseNetwork(Generic[LightsT]):
     """A class that will be used to parse the network resources.
 
     This is a quite complex task as for example lights can be part of rooms or scenes, and we need references to those.
+    The parsing and lookups are shared between `Network` and `AsyncNetwork`, which only differ in the type of lights
+    they create and how they send updates.
+
+    Lights are indexed by id, casefolded name, id_v1, archetype and by the rooms and zones they are in, so lookups don't
+    depend on the size of the network. The light indexes are updated incrementally as resources change, while the group
+    indexes are rebuilt when the structure of the network changes.
+
+    Resources are validated by pydantic by default. Resources coming straight from the bridge can be trusted, and with
+    `validate=False` the models are built without validation which is noticeably faster for large networks.
+
+    The resources can be saved to a snapshot and loaded from it on the next start, so the network is available without
+    waiting for the bridge. `sync_resources` then brings it up to date with the resources fetched from the bridge.
+
+    An `EventStream` changes the network from its own thread. All changes, and the lookups and planning that read more
+    than one index, hold the reentrant `lock` of the network, so they never see a change half applied. Callers that
+    read several attributes that have to be consistent with each other, for example iterating `lights` while reading
+    `groups`, should hold the lock as well.
     """
 
-    lights: list[Lights] | None = None
+    light_class: type[LightsT]
+    lights: list[LightsT] | None = None
 
-    def __init__(self, resources: list[dict[str, Any]], bridge: HueBridge) -> None:
+    def __init__(
+        self, resources: list[dict[str, Any]], bridge: BaseHueBridge, min_group_size: int = 2, validate: bool = True
+    ) -> None:
         """Initialize the network class.
 
         This might very well be replaced by functions.
@@ -22,42 +85,576 @@ class Network:
         Args:
             resources (list[dict[str, Any]]): A list of resources from the bridge. Typically the raw response from
                 calling the /resource-endpoint.
-            bridge (HueBridge): A bridge object that will be used to communicate with the resources.
+            bridge (BaseHueBridge): A bridge object that will be used to communicate with the resources.
+            min_group_size (int, optional): The smallest number of lights an update is sent to through a grouped light
+                instead of to the lights one by one. Defaults to 2.
+            validate (bool, optional): Validate the resources, and the resources added later on, with pydantic.
+                Defaults to True.
         """
         self.bridge = bridge
+        self.lock = threading.RLock()
+        self.min_group_size = min_group_size
+        self.validate = validate
+        self._lights_by_id: dict[str, LightsT] = {}
+        self._light_ids_by_name: dict[str, set[str]] = {}
+        self._light_ids_by_id_v1: dict[str, str] = {}
+        self._light_ids_by_archetype: dict[str, set[str]] = {}
         self.lights = self.parse_lights(resources)
+        for light in self.lights:
+            self._index_light(light)
+        self.groups = self.parse_groups(resources)
+        self.grouped_lights = self.parse_grouped_lights(resources)
+        self.entertainment_configurations = self.parse_entertainment_configurations(resources)
+        self.reindex_groups()
+
+    @classmethod
+    def from_snapshot(cls, path: Path, bridge: BaseHueBridge, min_group_size: int = 2) -> Self:
+        """Create a network from a snapshot saved with `save_snapshot`.
 
-    def get_light_by_id(self, light_id: str) -> Lights | None:
+        The snapshot was written from validated models, so the resources are not validated again. Only the keys
+        required by the models are checked, which is much faster than validating them.
+
+        Raises:
+            SnapshotError: If the snapshot can't be read, or a resource is missing a required key.
+        """
+        resources = read_snapshot(path)
+        check_resources(
+            resources,
+            {
+                "light": required_keys(cls.light_class, exclude=frozenset({"bridge"})),
+                "grouped_light": required_keys(GroupedLight),
+                "entertainment_configuration": required_keys(EntertainmentConfiguration),
+                **dict.fromkeys(GROUP_TYPES, required_keys(Group)),
+            },
+        )
+        return cls(resources=resources, bridge=bridge, min_group_size=min_group_size, validate=False)
+
+    def save_snapshot(self, path: Path) -> None:
+        """Save the resources of the network to a snapshot."""
+        write_snapshot(self.dump_resources(), path)
+
+    @locked
+    def dump_resources(self) -> list[dict[str, Any]]:
+        """Get the known state of all resources of the network, in the same form as they are returned by the bridge."""
+        return [
+            *({**light.model_dump(mode="json", exclude={"bridge"}), "type": "light"} for light in self.lights or []),
+            *(group.model_dump(mode="json") for group in self.groups),
+            *({**item.model_dump(mode="json"), "type": "grouped_light"} for item in self.grouped_lights),
+            *(configuration.model_dump(mode="json") for configuration in self.entertainment_configurations),
+        ]
+
+    def _index_light(self, light: LightsT) -> None:
+        """Add a light to the light indexes."""
+        self._lights_by_id[light.id] = light
+        self._light_ids_by_name.setdefault(light.name.casefold(), set()).add(light.id)
+        self._light_ids_by_id_v1[light.id_v1] = light.id
+        self._light_ids_by_archetype.setdefault(light.metadata["archetype"], set()).add(light.id)
+
+    def _unindex_light(self, light: LightsT) -> None:
+        """Remove a light from the light indexes."""
+        self._lights_by_id.pop(light.id, None)
+        self._light_ids_by_id_v1.pop(light.id_v1, None)
+        for index, key in (
+            (self._light_ids_by_name, light.name.casefold()),
+            (self._light_ids_by_archetype, light.metadata["archetype"]),
+        ):
+            light_ids = index.get(key, set())
+            light_ids.discard(light.id)
+            if not light_ids:
+                index.pop(key, None)
+
+    @locked
+    def reindex_groups(self) -> None:
+        """Rebuild the group indexes and resolve which lights are in each group."""
+        self._groups_by_id = {group.id: group for group in self.groups}
+        self._group_ids_by_name = {group.name.casefold(): group.id for group in self.groups if group.metadata}
+        self._grouped_lights_by_id = {grouped_light.id: grouped_light for grouped_light in self.grouped_lights}
+        self._light_ids_by_group = self.resolve_group_members()
+        self.group_members = {
+            group.grouped_light_id: self._light_ids_by_group[group.id]
+            for group in self.groups
+            if group.grouped_light_id is not None
+        }
+
+    def get_light_by_id(self, light_id: str) -> LightsT | None:
         """Get a light by its id."""
-        if not self.lights:
-            return None
+        return self._lights_by_id.get(light_id)
 
-        for light in self.lights:
-            if light.id == light_id:
-                return light
-        return None
+    def get_light_by_id_v1(self, light_id_v1: str) -> LightsT | None:
+        """Get a light by its id in the V1 API, for example "/lights/1"."""
+        light_id = self._light_ids_by_id_v1.get(light_id_v1)
+        if light_id is None:
+            return None
+        return self._lights_by_id.get(light_id)
 
-    def get_light_by_name(self, light_name: str) -> Lights | None:
+    def get_light_by_name(self, light_name: str) -> LightsT | None:
         """Get a light by its name.
 
+        This is not case sensitive. If several lights have the same name, any one of them is returned.
+        """
+        light_ids = self._light_ids_by_name.get(light_name.casefold())
+        if not light_ids:
+            return None
+        return self._lights_by_id.get(next(iter(light_ids)))
+
+    def get_group_by_id(self, group_id: str) -> Group | None:
+        """Get a room, a zone or the bridge home by its id."""
+        return self._groups_by_id.get(group_id)
+
+    def get_grouped_light_by_id(self, grouped_light_id: str) -> GroupedLight | None:
+        """Get a grouped light by its id."""
+        return self._grouped_lights_by_id.get(grouped_light_id)
+
+    def get_group_by_name(self, group_name: str) -> Group | None:
+        """Get a room or a zone by its name.
+
         This is not case sensitive.
         """
-        if not self.lights:
+        group_id = self._group_ids_by_name.get(group_name.casefold())
+        if group_id is None:
             return None
+        return self._groups_by_id.get(group_id)
 
-        for light in self.lights:
-            if light.name.lower() == light_name.lower():
-                return light
+    def get_entertainment_configuration_by_id(self, configuration_id: str) -> EntertainmentConfiguration | None:
+        """Get an entertainment configuration by its id."""
+        for configuration in self.entertainment_configurations:
+            if configuration.id == configuration_id:
+                return configuration
+        return None
+
+    def get_entertainment_configuration_by_name(self, configuration_name: str) -> EntertainmentConfiguration | None:
+        """Get an entertainment configuration by its name.
+
+        This is not case sensitive.
+        """
+        for configuration in self.entertainment_configurations:
+            if configuration.name.casefold() == configuration_name.casefold():
+                return configuration
+        return None
+
+    def get_resource(
+        self, resource_type: str, resource_id: str
+    ) -> LightsT | Group | GroupedLight | EntertainmentConfiguration | None:
+        """Get a resource of any type used by the network by its type and id."""
+        if resource_type == "light":
+            return self.get_light_by_id(resource_id)
+        if resource_type == "grouped_light":
+            return self.get_grouped_light_by_id(resource_id)
+        if resource_type in GROUP_TYPES:
+            return self.get_group_by_id(resource_id)
+        if resource_type == "entertainment_configuration":
+            return self.get_entertainment_configuration_by_id(resource_id)
         return None
 
-    def parse_lights(self, resources: list[dict[str, Any]]) -> list[Lights]:
-        """Get a list of all lights among the resources."""
-        return [Lights(bridge=self.bridge, **resource) for resource in resources if resource["type"] == "light"]
+    @locked
+    def get_lights_in_group(self, group: Group) -> list[LightsT]:
+        """Get all lights in a room, a zone or the bridge home."""
+        return [self._lights_by_id[light_id] for light_id in self._light_ids_by_group.get(group.id, frozenset())]
 
+    @locked
+    def find_lights(
+        self,
+        name: str | None = None,
+        archetype: str | None = None,
+        group: str | None = None,
+        id_v1: str | None = None,
+    ) -> set[LightsT]:
+        """Get the lights matching all the given criteria, or all lights if no criteria is given.
+
+        Args:
+            name (str | None, optional): The name of the light, not case sensitive. Defaults to None.
+            archetype (str | None, optional): The archetype of the light, for example "sultan_bulb". Defaults to None.
+            group (str | None, optional): The id or the name of a room or a zone the light is in. Defaults to None.
+            id_v1 (str | None, optional): The id of the light in the V1 API. Defaults to None.
+
+        Returns:
+            set[LightsT]: The matching lights.
+        """
+        candidates: list[set[str] | frozenset[str]] = []
+        if name is not None:
+            candidates.append(self._light_ids_by_name.get(name.casefold(), set()))
+        if archetype is not None:
+            candidates.append(self._light_ids_by_archetype.get(archetype, set()))
+        if group is not None:
+            group_id = group if group in self._groups_by_id else self._group_ids_by_name.get(group.casefold(), "")
+            candidates.append(self._light_ids_by_group.get(group_id, frozenset()))
+        if id_v1 is not None:
+            light_id = self._light_ids_by_id_v1.get(id_v1)
+            candidates.append({light_id} if light_id is not None else set())
+
+        if not candidates:
+            return set(self._lights_by_id.values())
+        smallest = min(candidates, key=len)
+        return {
+            self._lights_by_id[light_id]
+            for light_id in smallest
+            if all(light_id in candidate for candidate in candidates)
+        }
+
+    def parse_resource(self, model: type[ModelT], resource: dict[str, Any]) -> ModelT:
+        """Build a model from a resource, without validating it if the resources are trusted."""
+        if self.validate:
+            return model.model_validate(resource)
+        return model.model_construct(**resource)
+
+    def parse_lights(self, resources: list[dict[str, Any]]) -> list[LightsT]:
+        """Get a list of all lights among the resources, all sharing the bridge of the network."""
+        return [
+            self.parse_resource(self.light_class, {**resource, "bridge": self.bridge})
+            for resource in resources
+            if resource["type"] == "light"
+        ]
+
+    def parse_groups(self, resources: list[dict[str, Any]]) -> list[Group]:
+        """Get a list of all rooms, zones and the bridge home among the resources."""
+        return [self.parse_resource(Group, resource) for resource in resources if resource["type"] in GROUP_TYPES]
+
+    def parse_grouped_lights(self, resources: list[dict[str, Any]]) -> list[GroupedLight]:
+        """Get a list of all grouped lights among the resources."""
+        return [
+            self.parse_resource(GroupedLight, resource) for resource in resources if resource["type"] == "grouped_light"
+        ]
+
+    def parse_entertainment_configurations(self, resources: list[dict[str, Any]]) -> list[EntertainmentConfiguration]:
+        """Get a list of all entertainment configurations among the resources."""
+        return [
+            self.parse_resource(EntertainmentConfiguration, resource)
+            for resource in resources
+            if resource["type"] == "entertainment_configuration"
+        ]
+
+    def resolve_group_members(self) -> dict[str, frozenset[str]]:
+        """Get the ids of the lights in each room, zone and the bridge home, by the id of the group.
+
+        Rooms reference the devices owning the lights, zones reference the lights directly and the bridge home
+        references rooms, so the children are resolved recursively down to the lights.
+        """
+        lights_by_device: dict[str, set[str]] = {}
+        for light in self.lights or []:
+            lights_by_device.setdefault(light.owner["rid"], set()).add(light.id)
 
-def pickle_network(network: Network, path: Path = Path("network.pkl")) -> None:
-    pickle.dump(network, path.open("wb"))
+        def resolve(group: Group) -> set[str]:
+            light_ids: set[str] = set()
+            for child in group.children:
+                if child["rtype"] == "light":
+                    if child["rid"] in self._lights_by_id:
+                        light_ids.add(child["rid"])
+                elif child["rtype"] == "device":
+                    light_ids |= lights_by_device.get(child["rid"], set())
+                elif child["rid"] in self._groups_by_id:
+                    light_ids |= resolve(self._groups_by_id[child["rid"]])
+            return light_ids
+
+        return {group.id: frozenset(resolve(group)) for group in self.groups}
+
+    @locked
+    def apply_event(self, event: dict[str, Any]) -> None:
+        """Apply an event from the event stream of the bridge to the resources of the network.
+
+        Update events carry only the attributes that changed, these are merged into the known state. Add and delete
+        events add or remove whole resources, an add event for a resource that is already known, for example because
+        it was fetched around a reconnect, updates it instead.
+        """
+        for resource in event.get("data", []):
+            if event["type"] == "update":
+                self.apply_update(resource)
+            elif event["type"] == "add":
+                self.apply_resource(resource)
+            elif event["type"] == "delete":
+                self.apply_delete(resource)
+
+    @locked
+    def apply_update(self, resource: dict[str, Any]) -> None:
+        """Merge the attributes of a (partial) resource into the known state of that resource."""
+        target = self.get_resource(resource["type"], resource["id"])
+        if target is None:
+            return
+        light = target if isinstance(target, BaseLights) else None
+        reindex_light = light is not None and not {"metadata", "id_v1"}.isdisjoint(resource)
+        if light is not None and reindex_light:
+            self._unindex_light(light)
+
+        for key, value in resource.items():
+            if key in {"id", "type"} or key not in type(target).model_fields:
+                continue
+            current = getattr(target, key)
+            if isinstance(current, dict) and isinstance(value, dict):
+                setattr(target, key, merge_bodies(current, value))
+            else:
+                setattr(target, key, value)
+
+        if light is not None:
+            if reindex_light:
+                self._index_light(light)
+            if "owner" in resource:
+                self.reindex_groups()
+        elif not {"children", "services", "metadata"}.isdisjoint(resource):
+            self.reindex_groups()
+
+    @locked
+    def apply_resources(self, resources: list[dict[str, Any]]) -> None:
+        """Merge the state of full resources, for example after fetching them again, into the known state."""
+        for resource in resources:
+            self.apply_update(resource)
+
+    @locked
+    def sync_resources(self, resources: list[dict[str, Any]]) -> None:
+        """Bring the network up to date with the full list of resources of the bridge.
+
+        Known resources are updated, new resources are added and the resources that are no longer on the bridge are
+        removed.
+        """
+        known = {
+            *(("light", light_id) for light_id in self._lights_by_id),
+            *((group.type, group.id) for group in self.groups),
+            *(("grouped_light", item.id) for item in self.grouped_lights),
+            *(("entertainment_configuration", item.id) for item in self.entertainment_configurations),
+        }
+        current = {(resource["type"], resource["id"]) for resource in resources}
+        for resource in resources:
+            self.apply_resource(resource)
+        for resource_type, resource_id in known - current:
+            self.apply_delete({"type": resource_type, "id": resource_id})
+
+    @locked
+    def apply_resource(self, resource: dict[str, Any]) -> None:
+        """Merge the state of a full resource into the known state, adding the resource if it is not known yet."""
+        if self.get_resource(resource["type"], resource["id"]) is None:
+            self.apply_add(resource)
+        else:
+            self.apply_update(resource)
+
+    @locked
+    def apply_add(self, resource: dict[str, Any]) -> None:
+        """Add a resource that was created on the bridge."""
+        if resource["type"] == "light":
+            lights = self.parse_lights([resource])
+            self.lights = [*(self.lights or []), *lights]
+            for light in lights:
+                self._index_light(light)
+        elif resource["type"] == "grouped_light":
+            self.grouped_lights.extend(self.parse_grouped_lights([resource]))
+        elif resource["type"] in GROUP_TYPES:
+            self.groups.extend(self.parse_groups([resource]))
+        elif resource["type"] == "entertainment_configuration":
+            self.entertainment_configurations.extend(self.parse_entertainment_configurations([resource]))
+            return
+        else:
+            return
+        self.reindex_groups()
+
+    @locked
+    def apply_delete(self, resource: dict[str, Any]) -> None:
+        """Remove a resource that was deleted from the bridge."""
+        if resource["type"] == "light":
+            light = self.get_light_by_id(resource["id"])
+            if light is None:
+                return
+            self._unindex_light(light)
+            self.lights = [item for item in self.lights or [] if item.id != light.id]
+        elif resource["type"] == "grouped_light":
+            self.grouped_lights = [item for item in self.grouped_lights if item.id != resource["id"]]
+        elif resource["type"] in GROUP_TYPES:
+            self.groups = [group for group in self.groups if group.id != resource["id"]]
+        elif resource["type"] == "entertainment_configuration":
+            self.entertainment_configurations = [
+                item for item in self.entertainment_configurations if item.id != resource["id"]
+            ]
+            return
+        else:
+            return
+        self.reindex_groups()
+
+    @locked
+    def plan_update(self, lights: Iterable[BaseLights]) -> list[tuple[str, frozenset[str]]]:
+        """Plan the fewest requests needed to send the same update to all the lights.
+
+        Grouped lights whose lights are all among the targets are used first, largest first, and the remaining lights
+        are updated one by one.
+
+        Returns:
+            list[tuple[str, frozenset[str]]]: The endpoints to update, with the ids of the lights each one covers.
+        """
+        targets = {light.id: light for light in lights}
+        remaining = set(targets)
+        plan: list[tuple[str, frozenset[str]]] = []
+        for grouped_light_id, members in sorted(self.group_members.items(), key=lambda item: -len(item[1])):
+            if len(members) >= self.min_group_size and members <= remaining:
+                plan.append((f"/grouped_light/{grouped_light_id}", members))
+                remaining -= members
+        plan.extend(
+            (targets[light_id].endpoint, frozenset({light_id})) for light_id in targets if light_id in remaining
+        )
+        return plan
+
+    def plan_apply(
+        self, states: Mapping[LightsT, LightUpdate]
+    ) -> tuple[list[PlannedRequest], dict[str, LightApplyResult]]:
+        """Plan the fewest requests needed to bring every light in its own state.
+
+        The lights getting the same update are updated together, through grouped lights where possible as in
+        `plan_update`. Lights that are already in their state, and lights their state can't be built for, for example
+        a color for a light without color, get their result right away instead of a request.
+
+        Returns:
+            tuple[list[PlannedRequest], dict[str, LightApplyResult]]: The requests with the ids of the lights each one
+                covers, and the results of the lights without a request by their id.
+        """
+        results: dict[str, LightApplyResult] = {}
+        lights_by_body: dict[str, tuple[dict[str, Any], list[LightsT]]] = {}
+        for light, changes in states.items():
+            try:
+                body = light.build_update(**changes)
+            except ValueError as err:
+                results[light.id] = LightApplyResult(light_id=light.id, result=Err(err))
+                continue
+            if not body:
+                results[light.id] = LightApplyResult(light_id=light.id, result=Ok({}))
+                continue
+            lights_by_body.setdefault(json.dumps(body, sort_keys=True), (body, []))[1].append(light)
+
+        requests = [
+            (endpoint, body, members)
+            for body, lights in lights_by_body.values()
+            for endpoint, members in self.plan_update(lights)
+        ]
+        return requests, results
+
+    def report_apply(
+        self,
+        requests: list[PlannedRequest],
+        responses: list[tuple[ResourceResult, float]],
+        results: dict[str, LightApplyResult],
+        elapsed: float,
+    ) -> ApplyReport:
+        """Report the result of every light from the responses to the planned requests, with the time each one took.
+
+        The known state of the lights is updated with the attributes that were applied, if the bridge skips unchanged
+        updates.
+        """
+        for (endpoint, body, members), (response, answered_after) in zip(requests, responses, strict=True):
+            for light_id in members:
+                item = LightApplyResult.from_response(light_id, endpoint, body, response, answered_after)
+                results[light_id] = item
+                light = self._lights_by_id.get(light_id)
+                if light is not None and item.result.is_ok() and self.bridge.skip_unchanged_updates:
+                    light.apply_state(item.result.unwrap())
+        return ApplyReport(results=results, requests=len(requests), elapsed=elapsed)
+
+
+class Network(BaseNetwork[Lights]):
+    """The network of resources connected to a `HueBridge`."""
+
+    light_class = Lights
+    bridge: HueBridge
+
+    @classmethod
+    def fetch(cls, bridge: HueBridge, min_group_size: int = 2, validate: bool = True) -> Self:
+        """Create a network from the resources of the bridge, only the types used by the network are fetched."""
+        resources = get_resources_of_types(bridge, NETWORK_RESOURCE_TYPES).unwrap()
+        return cls(resources=resources, bridge=bridge, min_group_size=min_group_size, validate=validate)
+
+    def resync(self) -> None:
+        """Fetch the resources used by the network again, and bring the network up to date with them."""
+        self.sync_resources(get_resources_of_types(self.bridge, NETWORK_RESOURCE_TYPES).unwrap())
+
+    def refresh_resource(self, resource_type: str, resource_id: str) -> None:
+        """Fetch a single resource again and update the network with it, removing it if it is gone from the bridge."""
+        result = get_resources(self.bridge, f"/{resource_type}/{resource_id}")
+        if result.is_err():
+            error = result.unwrap_err()
+            if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == HTTP_NOT_FOUND:
+                self.apply_delete({"type": resource_type, "id": resource_id})
+                return
+            raise error
+        for resource in result.unwrap():
+            self.apply_resource(resource)
+
+    def submit_update(self, lights: Iterable[Lights], body: dict[str, Any]) -> "list[Future[ResourceResult]]":
+        """Queue the same update to all the lights, through grouped lights where possible, without waiting for it."""
+        return [self.bridge.scheduler.submit(body=body, endpoint=endpoint) for endpoint, _ in self.plan_update(lights)]
+
+    def update_lights(self, lights: Iterable[Lights], body: dict[str, Any]) -> None:
+        """Send the same update to all the lights, through grouped lights where possible.
+
+        All requests are queued at once and this blocks until they have been sent.
+        """
+        for future in self.submit_update(lights, body):
+            future.result()
+
+    def apply(self, states: Mapping[Lights, LightUpdate], priority: int = Priority.NORMAL) -> ApplyReport:
+        """Bring every light in its own state, for example the states of a scene, and report the result of every light.
+
+        The requests planned by `plan_apply` are queued at once, and sent concurrently by the workers of the scheduler
+        of the bridge within its rate limits. This blocks until all of them have been answered. Errors are reported
+        per light instead of raised, and when the bridge applies only part of a state the failed attributes are
+        reported.
+
+        Example:
+            `network.apply({light: {"on": True, "brightness": 60, "mirek": 370} for light in lights})`
+        """
+        start = time.perf_counter()
+        requests, results = self.plan_apply(states)
+
+        def answered(future: "Future[ResourceResult]", timed: "Future[tuple[ResourceResult, float]]") -> None:
+            timed.set_result((future.result(), time.perf_counter() - start))
+
+        timed_futures: list[Future[tuple[ResourceResult, float]]] = []
+        for endpoint, body, _ in requests:
+            timed: Future[tuple[ResourceResult, float]] = Future()
+            future = self.bridge.scheduler.submit(body=body, endpoint=endpoint, priority=priority)
+            future.add_done_callback(partial(answered, timed=timed))
+            timed_futures.append(timed)
+        responses = [timed.result() for timed in timed_futures]
+        return self.report_apply(requests, responses, results, time.perf_counter() - start)
+
+
+class AsyncNetwork(BaseNetwork[AsyncLights]):
+    """The network of resources connected to an `AsyncHueBridge`."""
+
+    light_class = AsyncLights
+    bridge: AsyncHueBridge
+
+    @classmethod
+    async def fetch(cls, bridge: AsyncHueBridge, min_group_size: int = 2, validate: bool = True) -> Self:
+        """Create a network from the resources of the bridge, only the types used by the network are fetched."""
+        resources = (await async_get_resources_of_types(bridge, NETWORK_RESOURCE_TYPES)).unwrap()
+        return cls(resources=resources, bridge=bridge, min_group_size=min_group_size, validate=validate)
+
+    async def resync(self) -> None:
+        """Fetch the resources used by the network again, and bring the network up to date with them."""
+        self.sync_resources((await async_get_resources_of_types(self.bridge, NETWORK_RESOURCE_TYPES)).unwrap())
+
+    async def refresh_resource(self, resource_type: str, resource_id: str) -> None:
+        """Fetch a single resource again and update the network with it, removing it if it is gone from the bridge."""
+        result = await async_get_resources(self.bridge, f"/{resource_type}/{resource_id}")
+        if result.is_err():
+            error = result.unwrap_err()
+            if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == HTTP_NOT_FOUND:
+                self.apply_delete({"type": resource_type, "id": resource_id})
+                return
+            raise error
+        for resource in result.unwrap():
+            self.apply_resource(resource)
+
+    async def update_lights(self, lights: Iterable[AsyncLights], body: dict[str, Any]) -> None:
+        """Send the same update to all the lights, through grouped lights where possible."""
+        await asyncio.gather(
+            *(self.bridge.update_resource(body=body, endpoint=endpoint) for endpoint, _ in self.plan_update(lights))
+        )
+
+    async def apply(self, states: Mapping[AsyncLights, LightUpdate], priority: int = Priority.NORMAL) -> ApplyReport:
+        """Bring every light in its own state, for example the states of a scene, and report the result of every light.
+
+        Works as `Network.apply`, the requests are sent concurrently within the rate limits of the scheduler and the
+        concurrency limit of the bridge.
+        """
+        start = time.perf_counter()
+        requests, results = self.plan_apply(states)
 
+        async def send(endpoint: str, body: dict[str, Any]) -> tuple[ResourceResult, float]:
+            response = await self.bridge.update_resource(body=body, endpoint=endpoint, priority=priority)
+            return response, time.perf_counter() - start
 
-def unpickle_network(path: Path = Path("network.pkl")) -> Network:
-    return pickle.load(path.open("rb"))
+        responses = await asyncio.gather(*(send(endpoint, body) for endpoint, body, _ in requests))
+        return self.report_apply(requests, list(responses), results, time.perf_counter() - start)
@@ -1,13 +1,19 @@
+import asyncio
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING, Any, TypedDict
 
 import httpx
 from result import Err, Ok, Result
 
 from .. import OtherApiError
+from .instrumentation import MULTI_VALUE_STATUS, RequestRecord
+from .retry import RequestAttempts
 
 
 if TYPE_CHECKING:
-    from philips_hue_v2.bridge import HueBridge
+    from philips_hue_v2.bridge import AsyncHueBridge, HueBridge
 
 
 class ResponseObject(TypedDict):
@@ -17,26 +23,139 @@ class ResponseObject(TypedDict):
     errors: list[dict[str, str]]
 
 
-MULTI_VALUE_STATUS = 207
+RESOURCE_PATH = "/clip/v2/resource"
 
 
-def get_resources(bridge: "HueBridge", endpoint: str = "") -> Result[list[dict[str, Any]], Exception]:
+def _send(
+    bridge: "HueBridge", method: str, endpoint: str, body: dict[str, Any] | None, timeout: httpx.Timeout
+) -> httpx.Response:
+    """Send a request to the bridge once, reporting it to the instrumentation of the bridge if it has any."""
+    url = f"{RESOURCE_PATH}{endpoint}"
+    instrumentation = bridge.instrumentation
+    if instrumentation is None:
+        return bridge.client.request(method, url, json=body, timeout=timeout)
+
+    record = RequestRecord(method=method, endpoint=endpoint)
+    instrumentation.on_request(record)
+    try:
+        response = bridge.client.request(method, url, json=body, timeout=timeout, extensions={"trace": record.trace})
+    except Exception as err:
+        record.finish(status_code=None, error=err)
+        instrumentation.on_response(record)
+        raise
+    record.finish(status_code=response.status_code, error=None)
+    instrumentation.on_response(record)
+    return response
+
+
+def _request(
+    bridge: "HueBridge", method: str, endpoint: str, body: dict[str, Any] | None = None, deadline: float | None = None
+) -> httpx.Response:
+    """Send a request to the bridge, retrying it while the bridge is overloaded, see `RequestAttempts`."""
+    attempts = RequestAttempts(bridge, method, endpoint, body, deadline)
+    while True:
+        timeout = attempts.timeout()
+        try:
+            response = _send(bridge, method, endpoint, body, timeout)
+        except Exception as err:
+            delay = attempts.retry_delay(None, err)
+            if delay is None:
+                raise
+        except BaseException:
+            attempts.abandon()
+            raise
+        else:
+            delay = attempts.retry_delay(response, None)
+            if delay is None:
+                return response
+        time.sleep(delay)
+
+
+async def _async_send(
+    bridge: "AsyncHueBridge", method: str, endpoint: str, body: dict[str, Any] | None, timeout: httpx.Timeout
+) -> httpx.Response:
+    """Send a request to the bridge once using asyncio, see `_send`.
+
+    The request is only timed once it got past the semaphore of the bridge, so the latency excludes the wait for it.
+    """
+    url = f"{RESOURCE_PATH}{endpoint}"
+    instrumentation = bridge.instrumentation
+    async with bridge.semaphore:
+        if instrumentation is None:
+            return await bridge.client.request(method, url, json=body, timeout=timeout)
+
+        record = RequestRecord(method=method, endpoint=endpoint)
+        instrumentation.on_request(record)
+        try:
+            response = await bridge.client.request(
+                method, url, json=body, timeout=timeout, extensions={"trace": record.async_trace}
+            )
+        except Exception as err:
+            record.finish(status_code=None, error=err)
+            instrumentation.on_response(record)
+            raise
+    record.finish(status_code=response.status_code, error=None)
+    instrumentation.on_response(record)
+    return response
+
+
+async def _async_request(
+    bridge: "AsyncHueBridge",
+    method: str,
+    endpoint: str,
+    body: dict[str, Any] | None = None,
+    deadline: float | None = None,
+) -> httpx.Response:
+    """Send a request to the bridge using asyncio, see `_request`. The semaphore is released while waiting to retry."""
+    attempts = RequestAttempts(bridge, method, endpoint, body, deadline)
+    while True:
+        timeout = attempts.timeout()
+        try:
+            response = await _async_send(bridge, method, endpoint, body, timeout)
+        except Exception as err:
+            delay = attempts.retry_delay(None, err)
+            if delay is None:
+                raise
+        except BaseException:
+            attempts.abandon()
+            raise
+        else:
+            delay = attempts.retry_delay(response, None)
+            if delay is None:
+                return response
+        await asyncio.sleep(delay)
+
+
+def _get_data(response: httpx.Response) -> list[dict[str, Any]]:
+    """Get the resources from the response of a GET request, raising on any error status."""
+    response.raise_for_status()
+    response_json: dict[str, list[Any]] = response.json()
+    return response_json["data"]
+
+
+def _put_data(response: httpx.Response, endpoint: str) -> list[dict[str, Any]]:
+    """Get the updated resources from the response of a PUT request, raising on any error status."""
+    response.raise_for_status()
+    if response.status_code == MULTI_VALUE_STATUS:
+        raise OtherApiError(resource=endpoint, errors=response.json()["errors"])
+
+    response_json: ResponseObject = response.json()
+    return response_json["data"]
+
+
+def get_resources(
+    bridge: "HueBridge", endpoint: str = "", deadline: float | None = None
+) -> Result[list[dict[str, Any]], Exception]:
     """General function to get resources from the bridge.
 
-    Used to abstract away the httpx.get() and authentication.
+    Used to abstract away the HTTP request and authentication, which are handled by the pooled client of the bridge.
+    The request is retried while the bridge is overloaded, until `deadline` seconds have passed, which defaults to the
+    deadline of the bridge. While the circuit breaker of the bridge is open, a `CircuitOpenError` is returned right
+    away.
     """
-    url = httpx.URL(url=f"https://{bridge.ip_address}/clip/v2/resource{endpoint}")
-    headers = httpx.Headers({"hue-application-key": bridge.user_name})
     try:
-        response = httpx.get(
-            url=url,
-            headers=headers,
-            verify=False,  # noqa: S501 - This is only supposed to be used in a local network!
-        )
-        response.raise_for_status()
-        response_json: dict[str, list[Any]] = response.json()
-
-        resources = response_json["data"]
+        response = _request(bridge, "GET", endpoint, deadline=deadline)
+        resources = _get_data(response)
 
     except httpx.HTTPStatusError as err:
         return Err(err)
@@ -48,29 +167,61 @@ def get_resources(bridge: "HueBridge", endpoint: str = "") -> Result[list[dict[s
         return Ok(resources)
 
 
-def put_resources(bridge: "HueBridge", body: dict[str, Any], endpoint: str) -> Result[list[dict[str, Any]], Exception]:
+def put_resources(
+    bridge: "HueBridge", body: dict[str, Any], endpoint: str, deadline: float | None = None
+) -> Result[list[dict[str, Any]], Exception]:
     """General function to put (update) resources from the bridge.
 
-    Used to abstract away the httpx.put() and authentication. In some cases a 207 is raised, which means a multi-value
-    status. This typically means that something worked out fine but, something also failed. An example of this is
-    trying to change color on a light that doesn't support color. It successfully found the light resource, but could
-    not find the color attribute. In that case, we raise an OtherApiError.
+    Used to abstract away the HTTP request and authentication, which are handled by the pooled client of the bridge. In
+    some cases a 207 is raised, which means a multi-value status. This typically means that something worked out fine
+    but, something also failed. An example of this is trying to change color on a light that doesn't support color. It
+    successfully found the light resource, but could not find the color attribute. In that case, we raise an
+    OtherApiError. Retries, the deadline and the circuit breaker work as in `get_resources`, but updates with relative
+    changes are never retried.
+    """
+    try:
+        response = _request(bridge, "PUT", endpoint, body, deadline)
+        resources = _put_data(response, endpoint)
+
+    except httpx.HTTPStatusError as err:
+        return Err(err)
+    except httpx.HTTPError as err:
+        return Err(err)
+    except Exception as err:
+        return Err(err)
+    else:
+        return Ok(resources)
+
+
+def get_resources_of_types(
+    bridge: "HueBridge", resource_types: Iterable[str]
+) -> Result[list[dict[str, Any]], Exception]:
+    """Get the resources of the given types from the bridge.
+
+    Only the endpoints of the given types are requested, concurrently, instead of getting every resource of the bridge.
+    """
+    endpoints = [f"/{resource_type}" for resource_type in resource_types]
+    with ThreadPoolExecutor(max_workers=max(1, min(len(endpoints), bridge.max_connections))) as executor:
+        results = list(executor.map(lambda endpoint: get_resources(bridge, endpoint), endpoints))
+
+    resources: list[dict[str, Any]] = []
+    for result in results:
+        if result.is_err():
+            return result
+        resources.extend(result.unwrap())
+    return Ok(resources)
+
+
+async def async_get_resources(
+    bridge: "AsyncHueBridge", endpoint: str = "", deadline: float | None = None
+) -> Result[list[dict[str, Any]], Exception]:
+    """General function to get resources from the bridge using asyncio.
+
+    Works as `get_resources`, but the number of concurrent requests is bounded by the semaphore of the bridge.
     """
-    url = httpx.URL(url=f"https://{bridge.ip_address}/clip/v2/resource{endpoint}")
-    headers = httpx.Headers({"hue-application-key": bridge.user_name})
     try:
-        response = httpx.put(
-            url=url,
-            headers=headers,
-            json=body,
-            verify=False,  # noqa: S501 - This is only supposed to be used in a local network!
-        )
-        response.raise_for_status()
-        if response.status_code == MULTI_VALUE_STATUS:
-            raise OtherApiError(resource=endpoint, errors=response.json()["errors"])
-
-        response_json: ResponseObject = response.json()
-        resources = response_json["data"]
+        response = await _async_request(bridge, "GET", endpoint, deadline=deadline)
+        resources = _get_data(response)
 
     except httpx.HTTPStatusError as err:
         return Err(err)
@@ -80,3 +231,44 @@ def put_resources(bridge: "HueBridge", body: dict[str, Any], endpoint: str) -> R
         return Err(err)
     else:
         return Ok(resources)
+
+
+async def async_put_resources(
+    bridge: "AsyncHueBridge", body: dict[str, Any], endpoint: str, deadline: float | None = None
+) -> Result[list[dict[str, Any]], Exception]:
+    """General function to put (update) resources from the bridge using asyncio.
+
+    Works as `put_resources`, including how a 207 multi-value status is handled, but the number of concurrent requests
+    is bounded by the semaphore of the bridge.
+    """
+    try:
+        response = await _async_request(bridge, "PUT", endpoint, body, deadline)
+        resources = _put_data(response, endpoint)
+
+    except httpx.HTTPStatusError as err:
+        return Err(err)
+    except httpx.HTTPError as err:
+        return Err(err)
+    except Exception as err:
+        return Err(err)
+    else:
+        return Ok(resources)
+
+
+async def async_get_resources_of_types(
+    bridge: "AsyncHueBridge", resource_types: Iterable[str]
+) -> Result[list[dict[str, Any]], Exception]:
+    """Get the resources of the given types from the bridge using asyncio.
+
+    Works as `get_resources_of_types`, the types are requested concurrently within the semaphore of the bridge.
+    """
+    results = await asyncio.gather(
+        *(async_get_resources(bridge, f"/{resource_type}") for resource_type in resource_types)
+    )
+
+    resources: list[dict[str, Any]] = []
+    for result in results:
+        if result.is_err():
+            return result
+        resources.extend(result.unwrap())
+    return Ok(resources)
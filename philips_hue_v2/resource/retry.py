@@ -0,0 +1,189 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from .instrumentation import RequestRecord
+from .scheduler import can_coalesce
+
+
+if TYPE_CHECKING:
+    from philips_hue_v2.bridge import BaseHueBridge
+
+
+# Responses of a bridge that is overloaded or restarting, which are worth sending the request again for.
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+HTTP_SERVER_ERROR = 500
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker of the bridge is open."""
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when the deadline of a call passed before the bridge answered it."""
+
+
+class CircuitState(Enum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Circuit breaker failing requests fast while the bridge is unhealthy.
+
+    The circuit opens after `failure_threshold` consecutive failures, a failure being a request that got no response
+    or a server error. While it is open requests fail right away, until `reset_timeout` seconds have passed and a
+    single request is let through as a probe. The circuit closes again when the probe succeeds, and opens again when
+    it fails.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0) -> None:
+        """Initialize a closed circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        """Get the state of the circuit."""
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+        if self._probing or time.monotonic() - self._opened_at >= self.reset_timeout:
+            return CircuitState.HALF_OPEN
+        return CircuitState.OPEN
+
+    def allow(self) -> bool:
+        """Check if a request can be sent, letting a single probe through once the reset timeout has passed."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit at the threshold or when the probe failed."""
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release_probe(self) -> None:
+        """Let another request probe the bridge, when the probe ended without an outcome, for example cancelled."""
+        with self._lock:
+            self._probing = False
+
+
+def retry_after(response: httpx.Response) -> float | None:
+    """Get the number of seconds the bridge asked to wait with the `Retry-After` header, None if it did not ask."""
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestAttempts:
+    """The attempts of sending a request to the bridge, within the deadline and circuit breaker of the bridge.
+
+    Only idempotent requests are retried: reading resources, and updates that only set absolute values. An update with
+    relative changes such as `dimming_delta` is sent once, since it would be applied twice if the bridge did receive
+    the first attempt. A retry waits a random time between 0 and an exponentially growing backoff, or as long as the
+    bridge asked with `Retry-After`, and is not made when the wait would not end before the deadline.
+
+    When an attempt ends without an outcome, because it was cancelled or interrupted, `abandon` must be called so a
+    probe of the circuit breaker is not held forever.
+    """
+
+    def __init__(  # noqa: PLR0913 - The request is passed on from the request functions
+        self, bridge: "BaseHueBridge", method: str, endpoint: str, body: dict[str, Any] | None, deadline: float | None
+    ) -> None:
+        """Start the attempts, the deadline is in seconds from now and defaults to the deadline of the bridge."""
+        self.bridge = bridge
+        self.method = method
+        self.endpoint = endpoint
+        self.attempt = 1
+        self.probing = False
+        self.retryable = body is None or can_coalesce(body)
+        deadline = bridge.deadline if deadline is None else deadline
+        self.deadline_at = None if deadline is None else time.monotonic() + deadline
+
+    def timeout(self) -> httpx.Timeout:
+        """Get the timeout of the next attempt, raising instead when it should not be sent."""
+        timeout = self.bridge.timeout
+        if self.deadline_at is not None:
+            timeout = min(timeout, self.deadline_at - time.monotonic())
+            if timeout <= 0:
+                raise DeadlineExceededError(f"The deadline passed before {self.endpoint} was answered.")
+        breaker = self.bridge.circuit_breaker
+        half_open = breaker.state is CircuitState.HALF_OPEN
+        if not breaker.allow():
+            raise CircuitOpenError(f"The bridge at {self.bridge.ip_address} is unhealthy, not sending {self.endpoint}.")
+        self.probing = half_open
+        return httpx.Timeout(timeout, connect=min(timeout, self.bridge.connect_timeout))
+
+    def retry_delay(self, response: httpx.Response | None, error: Exception | None) -> float | None:
+        """Record the outcome of an attempt, and get the seconds to wait before the next one, None to not retry."""
+        breaker = self.bridge.circuit_breaker
+        self.probing = False
+        if response is None or response.status_code >= HTTP_SERVER_ERROR:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if not self.retryable or self.attempt > self.bridge.max_retries:
+            return None
+        if response is not None and response.status_code not in RETRY_STATUS_CODES:
+            return None
+        if error is not None and not isinstance(error, httpx.TransportError):
+            return None
+
+        backoff = min(self.bridge.retry_backoff_max, self.bridge.retry_backoff * 2 ** (self.attempt - 1))
+        delay = random.uniform(0, backoff)  # noqa: S311 - Jitter does not need a secure random generator
+        requested = None if response is None else retry_after(response)
+        if requested is not None:
+            if requested > self.bridge.retry_after_max and self.deadline_at is None:
+                return None
+            delay = min(requested, self.bridge.retry_after_max)
+        if self.deadline_at is not None and time.monotonic() + delay >= self.deadline_at:
+            return None
+
+        self.attempt += 1
+        instrumentation = self.bridge.instrumentation
+        if instrumentation is not None:
+            status_code = None if response is None else response.status_code
+            record = RequestRecord(method=self.method, endpoint=self.endpoint, status_code=status_code, error=error)
+            instrumentation.on_retry(record, self.attempt)
+        return delay
+
+    def abandon(self) -> None:
+        """Release the probe of the circuit breaker if the attempt in progress was the probe."""
+        if self.probing:
+            self.probing = False
+            self.bridge.circuit_breaker.release_probe()
@@ -0,0 +1,516 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any
+
+from result import Err, Result
+
+from .instrumentation import Instrumentation
+
+
+ResourceResult = Result[list[dict[str, Any]], Exception]
+SendFunction = Callable[[dict[str, Any], str], ResourceResult]
+AsyncSendFunction = Callable[[dict[str, Any], str], Awaitable[ResourceResult]]
+
+GROUP_ENDPOINT_PREFIX = "/grouped_light/"
+TOKEN_COST = 1.0
+
+# Relative changes add up, so they can't be merged by letting the latest value win.
+RELATIVE_ATTRIBUTES = frozenset({"dimming_delta", "color_temperature_delta"})
+# Attributes that override each other, setting one of them discards a pending value of the other.
+EXCLUSIVE_ATTRIBUTES = {"color": "color_temperature", "color_temperature": "color"}
+
+
+def can_coalesce(body: dict[str, Any]) -> bool:
+    """Check if a body only holds absolute values, which can be merged with other bodies."""
+    return RELATIVE_ATTRIBUTES.isdisjoint(body)
+
+
+def merge_bodies(base: dict[str, Any], update: dict[str, Any]) -> dict[str, Any]:
+    """Merge two bodies for the same resource, the latest value of every attribute wins.
+
+    Nested attributes are merged recursively, so for example a pending brightness is kept when only the color is
+    updated. Neither of the bodies is modified.
+    """
+    merged = {key: value for key, value in base.items() if EXCLUSIVE_ATTRIBUTES.get(key) not in update}
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_bodies(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class Priority(IntEnum):
+    """Priority of a command, commands with a lower value are sent first."""
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class TokenBucket:
+    """A token bucket rate limiter.
+
+    Tokens are refilled continuously at `rate` tokens per second, up to `capacity` tokens. Sending a command costs one
+    token, so `capacity` is the largest burst that is sent back-to-back.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        """Initialize a full token bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        """Get the number of seconds until a token is available, 0 if a token is available right now."""
+        self._refill(now)
+        if self.tokens >= TOKEN_COST:
+            return 0.0
+        return (TOKEN_COST - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        """Take one token from the bucket."""
+        self._refill(now)
+        self.tokens -= TOKEN_COST
+
+
+@dataclass
+class Command:
+    """A pending update of a resource.
+
+    A coalesced command carries the futures of every update that was merged into it.
+    """
+
+    endpoint: str
+    body: dict[str, Any]
+    priority: int
+    sequence: int
+    enqueued_at: float
+    futures: list["Future[ResourceResult] | asyncio.Future[ResourceResult]"]
+
+
+@dataclass
+class SchedulerMetrics:
+    """Metrics of a command scheduler.
+
+    The queue wait is the time from a command being submitted until it is sent to the bridge.
+    """
+
+    commands_sent: int = 0
+    commands_coalesced: int = 0
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    queue_wait_last: float = 0.0
+
+    @property
+    def queue_wait_mean(self) -> float:
+        """Get the mean queue wait in seconds."""
+        if not self.commands_sent:
+            return 0.0
+        return self.queue_wait_total / self.commands_sent
+
+    def record_queue_wait(self, wait: float) -> None:
+        """Record the queue wait of a command that is being sent."""
+        self.commands_sent += 1
+        self.queue_wait_total += wait
+        self.queue_wait_max = max(self.queue_wait_max, wait)
+        self.queue_wait_last = wait
+
+
+class CommandQueue:
+    """Commands waiting to be sent, FIFO per endpoint and ordered by priority across endpoints.
+
+    Only the oldest command of an endpoint can be sent, and only when no other command for that endpoint is in flight,
+    so the updates of a resource always reach the bridge in the order they were submitted. An endpoint is ranked by the
+    most urgent of its pending commands, which lets a high priority command pull older commands of the same endpoint
+    along instead of overtaking them.
+
+    With `coalesce` enabled, a command is merged into the last pending command of its endpoint instead of being queued
+    after it, so only the merged state is sent once the endpoint gets its turn.
+    """
+
+    def __init__(self, coalesce: bool = False) -> None:
+        """Initialize an empty queue."""
+        self.coalesce = coalesce
+        self._pending: dict[str, deque[Command]] = {}
+        self._in_flight: set[str] = set()
+        self._heap: list[tuple[int, int, str]] = []
+        self._keys: dict[str, tuple[int, int]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Get the number of commands that have not been sent yet."""
+        return self._size
+
+    def _schedule(self, endpoint: str) -> None:
+        """Rank the endpoint in the heap if it has a command that can be sent."""
+        queue = self._pending.get(endpoint)
+        if not queue or endpoint in self._in_flight:
+            return
+
+        key = (min(command.priority for command in queue), queue[0].sequence)
+        if self._keys.get(endpoint) != key:
+            self._keys[endpoint] = key
+            heapq.heappush(self._heap, (*key, endpoint))
+
+    def _discard_stale(self) -> None:
+        """Remove heap entries that no longer match the current rank of their endpoint."""
+        while self._heap and self._keys.get(self._heap[0][2]) != self._heap[0][:2]:
+            heapq.heappop(self._heap)
+
+    def push(self, command: Command) -> bool:
+        """Add a command to the queue, returns True if it was coalesced with a pending command."""
+        queue = self._pending.setdefault(command.endpoint, deque())
+        if self.coalesce and queue and can_coalesce(queue[-1].body) and can_coalesce(command.body):
+            tail = queue[-1]
+            tail.body = merge_bodies(tail.body, command.body)
+            tail.futures.extend(command.futures)
+            tail.priority = min(tail.priority, command.priority)
+            self._schedule(command.endpoint)
+            return True
+
+        queue.append(command)
+        self._size += 1
+        self._schedule(command.endpoint)
+        return False
+
+    def peek(self) -> tuple[int, int] | None:
+        """Get the rank of the next command that can be sent, None if there is none."""
+        self._discard_stale()
+        if not self._heap:
+            return None
+        priority, sequence, _ = self._heap[0]
+        return priority, sequence
+
+    def pop(self) -> Command | None:
+        """Get the next command that can be sent and mark its endpoint as in flight."""
+        self._discard_stale()
+        if not self._heap:
+            return None
+
+        _, _, endpoint = heapq.heappop(self._heap)
+        del self._keys[endpoint]
+        queue = self._pending[endpoint]
+        command = queue.popleft()
+        if not queue:
+            del self._pending[endpoint]
+        self._size -= 1
+        self._in_flight.add(endpoint)
+        return command
+
+    def done(self, endpoint: str) -> None:
+        """Mark the command in flight for the endpoint as finished, allowing the next one to be sent."""
+        self._in_flight.discard(endpoint)
+        self._schedule(endpoint)
+
+
+@dataclass
+class _Lane:
+    """A queue of commands sharing the same rate limit."""
+
+    bucket: TokenBucket
+    queue: CommandQueue
+
+
+class BaseCommandScheduler:
+    """Rate limiting shared by the threaded and the asyncio scheduler.
+
+    The bridge handles roughly 10 light commands per second and a lot fewer group commands, so commands to
+    `/grouped_light` endpoints and all other commands are paced by separate token buckets. When both have a command
+    that can be sent, the most urgent one goes first.
+    """
+
+    def __init__(  # noqa: PLR0913 - The rate limits are passed on from the bridge settings
+        self,
+        light_rate: float = 10.0,
+        group_rate: float = 1.0,
+        burst: float = 1.0,
+        coalesce: bool = False,
+        instrumentation: Instrumentation | None = None,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            light_rate (float, optional): Light commands per second. Defaults to 10.0.
+            group_rate (float, optional): Group commands per second. Defaults to 1.0.
+            burst (float, optional): Number of commands that can be sent back-to-back. Defaults to 1.0.
+            coalesce (bool, optional): Merge pending commands for the same endpoint. Defaults to False.
+            instrumentation (Instrumentation | None, optional): Instrumentation the queue wait of every command is
+                reported to. Defaults to None.
+        """
+        self.metrics = SchedulerMetrics()
+        self.instrumentation = instrumentation
+        self._light_lane = _Lane(bucket=TokenBucket(rate=light_rate, capacity=burst), queue=CommandQueue(coalesce))
+        self._group_lane = _Lane(bucket=TokenBucket(rate=group_rate, capacity=burst), queue=CommandQueue(coalesce))
+        self._sequence = itertools.count()
+        self._closed = False
+
+    def _lane(self, endpoint: str) -> _Lane:
+        """Get the lane used for commands to the endpoint."""
+        if endpoint.startswith(GROUP_ENDPOINT_PREFIX):
+            return self._group_lane
+        return self._light_lane
+
+    def _has_pending(self) -> bool:
+        """Check if there are commands that have not been sent yet."""
+        return bool(len(self._light_lane.queue) or len(self._group_lane.queue))
+
+    def _push(
+        self,
+        body: dict[str, Any],
+        endpoint: str,
+        priority: int,
+        future: "Future[ResourceResult] | asyncio.Future[ResourceResult]",
+    ) -> None:
+        """Add a command to the queue of its lane."""
+        if self._closed:
+            raise RuntimeError("The scheduler is closed.")
+
+        command = Command(
+            endpoint=endpoint,
+            body=body,
+            priority=priority,
+            sequence=next(self._sequence),
+            enqueued_at=time.monotonic(),
+            futures=[future],
+        )
+        if self._lane(endpoint).queue.push(command):
+            self.metrics.commands_coalesced += 1
+
+    def _next(self) -> tuple[Command | None, float]:
+        """Get the next command to send, or the number of seconds until one might be ready.
+
+        The delay is infinite when nothing can be sent until a command in flight finishes or a new one is submitted.
+        """
+        now = time.monotonic()
+        best: tuple[tuple[int, int], _Lane] | None = None
+        delay = math.inf
+        for lane in (self._light_lane, self._group_lane):
+            key = lane.queue.peek()
+            if key is None:
+                continue
+            wait = lane.bucket.delay(now)
+            if wait > 0:
+                delay = min(delay, wait)
+            elif best is None or key < best[0]:
+                best = (key, lane)
+
+        if best is None:
+            return None, delay
+
+        _, lane = best
+        lane.bucket.consume(now)
+        command = lane.queue.pop()
+        if command is None:
+            return None, delay
+        wait = now - command.enqueued_at
+        self.metrics.record_queue_wait(wait)
+        if self.instrumentation is not None:
+            self.instrumentation.on_queue_wait(command.endpoint, wait)
+        return command, 0.0
+
+    def _complete(self, command: Command) -> None:
+        """Release the endpoint of a command that has been sent."""
+        self._lane(command.endpoint).queue.done(command.endpoint)
+
+
+class CommandScheduler(BaseCommandScheduler):
+    """Sends commands to the bridge from a background thread, within the rate limits of the bridge."""
+
+    def __init__(  # noqa: PLR0913 - The rate limits are passed on from the bridge settings
+        self,
+        send: SendFunction,
+        light_rate: float = 10.0,
+        group_rate: float = 1.0,
+        burst: float = 1.0,
+        coalesce: bool = False,
+        max_workers: int = 4,
+        instrumentation: Instrumentation | None = None,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            send (SendFunction): Function sending a body to an endpoint, typically `put_resources` for a bridge.
+            light_rate (float, optional): Light commands per second. Defaults to 10.0.
+            group_rate (float, optional): Group commands per second. Defaults to 1.0.
+            burst (float, optional): Number of commands that can be sent back-to-back. Defaults to 1.0.
+            coalesce (bool, optional): Merge pending commands for the same endpoint. Defaults to False.
+            max_workers (int, optional): Number of commands that can be in flight at the same time. Defaults to 4.
+            instrumentation (Instrumentation | None, optional): Instrumentation the queue wait of every command is
+                reported to. Defaults to None.
+        """
+        super().__init__(
+            light_rate=light_rate,
+            group_rate=group_rate,
+            burst=burst,
+            coalesce=coalesce,
+            instrumentation=instrumentation,
+        )
+        self._send = send
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hue-command")
+        self._worker: threading.Thread | None = None
+
+    def submit(self, body: dict[str, Any], endpoint: str, priority: int = Priority.NORMAL) -> "Future[ResourceResult]":
+        """Queue a command, the returned future is resolved with the result of `send`."""
+        future: Future[ResourceResult] = Future()
+        with self._condition:
+            self._push(body=body, endpoint=endpoint, priority=priority, future=future)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="hue-scheduler", daemon=True)
+                self._worker.start()
+            self._condition.notify()
+        return future
+
+    def _run(self) -> None:
+        """Dispatch commands as soon as the rate limits allow, until closed and drained."""
+        with self._condition:
+            while True:
+                command, delay = self._next()
+                if command is not None:
+                    self._executor.submit(self._send_command, command)
+                    continue
+                if self._closed and not self._has_pending():
+                    return
+                self._condition.wait(timeout=None if math.isinf(delay) else delay)
+
+    def _send_command(self, command: Command) -> None:
+        """Send a command and resolve its futures, skipping the futures that were cancelled.
+
+        The endpoint is released even if resolving a future fails, so later commands to it are not blocked.
+        """
+        try:
+            try:
+                result = self._send(command.body, command.endpoint)
+            except Exception as err:
+                result = Err(err)
+            for future in command.futures:
+                # The threaded scheduler only creates concurrent futures, the check narrows the type of the command.
+                if isinstance(future, Future) and future.set_running_or_notify_cancel():
+                    future.set_result(result)
+        finally:
+            with self._condition:
+                self._complete(command)
+                self._condition.notify()
+
+    def close(self) -> None:
+        """Stop accepting commands, and wait until the pending ones have been sent."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._worker is not None:
+            self._worker.join()
+        self._executor.shutdown(wait=True)
+
+
+class AsyncCommandScheduler(BaseCommandScheduler):
+    """Sends commands to the bridge from an asyncio task, within the rate limits of the bridge.
+
+    The task only runs while there are commands to dispatch, and is started again when new commands are submitted.
+    """
+
+    def __init__(  # noqa: PLR0913 - The rate limits are passed on from the bridge settings
+        self,
+        send: AsyncSendFunction,
+        light_rate: float = 10.0,
+        group_rate: float = 1.0,
+        burst: float = 1.0,
+        coalesce: bool = False,
+        instrumentation: Instrumentation | None = None,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            send (AsyncSendFunction): Coroutine function sending a body to an endpoint, typically
+                `async_put_resources` for a bridge.
+            light_rate (float, optional): Light commands per second. Defaults to 10.0.
+            group_rate (float, optional): Group commands per second. Defaults to 1.0.
+            burst (float, optional): Number of commands that can be sent back-to-back. Defaults to 1.0.
+            coalesce (bool, optional): Merge pending commands for the same endpoint. Defaults to False.
+            instrumentation (Instrumentation | None, optional): Instrumentation the queue wait of every command is
+                reported to. Defaults to None.
+        """
+        super().__init__(
+            light_rate=light_rate,
+            group_rate=group_rate,
+            burst=burst,
+            coalesce=coalesce,
+            instrumentation=instrumentation,
+        )
+        self._send = send
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task[None] | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def submit(
+        self, body: dict[str, Any], endpoint: str, priority: int = Priority.NORMAL
+    ) -> "asyncio.Future[ResourceResult]":
+        """Queue a command, the returned future is resolved with the result of `send`."""
+        future: asyncio.Future[ResourceResult] = asyncio.get_running_loop().create_future()
+        self._push(body=body, endpoint=endpoint, priority=priority, future=future)
+        self._wake()
+        return future
+
+    def _wake(self) -> None:
+        """Wake up the dispatching task, starting it if it is not running."""
+        self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Dispatch commands as soon as the rate limits allow, until there is nothing left to dispatch."""
+        while True:
+            command, delay = self._next()
+            if command is not None:
+                task = asyncio.create_task(self._send_command(command))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                continue
+            if math.isinf(delay):
+                return
+            self._wakeup.clear()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+
+    async def _send_command(self, command: Command) -> None:
+        """Send a command and resolve its futures, skipping the futures that were cancelled.
+
+        The endpoint is released even if the task is cancelled, so later commands to it are not blocked.
+        """
+        try:
+            try:
+                result = await self._send(command.body, command.endpoint)
+            except Exception as err:
+                result = Err(err)
+            for future in command.futures:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._complete(command)
+            if self._has_pending():
+                self._wake()
+
+    async def aclose(self) -> None:
+        """Stop accepting commands, and wait until the pending ones have been sent."""
+        self._closed = True
+        while self._has_pending() or self._tasks:
+            if self._worker is not None:
+                await self._worker
+            if self._tasks:
+                await asyncio.gather(*self._tasks)
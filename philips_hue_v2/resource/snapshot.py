@@ -0,0 +1,73 @@
+import json
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+
+SNAPSHOT_FORMAT = "philips-hue-v2/network-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot can't be read, or was written in another format or version."""
+
+
+def write_snapshot(resources: list[dict[str, Any]], path: Path) -> None:
+    """Write resources to a snapshot, preceded by a header with the format and version of the snapshot.
+
+    The snapshot is written to a temporary file first and then moved in place, so a snapshot is never left half written.
+    """
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.time(),
+        "resources": resources,
+    }
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    with temporary_path.open("w", encoding="utf-8") as file:
+        json.dump(snapshot, file, separators=(",", ":"))
+    temporary_path.replace(path)
+
+
+def read_snapshot(path: Path) -> list[dict[str, Any]]:
+    """Read the resources of a snapshot, after checking its format and version."""
+    try:
+        with path.open(encoding="utf-8") as file:
+            snapshot = json.load(file)
+    except (OSError, json.JSONDecodeError) as err:
+        raise SnapshotError(f"Could not read the snapshot {path}: {err}") from err
+
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"{path} is not a network snapshot.")
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {snapshot.get('version')}, expected {SNAPSHOT_VERSION}.")
+    resources = snapshot.get("resources")
+    if not isinstance(resources, list) or not all(
+        isinstance(resource, dict) and isinstance(resource.get("id"), str) and isinstance(resource.get("type"), str)
+        for resource in resources
+    ):
+        raise SnapshotError(f"The resources of the snapshot {path} are not a list of resources with an id and a type.")
+    return resources
+
+
+def required_keys(model: type[BaseModel], exclude: frozenset[str] = frozenset()) -> frozenset[str]:
+    """Get the keys a resource must have to build a model from it, leaving out the keys that are not stored."""
+    return frozenset(name for name, field in model.model_fields.items() if field.is_required()) - exclude
+
+
+def check_resources(resources: list[dict[str, Any]], keys_by_type: Mapping[str, frozenset[str]]) -> None:
+    """Check that every resource has the keys required by the model of its type.
+
+    The models of a snapshot are built without validation, so this catches a snapshot that was edited by hand or
+    written by an incompatible version before the models end up with missing attributes. Resources of other types are
+    not checked, they are ignored by the network.
+    """
+    for resource in resources:
+        missing = keys_by_type.get(resource["type"], frozenset()).difference(resource)
+        if missing:
+            raise SnapshotError(
+                f"The {resource['type']} {resource['id']} of the snapshot is missing {', '.join(sorted(missing))}."
+            )
@@ -0,0 +1,28 @@
+from collections.abc import Iterator
+
+import pytest
+
+from philips_hue_v2.bridge import HueBridge
+from philips_hue_v2.emulator import UNLIMITED_RATES, BridgeEmulator
+from philips_hue_v2.resource.network import Network
+
+
+@pytest.fixture()
+def emulator() -> Iterator[BridgeEmulator]:
+    """A bridge emulator with 20 lights in two rooms, without latency or rate limits."""
+    emulator = BridgeEmulator.with_lights(20)
+    yield emulator
+    emulator.shutdown()
+
+
+@pytest.fixture()
+def bridge(emulator: BridgeEmulator) -> Iterator[HueBridge]:
+    """A bridge connected to the emulator."""
+    with emulator.bridge(**UNLIMITED_RATES) as bridge:
+        yield bridge
+
+
+@pytest.fixture()
+def network(bridge: HueBridge) -> Network:
+    """The network of the emulated bridge."""
+    return Network.fetch(bridge)
@@ -0,0 +1,106 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+from philips_hue_v2.bridge import AsyncHueBridge
+from philips_hue_v2.emulator import UNLIMITED_RATES, BridgeEmulator
+from philips_hue_v2.lights.lights import AsyncLights, LightUpdate
+from philips_hue_v2.resource.network import AsyncNetwork, Network
+
+
+def run_with_network(
+    emulator: BridgeEmulator, test: Callable[[AsyncNetwork], Awaitable[None]], **settings: bool
+) -> None:
+    """Run a test with a network fetched through an asyncio bridge to the emulator."""
+
+    async def run() -> None:
+        async with emulator.async_bridge(**UNLIMITED_RATES, **settings) as bridge:
+            await test(await AsyncNetwork.fetch(bridge))
+
+    asyncio.run(run())
+
+
+def test_fetch_matches_the_synchronous_network(emulator: BridgeEmulator, network: Network) -> None:
+    async def test(async_network: AsyncNetwork) -> None:
+        assert all(isinstance(light, AsyncLights) for light in async_network.lights or [])
+        assert async_network.dump_resources() == network.dump_resources()
+        assert [group.id for group in async_network.groups] == [group.id for group in network.groups]
+
+    run_with_network(emulator, test)
+
+
+def test_light_update(emulator: BridgeEmulator) -> None:
+    async def test(network: AsyncNetwork) -> None:
+        light = (network.lights or [])[1]
+        await light.update(on=True, brightness=40, mirek=250)
+
+        resource = emulator.resources[light.id]
+        assert resource["on"] == {"on": True}
+        assert resource["dimming"]["brightness"] == 40
+        assert resource["color_temperature"]["mirek"] == 250
+        assert light.on == {"on": True}
+        assert light.dimming["brightness"] == 40
+
+        await light.turn_off()
+        assert emulator.resources[light.id]["on"] == {"on": False}
+
+    run_with_network(emulator, test, skip_unchanged_updates=True)
+
+
+def test_update_lights_of_a_room(emulator: BridgeEmulator) -> None:
+    async def test(network: AsyncNetwork) -> None:
+        room = next(group for group in network.groups if group.type == "room")
+        lights = network.get_lights_in_group(room)
+        await network.update_lights(lights, {"on": {"on": True}})
+
+        assert all(emulator.resources[light.id]["on"] == {"on": True} for light in lights)
+        assert emulator.resources[room.grouped_light_id or ""]["on"] == {"on": True}
+
+    run_with_network(emulator, test)
+
+
+def test_apply(emulator: BridgeEmulator) -> None:
+    async def test(network: AsyncNetwork) -> None:
+        lights = (network.lights or [])[1:4]
+        states = {light: LightUpdate(on=True, brightness=10.0 * (index + 1)) for index, light in enumerate(lights)}
+
+        report = await network.apply(states)
+
+        assert report.is_ok()
+        assert report.requests == len(lights)
+        for light, state in states.items():
+            assert emulator.resources[light.id]["dimming"]["brightness"] == state["brightness"]
+
+    run_with_network(emulator, test)
+
+
+def test_refresh_resource(emulator: BridgeEmulator) -> None:
+    async def test(network: AsyncNetwork) -> None:
+        first, second = (network.lights or [])[:2]
+        emulator.resources[first.id]["on"] = {"on": True}
+        del emulator.resources[second.id]
+
+        await network.refresh_resource("light", first.id)
+        await network.refresh_resource("light", second.id)
+
+        assert first.on == {"on": True}
+        assert network.get_light_by_id(second.id) is None
+
+    run_with_network(emulator, test)
+
+
+def test_bridge_update_resource(emulator: BridgeEmulator) -> None:
+    light_id = next(resource["id"] for resource in emulator.resources.values() if resource["type"] == "light")
+
+    async def run() -> None:
+        async with emulator.async_bridge(**UNLIMITED_RATES) as bridge:
+            assert isinstance(bridge, AsyncHueBridge)
+            result = await bridge.update_resource(body={"on": {"on": True}}, endpoint=f"/light/{light_id}")
+            assert result.unwrap() == [{"rid": light_id, "rtype": "light"}]
+
+            missing = await bridge.update_resource(body={"on": {"on": True}}, endpoint="/light/unknown")
+            assert isinstance(missing.unwrap_err(), httpx.HTTPStatusError)
+
+    asyncio.run(run())
+    assert emulator.resources[light_id]["on"] == {"on": True}
@@ -0,0 +1,67 @@
+from philips_hue_v2 import OtherApiError
+from philips_hue_v2.emulator import BridgeEmulator
+from philips_hue_v2.lights.lights import LightUpdate
+from philips_hue_v2.resource.bulk import failed_attributes
+from philips_hue_v2.resource.network import Network
+
+
+def error(*descriptions: str) -> OtherApiError:
+    """Build the error of a 207 multi-status response."""
+    return OtherApiError("/light/a", [{"description": description} for description in descriptions])
+
+
+def test_failed_attributes_by_path() -> None:
+    body = {"on": {"on": True}, "color": {"xy": {"x": 0.3, "y": 0.3}}, "dimming": {"brightness": 50.0}}
+    soft_off = 'device (light) is "soft off", command (.color.xy) may not have effect'
+
+    failed = failed_attributes(error(soft_off, "command (.dimming.brightness) may not have effect"), body)
+
+    assert failed == {"color": soft_off, "dimming": "command (.dimming.brightness) may not have effect"}
+
+
+def test_failed_attributes_of_unknown_descriptions_are_the_whole_error() -> None:
+    body = {"on": {"on": True}, "dimming": {"brightness": 50.0}}
+
+    assert failed_attributes(error("device (light) has no attribute dimming"), body) is None
+    assert failed_attributes(error("command (.dimming) may not have effect", "internal error"), body) is None
+
+
+def test_failed_attributes_ignores_words_in_descriptions() -> None:
+    body = {"on": {"on": True}, "color": {"xy": {"x": 0.3, "y": 0.3}}}
+
+    assert failed_attributes(error("device (light) is turned on, the color can't be set"), body) is None
+
+
+def test_apply_reports_every_light(network: Network) -> None:
+    lights = (network.lights or [])[1:4]
+    states = {light: LightUpdate(on=True, brightness=10.0 * (index + 1)) for index, light in enumerate(lights)}
+
+    report = network.apply(states)
+
+    assert report.is_ok()
+    assert report.requests == 3
+    assert sorted(report.succeeded) == sorted(light.id for light in lights)
+    assert all(item.endpoint == f"/light/{light_id}" for light_id, item in report.results.items())
+
+
+def test_apply_reports_lights_the_state_cant_be_built_for(network: Network) -> None:
+    without_color = (network.lights or [])[0]
+    with_color = (network.lights or [])[1]
+
+    report = network.apply({without_color: {"xy": (0.3, 0.3)}, with_color: {"xy": (0.3, 0.3)}})
+
+    assert report.failed == [without_color.id]
+    assert report.results[without_color.id].endpoint is None
+    assert report.succeeded == [with_color.id]
+
+
+def test_apply_reports_partially_applied_states(emulator: BridgeEmulator, network: Network) -> None:
+    light = (network.lights or [])[1]
+    del emulator.resources[light.id]["color_temperature"]
+
+    report = network.apply({light: {"on": True, "mirek": 300}})
+
+    item = report.results[light.id]
+    assert report.partial == [light.id]
+    assert list(item.failed) == ["color_temperature"]
+    assert item.result.unwrap() == {"on": {"on": True}}
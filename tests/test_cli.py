@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import pytest
+from result import Err
+
+from philips_hue_v2.cli import CommandError, build_changes, build_parser, command_bench, command_set, main
+from philips_hue_v2.emulator import BridgeEmulator
+from philips_hue_v2.resource import network as network_module
+from philips_hue_v2.resource.network import Network
+
+
+def test_build_changes_from_options() -> None:
+    args = build_parser().parse_args(["set", "--all", "--on", "--rgb", "255,120,0", "--duration", "500"])
+
+    assert build_changes(vars(args)) == {"on": True, "rgb": {"red": 255, "green": 120, "blue": 0}, "duration": 500}
+
+
+def test_build_changes_rejects_invalid_steps() -> None:
+    with pytest.raises(CommandError, match="Nothing to change"):
+        build_changes({"all": True})
+    with pytest.raises(CommandError, match="Only one of"):
+        build_changes({"all": True, "mirek": 300, "kelvin": 2700})
+
+
+def test_set_fits_temperatures_in_the_range_of_every_light(emulator: BridgeEmulator, network: Network) -> None:
+    lights = network.lights or []
+    narrow, default = lights[1], lights[2]
+    assert narrow.color_temperature is not None
+    narrow.color_temperature["mirek_schema"] = {"mirek_minimum": 250, "mirek_maximum": 454}
+
+    command_set(network, build_parser().parse_args(["set", "--id", narrow.id, "--id", default.id, "--mirek", "100"]))
+
+    assert emulator.resources[narrow.id]["color_temperature"]["mirek"] == 250
+    assert emulator.resources[default.id]["color_temperature"]["mirek"] == 153
+
+
+def test_bench_waits_for_every_command(network: Network, capsys: pytest.CaptureFixture[str]) -> None:
+    command_bench(network, build_parser().parse_args(["bench", "--all", "--count", "50"]))
+
+    output = capsys.readouterr().out
+    assert "Commands:         50 to 20 lights, 0 failed" in output
+    assert "Requests:         50 (200: 50)" in output
+
+
+def test_unreadable_snapshot_is_reported(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    path = tmp_path / "network.json"
+    path.write_text("{}")
+
+    assert main(["--emulate", "5", "--snapshot", str(path), "lights"]) == 1
+    assert "is not a network snapshot" in capsys.readouterr().err
+
+
+def test_failing_fetch_is_reported(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+    monkeypatch.setattr(network_module, "get_resources_of_types", lambda *_: Err(ConnectionError("unreachable")))
+
+    assert main(["--emulate", "5", "lights"]) == 1
+    assert "Could not get the resources of the bridge: unreachable" in capsys.readouterr().err
@@ -0,0 +1,58 @@
+from collections.abc import Iterator
+
+import pytest
+
+from philips_hue_v2.bridge import HueBridge
+from philips_hue_v2.emulator import UNLIMITED_RATES, BridgeEmulator
+from philips_hue_v2.resource.cluster import BridgeCluster
+from philips_hue_v2.resource.network import Network
+
+
+@pytest.fixture()
+def cluster(emulator: BridgeEmulator) -> Iterator[BridgeCluster]:
+    """A cluster of the emulated bridge and a second emulated bridge with 5 lights."""
+    other = BridgeEmulator.with_lights(5)
+    cluster = BridgeCluster.fetch([emulator.bridge(**UNLIMITED_RATES), other.bridge(**UNLIMITED_RATES)])
+    yield cluster
+    cluster.close()
+    other.shutdown()
+
+
+def test_lookups_search_all_bridges(cluster: BridgeCluster) -> None:
+    first, second = cluster.networks
+    light = (second.lights or [])[0]
+
+    assert len(cluster.lights) == 25
+    assert cluster.get_light_by_id(light.id) is light
+    assert cluster.get_light_by_id("unknown") is None
+    assert cluster.get_light_by_name("light 10") is (first.lights or [])[10]
+
+
+def test_partition_by_bridge(cluster: BridgeCluster) -> None:
+    first, second = cluster.networks
+    lights = [*(second.lights or [])[:2], *(first.lights or [])[:3]]
+
+    partitions = cluster.partition(lights)
+
+    assert [(network, len(members)) for network, members in partitions] == [(second, 2), (first, 3)]
+
+
+def test_partition_rejects_lights_of_other_bridges(cluster: BridgeCluster, network: Network) -> None:
+    with pytest.raises(ValueError, match="not connected to a bridge of the cluster"):
+        cluster.partition([(network.lights or [])[0]])
+
+
+def test_close_closes_every_bridge(cluster: BridgeCluster, monkeypatch: pytest.MonkeyPatch) -> None:
+    first, second = cluster.networks
+    closed = []
+
+    def close(bridge: HueBridge) -> None:
+        if bridge is first.bridge:
+            raise RuntimeError("close failed")
+        closed.append(bridge)
+
+    monkeypatch.setattr(HueBridge, "close", close)
+
+    with pytest.raises(RuntimeError, match="close failed"):
+        cluster.close()
+    assert closed == [second.bridge]
@@ -0,0 +1,79 @@
+import math
+import random
+
+import pytest
+
+from philips_hue_v2.lights.color import (
+    LOOKUP_MIN_COMPONENT,
+    Converter,
+    Gamut,
+    GamutA,
+    GamutB,
+    GamutC,
+    RGBLookupTable,
+    get_converter,
+    use_lookup_table,
+)
+
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture(scope="module")
+def lookup_table() -> RGBLookupTable:
+    """A lookup table for gamut C with the default resolution."""
+    return RGBLookupTable.build(GamutC)
+
+
+def test_lookup_table_is_within_its_error_bound(lookup_table: RGBLookupTable) -> None:
+    exact = Converter(GamutC)
+    colors = np.random.default_rng(0).integers(0, 256, size=(20_000, 3))
+    colors = colors[colors.max(axis=1) >= LOOKUP_MIN_COMPONENT]
+
+    expected = exact.rgb_to_xy_batch(colors)
+    found = lookup_table.table[tuple((colors >> lookup_table.shift).T)]
+
+    assert np.hypot(*(found - expected).T).max() < 0.009
+
+
+def test_dark_colors_are_converted_exactly(lookup_table: RGBLookupTable) -> None:
+    exact = Converter(GamutC)
+    converter = Converter(GamutC, lookup_table=lookup_table)
+
+    for rgb in ((1, 0, 0), (0, 0, 1), (10, 40, 63)):
+        assert converter.rgb_to_xy(*rgb) == exact.rgb_to_xy(*rgb)
+    assert math.dist(converter.rgb_to_xy(200, 30, 90), exact.rgb_to_xy(200, 30, 90)) < 0.009
+
+
+def test_shared_converters_use_a_lookup_table_only_when_asked(lookup_table: RGBLookupTable) -> None:
+    exact = Converter(GamutC)
+    rgb = [random.Random(1).randrange(LOOKUP_MIN_COMPONENT, 256) for _ in range(3)]
+    assert get_converter("C").lookup_table is None
+
+    use_lookup_table("C", lookup_table)
+    try:
+        assert get_converter("C").rgb_to_xy(*rgb) == lookup_table.rgb_to_xy(*rgb)
+    finally:
+        use_lookup_table("C", None)
+    assert get_converter("C").rgb_to_xy(*rgb) == exact.rgb_to_xy(*rgb)
+
+
+@pytest.mark.parametrize("gamut", [GamutA, GamutB, GamutC], ids=["A", "B", "C"])
+def test_batch_rgb_to_xy_matches_the_scalar_conversion(gamut: Gamut) -> None:
+    converter = Converter(gamut)
+    colors = np.random.default_rng(2).integers(0, 256, size=(5_000, 3))
+    colors = colors[colors.max(axis=1) > 0]
+
+    expected = np.array([converter.rgb_to_xy(*color) for color in colors.tolist()])
+
+    assert np.abs(converter.rgb_to_xy_batch(colors) - expected).max() < 1e-12
+
+
+@pytest.mark.parametrize("gamut", [GamutA, GamutB, GamutC], ids=["A", "B", "C"])
+def test_batch_xy_to_rgb_matches_the_scalar_conversion(gamut: Gamut) -> None:
+    converter = Converter(gamut)
+    points = np.random.default_rng(3).uniform(0.01, 0.8, size=(5_000, 2))
+
+    expected = np.array([converter.xy_to_rgb(x, y) for x, y in points.tolist()])
+
+    assert (converter.xy_to_rgb_batch(points) != expected).sum() == 0
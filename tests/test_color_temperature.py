@@ -0,0 +1,62 @@
+import math
+
+import pytest
+
+from philips_hue_v2.lights.color import (
+    HUE_MIREK_MAX,
+    HUE_MIREK_MIN,
+    LOCUS_MIREK_MAX,
+    LOCUS_MIREK_MIN,
+    PLANCKIAN_LOCUS,
+    clamp_mirek,
+    kelvin_to_mirek,
+    mirek_to_xy,
+    planckian_locus_xy,
+)
+from philips_hue_v2.resource.network import Network
+
+
+# Points of the Planckian locus from the CIE 1931 tables, the approximation is within 0.001 of them.
+@pytest.mark.parametrize(
+    ("kelvin", "xy"),
+    [
+        (1667, (0.5646, 0.4029)),
+        (2000, (0.5267, 0.4133)),
+        (2700, (0.4599, 0.4106)),
+        (6500, (0.3135, 0.3237)),
+        (25000, (0.2525, 0.2523)),
+    ],
+)
+def test_locus_matches_known_points(kelvin: int, xy: tuple[float, float]) -> None:
+    assert math.dist(planckian_locus_xy(kelvin), xy) < 0.001
+
+
+def test_locus_table_has_every_whole_mirek() -> None:
+    assert len(PLANCKIAN_LOCUS) == LOCUS_MIREK_MAX - LOCUS_MIREK_MIN + 1
+    for mirek in (LOCUS_MIREK_MIN, HUE_MIREK_MIN, 370, HUE_MIREK_MAX, LOCUS_MIREK_MAX):
+        assert mirek_to_xy(mirek) == planckian_locus_xy(1_000_000 / mirek)
+
+
+def test_mirek_conversions() -> None:
+    assert kelvin_to_mirek(2700) == 370
+    assert kelvin_to_mirek(6500) == 154
+    assert mirek_to_xy(369.6) == mirek_to_xy(370)
+    assert mirek_to_xy(LOCUS_MIREK_MIN - 10) == PLANCKIAN_LOCUS[0]
+    assert mirek_to_xy(LOCUS_MIREK_MAX + 10) == PLANCKIAN_LOCUS[-1]
+
+
+def test_mirek_is_clamped_to_the_range_of_the_lights() -> None:
+    assert clamp_mirek(kelvin_to_mirek(6536)) == HUE_MIREK_MIN
+    assert clamp_mirek(kelvin_to_mirek(10000)) == HUE_MIREK_MIN
+    assert clamp_mirek(kelvin_to_mirek(2000)) == HUE_MIREK_MAX
+    assert clamp_mirek(kelvin_to_mirek(1667)) == HUE_MIREK_MAX
+    assert clamp_mirek(100, 120, 300) == 120
+
+
+def test_light_without_color_temperature_is_set_to_the_xy_color_of_the_temperature(network: Network) -> None:
+    light = next(light for light in network.lights or [] if light.color is not None)
+    light.color_temperature = None
+
+    assert light.clamp_mirek(1_000) == HUE_MIREK_MAX
+    x, y = mirek_to_xy(kelvin_to_mirek(2700))
+    assert light.build_body(kelvin=2700) == {"color": {"xy": {"x": x, "y": y}}}
@@ -0,0 +1,109 @@
+import asyncio
+import json
+from collections.abc import Callable
+
+import httpx
+
+from philips_hue_v2.emulator import BridgeEmulator
+from philips_hue_v2.resource.eventstream import (
+    EVENTSTREAM_PATH,
+    AsyncEventStream,
+    EventStream,
+    ServerSentEvent,
+    ServerSentEventParser,
+)
+from philips_hue_v2.resource.network import AsyncNetwork, Network
+
+
+def feed(parser: ServerSentEventParser, text: str) -> list[ServerSentEvent]:
+    events = [parser.feed(line) for line in text.split("\n")]
+    return [event for event in events if event is not None]
+
+
+def test_parser_joins_multi_line_data() -> None:
+    parser = ServerSentEventParser()
+    assert feed(parser, "event: update\ndata: first\ndata:second\n\n") == [
+        ServerSentEvent(data="first\nsecond", event="update")
+    ]
+    assert feed(parser, "data: next\n\n") == [ServerSentEvent(data="next")]
+
+
+def test_parser_ignores_comments_and_empty_events() -> None:
+    parser = ServerSentEventParser()
+    assert feed(parser, ": hi\n\n\n: keepalive\ndata: payload\nretry: 10\n\n") == [ServerSentEvent(data="payload")]
+
+
+def test_parser_keeps_the_last_event_id() -> None:
+    parser = ServerSentEventParser()
+    assert feed(parser, "id: 1:0\ndata: a\n\ndata: b\n\n") == [
+        ServerSentEvent(data="a", id="1:0"),
+        ServerSentEvent(data="b", id="1:0"),
+    ]
+    assert parser.last_event_id == "1:0"
+
+
+def test_parser_reset_drops_the_event_in_progress() -> None:
+    parser = ServerSentEventParser()
+    assert feed(parser, "id: 7\ndata: a\n\nevent: update\ndata: cut") == [ServerSentEvent(data="a", id="7")]
+
+    parser.reset()
+
+    assert feed(parser, "data: b\n\n") == [ServerSentEvent(data="b", id="7")]
+    assert parser.last_event_id == "7"
+
+
+def light_on_event(light_id: str) -> str:
+    container = {"type": "update", "data": [{"id": light_id, "type": "light", "on": {"on": True}}]}
+    return f"data: {json.dumps([container])}\n\n"
+
+
+def reconnecting_transport(
+    emulator: BridgeEmulator, bodies: list[str], received: list[httpx.Request]
+) -> Callable[[httpx.Request], httpx.Response]:
+    """A handler answering the event stream with the bodies in turn, and every other request with the emulator."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path != EVENTSTREAM_PATH:
+            return emulator.handle_request(request)
+        received.append(request)
+        return httpx.Response(200, text=bodies[len(received) - 1], headers={"Content-Type": "text/event-stream"})
+
+    return handler
+
+
+def test_reconnect_in_the_middle_of_an_event(emulator: BridgeEmulator) -> None:
+    received: list[httpx.Request] = []
+    light_id = next(resource["id"] for resource in emulator.resources.values() if resource["type"] == "light")
+    bodies = ['id: 1\ndata: []\n\nid: 2\ndata: [{"type": "upd', light_on_event(light_id)]
+    bridge = emulator.bridge()
+    bridge.use_transport(httpx.MockTransport(reconnecting_transport(emulator, bodies, received)))
+    network = Network.fetch(bridge)
+    stream = EventStream(network)
+
+    stream._listen()
+    assert stream._response is None
+    stream._listen()
+
+    assert received[1].headers["Last-Event-ID"] == "2"
+    assert network.get_light_by_id(light_id).on == {"on": True}  # type: ignore[union-attr]
+
+
+def test_async_reconnect_in_the_middle_of_an_event(emulator: BridgeEmulator) -> None:
+    received: list[httpx.Request] = []
+    light_id = next(resource["id"] for resource in emulator.resources.values() if resource["type"] == "light")
+    bodies = ['id: 1\ndata: [{"type": "upd', light_on_event(light_id)]
+
+    async def run() -> None:
+        bridge = emulator.async_bridge()
+        bridge.use_transport(httpx.MockTransport(reconnecting_transport(emulator, bodies, received)))
+        network = await AsyncNetwork.fetch(bridge)
+        stream = AsyncEventStream(network)
+
+        await stream._listen()
+        await stream._listen()
+
+        assert received[1].headers["Last-Event-ID"] == "1"
+        assert network.get_light_by_id(light_id).on == {"on": True}  # type: ignore[union-attr]
+        await bridge.aclose()
+
+    asyncio.run(run())
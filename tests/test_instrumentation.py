@@ -0,0 +1,81 @@
+import sys
+
+import pytest
+
+from philips_hue_v2.bridge import HueBridge
+from philips_hue_v2.resource.instrumentation import (
+    MetricsInstrumentation,
+    OpenTelemetryInstrumentation,
+    PrometheusInstrumentation,
+)
+from philips_hue_v2.resource.network import Network
+
+
+# The label of the endpoints of all lights.
+LIGHT_ENDPOINT = "/light"
+
+
+def update_a_light(network: Network) -> None:
+    """Send an update of a light through the command scheduler."""
+    (network.lights or [])[0].update(on=True, brightness=50)
+
+
+def test_metrics_of_a_scheduled_command(bridge: HueBridge, network: Network) -> None:
+    metrics = MetricsInstrumentation()
+    bridge.instrument(metrics)
+
+    update_a_light(network)
+
+    assert metrics.status_codes[("PUT", LIGHT_ENDPOINT, 200)] == 1
+    assert metrics.latency[("PUT", LIGHT_ENDPOINT)].count == 1
+    assert metrics.queue_wait[LIGHT_ENDPOINT].count == 1
+    assert not metrics.retries
+
+
+def test_prometheus_metrics_of_a_scheduled_command(bridge: HueBridge, network: Network) -> None:
+    prometheus_client = pytest.importorskip("prometheus_client")
+    registry = prometheus_client.CollectorRegistry()
+    bridge.instrument(PrometheusInstrumentation(registry=registry))
+
+    update_a_light(network)
+
+    labels = {"method": "PUT", "endpoint": LIGHT_ENDPOINT}
+    assert registry.get_sample_value("hue_bridge_responses_total", {**labels, "status": "200"}) == 1
+    assert registry.get_sample_value("hue_bridge_request_duration_seconds_count", labels) == 1
+    assert registry.get_sample_value("hue_bridge_queue_wait_seconds_count", {"endpoint": LIGHT_ENDPOINT}) == 1
+    assert registry.get_sample_value("hue_bridge_retries_total", labels) is None
+
+
+def test_opentelemetry_metrics_of_a_scheduled_command(bridge: HueBridge, network: Network) -> None:
+    sdk_metrics = pytest.importorskip("opentelemetry.sdk.metrics")
+    sdk_export = pytest.importorskip("opentelemetry.sdk.metrics.export")
+    reader = sdk_export.InMemoryMetricReader()
+    bridge.instrument(OpenTelemetryInstrumentation(meter_provider=sdk_metrics.MeterProvider(metric_readers=[reader])))
+
+    update_a_light(network)
+
+    data = reader.get_metrics_data()
+    points = {
+        metric.name: list(metric.data.data_points)
+        for resource_metrics in data.resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+    }
+    (latency,) = points["hue_bridge.request.duration"]
+    assert latency.count == 1
+    assert dict(latency.attributes) == {"method": "PUT", "endpoint": LIGHT_ENDPOINT, "status": "200"}
+    (queue_wait,) = points["hue_bridge.queue_wait"]
+    assert queue_wait.count == 1
+    assert "hue_bridge.retries" not in points
+
+
+def test_prometheus_without_the_extra(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "prometheus_client", None)
+    with pytest.raises(ImportError, match="prometheus extra"):
+        PrometheusInstrumentation()
+
+
+def test_opentelemetry_without_the_extra(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "opentelemetry", None)
+    with pytest.raises(ImportError, match="opentelemetry extra"):
+        OpenTelemetryInstrumentation()
@@ -0,0 +1,113 @@
+import time
+from typing import Any
+
+from philips_hue_v2.lights.lights import Lights
+from philips_hue_v2.resource.eventstream import EventStream
+from philips_hue_v2.resource.network import Network
+
+
+def test_add_event_of_a_known_light_updates_it(network: Network) -> None:
+    light = (network.lights or [])[0]
+    resource = {**network.dump_resources()[0], "on": {"on": True}}
+    assert resource["id"] == light.id
+
+    network.apply_event({"type": "add", "data": [resource]})
+
+    assert len([item for item in network.lights or [] if item.id == light.id]) == 1
+    assert network.get_light_by_id(light.id) is light
+    assert light.on == {"on": True}
+
+
+def test_add_and_delete_events(network: Network) -> None:
+    resource = {**network.dump_resources()[0], "id": "new-light", "id_v1": "/lights/999"}
+    resource["metadata"] = {**resource["metadata"], "name": "New light"}
+    count = len(network.lights or [])
+
+    network.apply_event({"type": "add", "data": [resource]})
+    assert network.get_light_by_name("new light") is not None
+    assert len(network.lights or []) == count + 1
+
+    network.apply_event({"type": "delete", "data": [{"id": "new-light", "type": "light"}]})
+    assert network.get_light_by_id("new-light") is None
+    assert network.get_light_by_name("new light") is None
+    assert len(network.lights or []) == count
+
+
+def test_update_event_renames_a_light(network: Network) -> None:
+    light = (network.lights or [])[0]
+    network.apply_event({"type": "update", "data": [{"id": light.id, "type": "light", "metadata": {"name": "Desk"}}]})
+
+    assert network.get_light_by_name("desk") is light
+    assert light.metadata["archetype"] == "sultan_bulb"
+
+
+def test_event_stream_keeps_the_network_live(network: Network) -> None:
+    light = (network.lights or [])[0]
+    other = Network.fetch(network.bridge)
+    stream = EventStream(other)
+    stream.start()
+    try:
+        # Keep updating until the stream is connected and the event of an update arrives.
+        for brightness in range(1, 50):
+            light.update(brightness=brightness)
+            time.sleep(0.05)
+            if other.get_light_by_id(light.id).dimming["brightness"] == brightness:  # type: ignore[union-attr]
+                break
+    finally:
+        stream.stop()
+
+    assert other.get_light_by_id(light.id).dimming["brightness"] == brightness  # type: ignore[union-attr]
+
+
+def scan_lights(network: Network, name: str | None = None, room: str | None = None) -> set[Lights]:
+    """Find the lights by going through all of them, the way lights were looked up before they were indexed."""
+    lights = set(network.lights or [])
+    if name is not None:
+        lights = {light for light in lights if light.name.casefold() == name.casefold()}
+    if room is not None:
+        group = next(group for group in network.groups if room in {group.id, group.name})
+        devices = {child["rid"] for child in group.children}
+        lights = {light for light in lights if light.owner["rid"] in devices}
+    return lights
+
+
+def assert_lookups_match_scans(network: Network) -> None:
+    for light in network.lights or []:
+        assert network.get_light_by_id(light.id) is light
+        assert network.get_light_by_id_v1(light.id_v1) is light
+        assert network.get_light_by_name(light.name.upper()) in scan_lights(network, name=light.name)
+        assert network.find_lights(name=light.name) == scan_lights(network, name=light.name)
+    for room in (group for group in network.groups if group.type == "room"):
+        for key in (room.id, room.name):
+            assert network.find_lights(group=key) == scan_lights(network, room=key)
+            assert network.find_lights(group=key, name="Light 1") == scan_lights(network, name="Light 1", room=key)
+        assert set(network.get_lights_in_group(room)) == scan_lights(network, room=room.id)
+
+
+def test_lookups_match_linear_scans(network: Network) -> None:
+    assert_lookups_match_scans(network)
+    assert network.get_light_by_id("unknown") is None
+    assert network.get_light_by_name("unknown") is None
+    assert network.find_lights(group="unknown") == set()
+
+
+def test_lookups_match_linear_scans_after_events(network: Network) -> None:
+    first, second = (network.lights or [])[:2]
+    resource: dict[str, Any] = {
+        **network.dump_resources()[0],
+        "id": "new-light",
+        "id_v1": "/lights/999",
+        "owner": first.owner,
+        "metadata": {"name": second.name, "archetype": "sultan_bulb"},
+    }
+
+    network.apply_event({"type": "add", "data": [resource]})
+    assert_lookups_match_scans(network)
+    assert len(network.find_lights(name=second.name)) == 2
+
+    network.apply_event({"type": "update", "data": [{"id": second.id, "type": "light", "metadata": {"name": "Desk"}}]})
+    network.apply_event({"type": "delete", "data": [{"id": first.id, "type": "light"}]})
+    assert_lookups_match_scans(network)
+    assert network.find_lights(name="desk") == {second}
+    assert network.get_light_by_id(first.id) is None
+    assert all(first not in network.get_lights_in_group(group) for group in network.groups)
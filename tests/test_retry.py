@@ -0,0 +1,161 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from philips_hue_v2.bridge import AsyncHueBridge, HueBridge
+from philips_hue_v2.resource.requests import async_get_resources, get_resources, put_resources
+from philips_hue_v2.resource.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    DeadlineExceededError,
+    retry_after,
+)
+
+
+def make_bridge(  # noqa: PLR0913 - The settings of the bridge the tests change
+    handler: httpx.MockTransport,
+    *,
+    max_retries: int = 2,
+    retry_backoff_max: float = 2.0,
+    retry_after_max: float = 30.0,
+    circuit_failure_threshold: int = 5,
+    circuit_reset_timeout: float = 10.0,
+) -> HueBridge:
+    """Create a bridge sending its requests to a mock transport, retrying without waiting by default."""
+    bridge = HueBridge(
+        client_key="",
+        user_name="",
+        ip_address="mock",
+        max_retries=max_retries,
+        retry_backoff=0.0,
+        retry_backoff_max=retry_backoff_max,
+        retry_after_max=retry_after_max,
+        circuit_failure_threshold=circuit_failure_threshold,
+        circuit_reset_timeout=circuit_reset_timeout,
+    )
+    bridge.use_transport(handler)
+    return bridge
+
+
+def responses(*status_codes: int, headers: dict[str, str] | None = None) -> tuple[httpx.MockTransport, list[float]]:
+    """A mock transport answering with the status codes in turn, and the times the requests were received."""
+    received: list[float] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status_code = status_codes[min(len(received), len(status_codes) - 1)]
+        received.append(time.monotonic())
+        return httpx.Response(status_code, json={"data": [], "errors": []}, headers=headers)
+
+    return httpx.MockTransport(handler), received
+
+
+def test_overloaded_request_is_retried() -> None:
+    transport, received = responses(503, 429, 200)
+    assert get_resources(make_bridge(transport)).is_ok()
+    assert len(received) == 3
+
+
+def test_retries_stop_at_max_retries() -> None:
+    transport, received = responses(503)
+    result = get_resources(make_bridge(transport, max_retries=1))
+    assert isinstance(result.unwrap_err(), httpx.HTTPStatusError)
+    assert len(received) == 2
+
+
+def test_relative_update_is_not_retried() -> None:
+    transport, received = responses(503, 200)
+    result = put_resources(make_bridge(transport), body={"dimming_delta": {"action": "up"}}, endpoint="/light/a")
+    assert result.is_err()
+    assert len(received) == 1
+
+
+def test_retry_after_longer_than_the_backoff_is_honored() -> None:
+    transport, received = responses(429, 200, headers={"Retry-After": "0.2"})
+    assert get_resources(make_bridge(transport, retry_backoff_max=0.01)).is_ok()
+    assert received[1] - received[0] >= 0.2
+
+
+def test_retry_after_longer_than_the_cap_is_not_retried() -> None:
+    transport, received = responses(429, 200, headers={"Retry-After": "3600"})
+    result = get_resources(make_bridge(transport, retry_after_max=0.1))
+    assert isinstance(result.unwrap_err(), httpx.HTTPStatusError)
+    assert len(received) == 1
+
+
+def test_retry_after_is_capped_with_a_deadline() -> None:
+    transport, received = responses(429, 200, headers={"Retry-After": "3600"})
+    assert get_resources(make_bridge(transport, retry_after_max=0.1), deadline=5).is_ok()
+    assert 0.1 <= received[1] - received[0] < 1
+
+
+def test_deadline_cuts_the_retry_after_short() -> None:
+    transport, received = responses(429, 200, headers={"Retry-After": "5"})
+    result = get_resources(make_bridge(transport), deadline=0.5)
+    assert result.is_err()
+    assert len(received) == 1
+
+
+def test_deadline_passed_before_sending() -> None:
+    transport, _ = responses(200)
+    result = get_resources(make_bridge(transport), deadline=-1)
+    assert isinstance(result.unwrap_err(), DeadlineExceededError)
+
+
+def test_retry_after_header() -> None:
+    assert retry_after(httpx.Response(429, headers={"Retry-After": "3"})) == 3.0
+    assert retry_after(httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after(httpx.Response(429, headers={"Retry-After": "soon"})) is None
+    assert retry_after(httpx.Response(429)) is None
+
+
+def test_circuit_opens_and_lets_a_single_probe_through() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.05)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_open_circuit_fails_fast() -> None:
+    transport, received = responses(503)
+    bridge = make_bridge(transport, max_retries=0, circuit_failure_threshold=2, circuit_reset_timeout=60)
+    get_resources(bridge)
+    get_resources(bridge)
+    assert isinstance(get_resources(bridge).unwrap_err(), CircuitOpenError)
+    assert len(received) == 2
+
+
+def test_cancelled_probe_releases_the_circuit() -> None:
+    slow = True
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if slow:
+            await asyncio.sleep(1)
+        return httpx.Response(200, json={"data": [], "errors": []})
+
+    async def run() -> None:
+        nonlocal slow
+        bridge = AsyncHueBridge(client_key="", user_name="", ip_address="mock", circuit_reset_timeout=0.05)
+        bridge.use_transport(httpx.MockTransport(handler))
+        for _ in range(bridge.circuit_failure_threshold):
+            bridge.circuit_breaker.record_failure()
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(async_get_resources(bridge), timeout=0.05)
+        slow = False
+        assert (await async_get_resources(bridge)).is_ok()
+        assert bridge.circuit_breaker.state is CircuitState.CLOSED
+        await bridge.aclose()
+
+    asyncio.run(run())
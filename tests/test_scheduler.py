@@ -0,0 +1,149 @@
+import threading
+from typing import Any
+
+from result import Ok
+
+from philips_hue_v2.resource.network import Network
+from philips_hue_v2.resource.scheduler import CommandScheduler, Priority, ResourceResult, merge_bodies
+
+
+# Rates high enough that the scheduler never holds back a command.
+UNLIMITED_RATE = 1_000_000.0
+
+
+class RecordingSend:
+    """Send function recording the commands, blocking until released so commands pile up in the queue."""
+
+    def __init__(self) -> None:
+        """Start with the sending released."""
+        self.sent: list[tuple[str, dict[str, Any]]] = []
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+
+    def __call__(self, body: dict[str, Any], endpoint: str) -> ResourceResult:
+        """Record the command once released."""
+        self.started.set()
+        self.release.wait(timeout=5)
+        self.sent.append((endpoint, body))
+        return Ok([{"rid": endpoint, "rtype": "light"}])
+
+
+def test_updates_of_an_endpoint_are_sent_in_order() -> None:
+    send = RecordingSend()
+    scheduler = CommandScheduler(send, max_workers=4, light_rate=UNLIMITED_RATE, group_rate=UNLIMITED_RATE)
+    futures = [scheduler.submit({"dimming": {"brightness": value}}, "/light/a") for value in range(10)]
+    for future in futures:
+        assert future.result(timeout=5).is_ok()
+    scheduler.close()
+
+    assert [body["dimming"]["brightness"] for _, body in send.sent] == list(range(10))
+
+
+def test_urgent_commands_are_sent_first() -> None:
+    send = RecordingSend()
+    # The first command takes the only token, the others wait for the bucket to refill and are ranked meanwhile.
+    scheduler = CommandScheduler(send, light_rate=20.0)
+    scheduler.submit({"on": {"on": True}}, "/light/first").result(timeout=5)
+    low = scheduler.submit({"on": {"on": True}}, "/light/low", priority=Priority.LOW)
+    high = scheduler.submit({"on": {"on": True}}, "/light/high", priority=Priority.HIGH)
+    for future in (low, high):
+        future.result(timeout=5)
+    scheduler.close()
+
+    assert [endpoint for endpoint, _ in send.sent] == ["/light/first", "/light/high", "/light/low"]
+
+
+def test_cancelled_future_does_not_block_the_endpoint() -> None:
+    send = RecordingSend()
+    send.release.clear()
+    scheduler = CommandScheduler(send, max_workers=1, light_rate=UNLIMITED_RATE, group_rate=UNLIMITED_RATE)
+    first = scheduler.submit({"on": {"on": True}}, "/light/a")
+    cancelled = scheduler.submit({"on": {"on": False}}, "/light/a")
+    assert cancelled.cancel()
+    send.release.set()
+
+    assert first.result(timeout=5).is_ok()
+    assert scheduler.submit({"on": {"on": True}}, "/light/a").result(timeout=5).is_ok()
+    scheduler.close()
+    assert len(send.sent) == 3  # The cancelled command is still sent, only its result is dropped
+
+
+def test_failing_send_resolves_the_future_with_the_error() -> None:
+    def send(body: dict[str, Any], endpoint: str) -> ResourceResult:
+        raise ConnectionError("unreachable")
+
+    scheduler = CommandScheduler(send, light_rate=UNLIMITED_RATE, group_rate=UNLIMITED_RATE)
+    result = scheduler.submit({"on": {"on": True}}, "/light/a").result(timeout=5)
+    scheduler.close()
+
+    assert isinstance(result.unwrap_err(), ConnectionError)
+
+
+def test_merge_bodies_keeps_the_latest_values() -> None:
+    base = {"on": {"on": True}, "dimming": {"brightness": 10.0}, "color_temperature": {"mirek": 300}}
+    update = {"dimming": {"brightness": 50.0}, "color": {"xy": {"x": 0.3, "y": 0.3}}}
+
+    assert merge_bodies(base, update) == {
+        "on": {"on": True},
+        "dimming": {"brightness": 50.0},
+        "color": {"xy": {"x": 0.3, "y": 0.3}},
+    }
+    assert base["dimming"] == {"brightness": 10.0}
+
+
+def test_pending_updates_are_coalesced() -> None:
+    send = RecordingSend()
+    send.release.clear()
+    scheduler = CommandScheduler(
+        send, max_workers=1, coalesce=True, light_rate=UNLIMITED_RATE, group_rate=UNLIMITED_RATE
+    )
+    first = scheduler.submit({"on": {"on": True}}, "/light/a")
+    assert send.started.wait(timeout=5)
+    merged = [
+        scheduler.submit({"dimming": {"brightness": 20.0}}, "/light/a"),
+        scheduler.submit({"color": {"xy": {"x": 0.3, "y": 0.3}}}, "/light/a", priority=Priority.HIGH),
+        scheduler.submit({"dimming": {"brightness": 40.0}}, "/light/a"),
+    ]
+    send.release.set()
+
+    assert first.result(timeout=5).is_ok()
+    results = [future.result(timeout=5) for future in merged]
+    scheduler.close()
+
+    assert results[0] is results[1] is results[2]
+    assert send.sent == [
+        ("/light/a", {"on": {"on": True}}),
+        ("/light/a", {"dimming": {"brightness": 40.0}, "color": {"xy": {"x": 0.3, "y": 0.3}}}),
+    ]
+    assert scheduler.metrics.commands_coalesced == 2
+
+
+def test_relative_updates_are_not_coalesced() -> None:
+    send = RecordingSend()
+    send.release.clear()
+    scheduler = CommandScheduler(
+        send, max_workers=1, coalesce=True, light_rate=UNLIMITED_RATE, group_rate=UNLIMITED_RATE
+    )
+    futures = [
+        scheduler.submit({"dimming_delta": {"action": "up", "brightness_delta": 10.0}}, "/light/a") for _ in range(3)
+    ]
+    send.release.set()
+
+    for future in futures:
+        assert future.result(timeout=5).is_ok()
+    scheduler.close()
+
+    assert len(send.sent) == 3
+    assert scheduler.metrics.commands_coalesced == 0
+
+
+def test_light_updates_reach_the_emulator(network: Network) -> None:
+    light = (network.lights or [])[0]
+    light.update(on=True, brightness=42)
+
+    assert network.bridge.scheduler.metrics.commands_sent == 1
+    refreshed = Network.fetch(network.bridge).get_light_by_id(light.id)
+    assert refreshed is not None
+    assert refreshed.on == {"on": True}
+    assert refreshed.dimming["brightness"] == 42
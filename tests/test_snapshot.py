@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from philips_hue_v2.bridge import HueBridge
+from philips_hue_v2.resource.network import Network
+from philips_hue_v2.resource.snapshot import SnapshotError
+
+
+def test_snapshot_round_trip(network: Network, bridge: HueBridge, tmp_path: Path) -> None:
+    path = tmp_path / "network.json"
+    network.save_snapshot(path)
+
+    loaded = Network.from_snapshot(path, bridge)
+
+    assert loaded.dump_resources() == network.dump_resources()
+    assert loaded.group_members == network.group_members
+
+
+def test_snapshot_with_missing_keys_is_rejected(network: Network, bridge: HueBridge, tmp_path: Path) -> None:
+    path = tmp_path / "network.json"
+    network.save_snapshot(path)
+    snapshot = json.loads(path.read_text())
+    light = next(resource for resource in snapshot["resources"] if resource["type"] == "light")
+    del light["owner"]
+    path.write_text(json.dumps(snapshot))
+
+    with pytest.raises(SnapshotError, match=f"light {light['id']} of the snapshot is missing owner"):
+        Network.from_snapshot(path, bridge)
+
+
+def test_snapshot_of_another_format_is_rejected(bridge: HueBridge, tmp_path: Path) -> None:
+    path = tmp_path / "network.json"
+    path.write_text(json.dumps({"resources": []}))
+
+    with pytest.raises(SnapshotError, match="not a network snapshot"):
+        Network.from_snapshot(path, bridge)
+
+
+def test_sync_resources_adds_updates_and_removes(network: Network) -> None:
+    resources = network.dump_resources()
+    lights = [resource for resource in resources if resource["type"] == "light"]
+    removed, renamed = lights[0], lights[1]
+    added = {**lights[2], "id": "new-light", "id_v1": "/lights/999"}
+    renamed["metadata"] = {**renamed["metadata"], "name": "Renamed"}
+
+    network.sync_resources([*(resource for resource in resources if resource is not removed), added])
+
+    assert network.get_light_by_id(removed["id"]) is None
+    assert network.get_light_by_id("new-light") is not None
+    assert network.get_light_by_name("renamed") is network.get_light_by_id(renamed["id"])
+    assert len(network.lights or []) == len(lights)
@@ -0,0 +1,162 @@
+import math
+from typing import Any
+
+from philips_hue_v2.bridge import HueBridge
+from philips_hue_v2.emulator import BridgeEmulator
+from philips_hue_v2.lights.store import NO_GAMUT, LightStore
+from philips_hue_v2.resource.network import Network
+
+
+def make_store(emulator: BridgeEmulator, bridge: HueBridge) -> LightStore:
+    return LightStore(list(emulator.resources.values()), bridge)
+
+
+def light_resource(network: Network, index: int = 0) -> dict[str, Any]:
+    return [resource for resource in network.dump_resources() if resource["type"] == "light"][index]
+
+
+def test_views_match_the_light_models(emulator: BridgeEmulator, bridge: HueBridge, network: Network) -> None:
+    store = make_store(emulator, bridge)
+
+    assert len(store) == len(network.lights or [])
+    for light in network.lights or []:
+        view = store.get_light_by_id(light.id)
+        assert view is not None
+        assert view.bridge is bridge
+        assert (view.id, view.id_v1, view.owner) == (light.id, light.id_v1, light.owner)
+        assert view.metadata == light.metadata
+        assert view.on == light.on
+        assert view.dimming == light.dimming
+        assert view.color == light.color
+        assert view.color_temperature == light.color_temperature
+        assert store.get_light_by_name(light.name.upper()) == view
+
+
+def test_lights_share_gamuts_and_mirek_schemas(emulator: BridgeEmulator, bridge: HueBridge) -> None:
+    store = make_store(emulator, bridge)
+
+    assert len(store.gamuts) == 1
+    assert len(store.mirek_schemas) == 1
+    assert NO_GAMUT in store.gamut_ids
+
+
+def test_dump_light_round_trips(emulator: BridgeEmulator, bridge: HueBridge) -> None:
+    store = make_store(emulator, bridge)
+    copy = LightStore(store.dump_resources(), bridge)
+
+    assert copy.dump_resources() == store.dump_resources()
+
+
+def test_add_replaces_the_light_with_the_same_id(bridge: HueBridge, network: Network) -> None:
+    store = LightStore([], bridge)
+    resource = light_resource(network)
+    store.add(resource)
+
+    view = store.add({**resource, "on": {"on": True}, "metadata": {**resource["metadata"], "name": "Desk"}})
+
+    assert len(store) == 1
+    assert len(store.ids) == 1
+    assert view.on == {"on": True}
+    assert store.get_light_by_name("desk") == view
+    assert store.get_light_by_name(resource["metadata"]["name"]) is None
+
+
+def test_remove_clears_and_reuses_the_row(bridge: HueBridge, network: Network) -> None:
+    store = LightStore([], bridge)
+    first, second, third = (light_resource(network, index) for index in range(3))
+    for resource in (first, second, third):
+        store.add(resource)
+
+    store.remove(first["id"])
+    assert first["id"] not in store
+    assert store.get_light_by_name(first["metadata"]["name"]) is None
+    assert (store.ids[0], store.names[0], store.owners[0]) == ("", "", "")
+    assert store.on[0] == 0
+    assert math.isnan(store.brightness[0])
+    assert store.gamut_ids[0] == NO_GAMUT
+
+    view = store.add(light_resource(network, 3))
+    assert len(store.ids) == 3
+    assert store.ids[0] == view.id
+
+
+def test_remove_of_the_last_rows_shrinks_the_columns(bridge: HueBridge, network: Network) -> None:
+    store = LightStore([], bridge)
+    resources = [light_resource(network, index) for index in range(3)]
+    for resource in resources:
+        store.add(resource)
+
+    store.remove(resources[1]["id"])
+    assert len(store.ids) == 3
+    store.remove(resources[2]["id"])
+    assert len(store.ids) == 1
+    assert len(store.on) == len(store.brightness) == len(store.mireks) == 1
+    assert not store._free_rows
+
+    store.remove("unknown")
+    assert len(store) == 1
+
+
+def test_apply_update_merges_the_state(bridge: HueBridge, network: Network) -> None:
+    store = LightStore([light_resource(network, 1)], bridge)
+    view = store.lights[0]
+
+    store.apply_update(
+        {
+            "id": view.id,
+            "on": {"on": True},
+            "dimming": {"brightness": 42.0},
+            "color": {"xy": {"x": 0.3, "y": 0.4}},
+            "color_temperature": {"mirek": None},
+        }
+    )
+
+    assert view.on == {"on": True}
+    assert view.dimming["brightness"] == 42.0
+    assert view.color is not None
+    assert view.color["xy"] == {"x": 0.3, "y": 0.4}
+    assert view.color_temperature is not None
+    assert view.color_temperature["mirek_valid"] is False
+
+    store.apply_update({"id": view.id, "color_temperature": {"mirek": 250}})
+    assert view.color_temperature["mirek"] == 250
+
+
+def test_apply_update_renames_a_light(bridge: HueBridge, network: Network) -> None:
+    store = LightStore([light_resource(network)], bridge)
+    view = store.lights[0]
+    old_name = view.name
+
+    store.apply_update({"id": view.id, "metadata": {"name": "Desk"}})
+
+    renamed = store.get_light_by_name("desk")
+    assert renamed == view
+    assert renamed is not None
+    assert renamed.metadata["archetype"] == "sultan_bulb"
+    assert store.get_light_by_name(old_name) is None
+    assert len(store.ids) == 1
+
+
+def test_events_add_update_and_remove_lights(bridge: HueBridge, network: Network) -> None:
+    store = LightStore([], bridge)
+    resource = light_resource(network)
+
+    store.apply_event({"type": "add", "data": [resource, {"id": "room", "type": "room"}]})
+    store.apply_event({"type": "update", "data": [{"id": resource["id"], "type": "light", "on": {"on": True}}]})
+    assert store.lights[0].on == {"on": True}
+
+    store.apply_event({"type": "delete", "data": [{"id": resource["id"], "type": "light"}]})
+    assert len(store) == 0
+
+
+def test_view_update_is_sent_to_the_bridge(emulator: BridgeEmulator) -> None:
+    # The known state is only updated along with the requests when the bridge skips unchanged updates.
+    store = make_store(emulator, emulator.bridge(skip_unchanged_updates=True))
+    view = store.lights[0]
+
+    view.update(on=True, brightness=30)
+
+    assert emulator.resources[view.id]["on"] == {"on": True}
+    assert emulator.resources[view.id]["dimming"]["brightness"] == 30
+    assert view.on == {"on": True}
+    assert view.dimming["brightness"] == 30
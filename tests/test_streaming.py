@@ -0,0 +1,216 @@
+import asyncio
+import struct
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from philips_hue_v2.emulator import BridgeEmulator
+from philips_hue_v2.entertainment.entertainment import (
+    MAX_CHANNELS,
+    MAX_COMPONENT,
+    ColorSpace,
+    EntertainmentConfiguration,
+    encode_frame,
+)
+from philips_hue_v2.entertainment.streaming import (
+    AsyncEntertainmentStream,
+    BaseEntertainmentStream,
+    EntertainmentStream,
+)
+
+
+CONFIGURATION_ID = "1a8d99cc-967b-44f2-9202-43f976c0fa6b"
+HEADER_SIZE = 16 + len(CONFIGURATION_ID)
+
+
+class FakeTransport:
+    """A transport keeping the datagrams, failing the sends while `failing` is set."""
+
+    def __init__(self) -> None:
+        """Start with no datagrams sent."""
+        self.sent: list[bytes] = []
+        self.closed = False
+        self.failing = False
+
+    def send(self, data: bytes) -> int:
+        """Keep the datagram."""
+        if self.failing:
+            raise OSError("network is unreachable")
+        self.sent.append(data)
+        return len(data)
+
+    def close(self) -> None:
+        """Mark the transport as closed."""
+        self.closed = True
+
+
+def channels(frame: bytes) -> dict[int, tuple[int, int, int]]:
+    """Decode the channels of a frame."""
+    decoded = {}
+    for offset in range(HEADER_SIZE, len(frame), 7):
+        channel_id, *color = struct.unpack(">BHHH", frame[offset : offset + 7])
+        decoded[channel_id] = tuple(color)
+    return decoded
+
+
+@pytest.fixture()
+def configuration() -> EntertainmentConfiguration:
+    """An entertainment configuration with two channels."""
+    return EntertainmentConfiguration(
+        id=CONFIGURATION_ID,
+        type="entertainment_configuration",
+        metadata={"name": "TV"},
+        status="inactive",
+        channels=[
+            {"channel_id": channel_id, "position": {"x": 0.0, "y": 0.0, "z": 0.0}, "members": []}
+            for channel_id in (0, 1)
+        ],
+    )
+
+
+@pytest.fixture()
+def stream(configuration: EntertainmentConfiguration) -> BaseEntertainmentStream:
+    """A stream of 4 frames per second on a fake transport, which is connected and due to send at time 0."""
+    stream = BaseEntertainmentStream(configuration, transport_factory=FakeTransport, rate=4.0)
+    stream._transport = stream.transport_factory()
+    return stream
+
+
+@pytest.fixture()
+def emulator(configuration: EntertainmentConfiguration) -> Iterator[BridgeEmulator]:
+    """A bridge emulator with only the entertainment configuration."""
+    emulator = BridgeEmulator(resources=[configuration.model_dump(mode="json")])
+    yield emulator
+    emulator.shutdown()
+
+
+def test_encode_frame_layout() -> None:
+    frame = encode_frame(CONFIGURATION_ID, {0: (1.0, 0.0, 0.5), 7: (0.25, 1.0, 0.0)}, sequence=3)
+
+    assert frame[:9] == b"HueStream"
+    assert frame[9:11] == bytes([2, 0])
+    assert frame[11] == 3
+    assert frame[12:14] == bytes(2)
+    assert frame[14] == ColorSpace.RGB
+    assert frame[15] == 0
+    assert frame[16:HEADER_SIZE] == CONFIGURATION_ID.encode("ascii")
+    assert len(frame) == HEADER_SIZE + 2 * 7
+    assert channels(frame) == {0: (MAX_COMPONENT, 0, 32768), 7: (16384, MAX_COMPONENT, 0)}
+
+
+def test_encode_frame_wraps_sequence_and_clamps_colors() -> None:
+    frame = encode_frame(CONFIGURATION_ID, {2: (-0.5, 1.5, 0.0)}, sequence=257, color_space=ColorSpace.XY)
+
+    assert frame[11] == 1
+    assert frame[14] == ColorSpace.XY
+    assert channels(frame) == {2: (0, MAX_COMPONENT, 0)}
+
+
+def test_encode_frame_rejects_too_many_channels() -> None:
+    colors = {channel_id: (0.0, 0.0, 0.0) for channel_id in range(MAX_CHANNELS + 1)}
+
+    with pytest.raises(ValueError, match="at most"):
+        encode_frame(CONFIGURATION_ID, colors)
+
+
+def test_frames_are_paced_at_the_rate(stream: BaseEntertainmentStream) -> None:
+    transport = stream._transport
+    assert isinstance(transport, FakeTransport)
+
+    assert stream._tick(0.0) == 0.25
+    assert stream._tick(0.125) == 0.125
+    assert len(transport.sent) == 1
+    assert stream._tick(0.25) == 0.25
+    assert [frame[11] for frame in transport.sent] == [0, 1]
+    assert stream.metrics.ticks_skipped == 0
+
+
+def test_missed_ticks_are_skipped(stream: BaseEntertainmentStream) -> None:
+    transport = stream._transport
+    assert isinstance(transport, FakeTransport)
+    stream._tick(0.0)
+
+    # The ticks due at 0.25, 0.5, 0.75 and 1.0 are late, one frame is sent for them and the other three are skipped.
+    assert stream._tick(1.125) == 0.125
+    assert len(transport.sent) == 2
+    assert stream.metrics.frames_sent == 2
+    assert stream.metrics.ticks_skipped == 3
+
+
+def test_latest_colors_replace_unsent_frame(stream: BaseEntertainmentStream) -> None:
+    transport = stream._transport
+    assert isinstance(transport, FakeTransport)
+
+    stream.set_colors({0: (1.0, 0.0, 0.0)})
+    stream.set_colors({1: (0.0, 0.0, 1.0)})
+    assert stream.metrics.frames_dropped == 0
+    stream.set_colors({0: (0.0, 1.0, 0.0)})
+    assert stream.metrics.frames_dropped == 1
+
+    stream._tick(0.0)
+    stream.set_colors({0: (0.0, 0.0, 0.0)})
+    assert stream.metrics.frames_dropped == 1
+    assert channels(transport.sent[0]) == {0: (0, MAX_COMPONENT, 0), 1: (0, 0, MAX_COMPONENT)}
+
+
+def test_latest_frame_is_repeated(stream: BaseEntertainmentStream) -> None:
+    transport = stream._transport
+    assert isinstance(transport, FakeTransport)
+    stream.set_colors({0: (1.0, 0.0, 0.0)})
+
+    stream._tick(0.0)
+    stream._tick(0.25)
+
+    assert len(transport.sent) == 2
+    assert channels(transport.sent[0]) == channels(transport.sent[1]) == {0: (MAX_COMPONENT, 0, 0)}
+
+
+def test_send_errors_are_counted(stream: BaseEntertainmentStream) -> None:
+    transport = stream._transport
+    assert isinstance(transport, FakeTransport)
+    transport.failing = True
+
+    assert stream._tick(0.0) == 0.25
+    assert stream.metrics.send_errors == 1
+    assert stream.metrics.frames_sent == 0
+
+    transport.failing = False
+    stream._tick(0.25)
+    assert transport.sent[0][11] == 0
+
+
+def test_stream_starts_and_stops_on_the_bridge(
+    emulator: BridgeEmulator, configuration: EntertainmentConfiguration
+) -> None:
+    transport = FakeTransport()
+    with emulator.bridge() as bridge:
+        with EntertainmentStream(bridge, configuration, rate=100.0, transport_factory=lambda: transport) as stream:
+            assert emulator.resources[CONFIGURATION_ID]["status"] == "active"
+            stream.set_rgb_color(1, {"red": 255, "green": 0, "blue": 0})
+            time.sleep(0.05)
+
+        assert emulator.resources[CONFIGURATION_ID]["status"] == "inactive"
+    assert transport.closed
+    assert stream.metrics.frames_sent == len(transport.sent) > 0
+    assert channels(transport.sent[-1]) == {1: (MAX_COMPONENT, 0, 0)}
+
+
+def test_async_stream_starts_and_stops_on_the_bridge(
+    emulator: BridgeEmulator, configuration: EntertainmentConfiguration
+) -> None:
+    transport = FakeTransport()
+
+    async def stream_colors() -> None:
+        async with emulator.async_bridge() as bridge, AsyncEntertainmentStream(
+            bridge, configuration, rate=100.0, transport_factory=lambda: transport
+        ) as stream:
+            assert emulator.resources[CONFIGURATION_ID]["status"] == "active"
+            stream.set_colors({0: (0.0, 1.0, 0.0)})
+            await asyncio.sleep(0.05)
+
+    asyncio.run(stream_colors())
+
+    assert emulator.resources[CONFIGURATION_ID]["status"] == "inactive"
+    assert transport.closed
+    assert channels(transport.sent[-1]) == {0: (0, MAX_COMPONENT, 0)}
@@ -0,0 +1,47 @@
+from concurrent.futures import Future
+from typing import TYPE_CHECKING
+
+import pytest
+from result import Err, Ok
+
+from philips_hue_v2.emulator import BridgeEmulator
+from philips_hue_v2.lights.transitions import LightState, Transition, fade, hold
+from philips_hue_v2.resource.network import Network
+
+
+if TYPE_CHECKING:
+    from philips_hue_v2.resource.scheduler import ResourceResult
+
+
+@pytest.mark.parametrize("rate_share", [0.0, -0.5, 1.5])
+def test_rate_share_out_of_range_is_rejected(network: Network, rate_share: float) -> None:
+    with pytest.raises(ValueError, match="rate share"):
+        Transition(network, network.lights or [], hold(LightState(brightness=50.0)), 1.0, rate_share=rate_share)
+
+
+def test_cancelled_updates_are_not_counted(network: Network) -> None:
+    transition = Transition(network, network.lights or [], hold(LightState(brightness=50.0)), 1.0)
+    futures: list[Future[ResourceResult]] = [Future() for _ in range(3)]
+    for future in futures:
+        future.add_done_callback(transition._record)
+
+    futures[0].cancel()
+    futures[1].set_result(Ok([]))
+    futures[2].set_result(Err(ConnectionError("unreachable")))
+
+    assert transition.commands_sent == 2
+    assert transition.errors == 1
+
+
+def test_transition_reaches_the_last_state(emulator: BridgeEmulator, network: Network) -> None:
+    lights = (network.lights or [])[:10]
+    transition = Transition(
+        network, lights, fade(LightState(brightness=10.0), LightState(brightness=80.0)), 0.2, rate_share=0.5
+    )
+    transition.start()
+    transition.wait(timeout=5)
+    network.bridge.scheduler.close()
+
+    assert transition.errors == 0
+    assert transition.commands_sent == sum(len(updates) for _, updates in transition.steps())
+    assert {emulator.resources[light.id]["dimming"]["brightness"] for light in lights} == {80.0}